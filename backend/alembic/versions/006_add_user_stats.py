@@ -0,0 +1,41 @@
+"""add user_stats rollup table
+
+Revision ID: 006_add_user_stats
+Revises: 67aca3c3bf83
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_add_user_stats'
+down_revision: Union[str, None] = '67aca3c3bf83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows are backfilled by scripts/rebuild_user_stats.py
+    # (missing rows are also rebuilt lazily on first access)
+    op.create_table(
+        'user_stats',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_workouts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_reps', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_duration_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('achievements_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('week_start', sa.Date(), nullable=True),
+        sa.Column('week_workouts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('week_xp', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_stats')
@@ -0,0 +1,41 @@
+"""add user_weekly_xp buckets for the weekly leaderboard
+
+Revision ID: 007_add_user_weekly_xp
+Revises: 006_add_user_stats
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_add_user_weekly_xp'
+down_revision: Union[str, None] = '006_add_user_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Current week is backfilled by scripts/rebuild_user_stats.py
+    op.create_table(
+        'user_weekly_xp',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('iso_week', sa.String(length=8), nullable=False),
+        sa.Column('xp', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'iso_week')
+    )
+    op.create_index(
+        'idx_user_weekly_xp_week_xp',
+        'user_weekly_xp',
+        ['iso_week', sa.text('xp DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_weekly_xp_week_xp', table_name='user_weekly_xp')
+    op.drop_table('user_weekly_xp')
@@ -0,0 +1,38 @@
+"""add users.notification_hour bucket for the hourly reminder job
+
+Revision ID: 008_add_notification_hour
+Revises: 007_add_user_weekly_xp
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_add_notification_hour'
+down_revision: Union[str, None] = '007_add_user_weekly_xp'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('notification_hour', sa.Integer(), nullable=True))
+    op.create_index('ix_users_notification_hour', 'users', ['notification_hour'])
+
+    # Backfill from existing notification_time values
+    if op.get_bind().dialect.name == 'sqlite':
+        hour_expr = "CAST(strftime('%H', notification_time) AS INTEGER)"
+    else:
+        hour_expr = "EXTRACT(HOUR FROM notification_time)"
+    op.execute(
+        f"UPDATE users SET notification_hour = {hour_expr} "
+        "WHERE notification_time IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_notification_hour', table_name='users')
+    op.drop_column('users', 'notification_hour')
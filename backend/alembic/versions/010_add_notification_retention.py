@@ -0,0 +1,44 @@
+"""add users.unread_notifications counter and notification retention index
+
+Revision ID: 010_add_notification_retention
+Revises: 009_add_notification_outbox
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_add_notification_retention'
+down_revision: Union[str, None] = '009_add_notification_outbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('unread_notifications', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.create_index(
+        'idx_notifications_type_created',
+        'notifications',
+        ['notification_type', 'created_at']
+    )
+
+    # Backfill counters from existing notifications
+    op.execute(
+        sa.text(
+            "UPDATE users SET unread_notifications = ("
+            "SELECT COUNT(*) FROM notifications "
+            "WHERE notifications.user_id = users.id AND notifications.is_read = :is_read)"
+        ).bindparams(is_read=False)
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notifications_type_created', table_name='notifications')
+    op.drop_column('users', 'unread_notifications')
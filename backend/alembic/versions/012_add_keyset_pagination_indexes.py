@@ -0,0 +1,36 @@
+"""add composite indexes for keyset pagination of history and notifications
+
+Revision ID: 012_add_keyset_pagination_indexes
+Revises: 011_add_app_metadata
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_add_keyset_pagination_indexes'
+down_revision: Union[str, None] = '011_add_app_metadata'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_workout_sessions_user_status_finished',
+        'workout_sessions',
+        ['user_id', 'status', sa.text('finished_at DESC'), 'id']
+    )
+    op.create_index(
+        'idx_notifications_user_id',
+        'notifications',
+        ['user_id', 'id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notifications_user_id', table_name='notifications')
+    op.drop_index('idx_workout_sessions_user_status_finished', table_name='workout_sessions')
@@ -0,0 +1,68 @@
+"""add composite indexes for hot queries
+
+Revision ID: 013_add_hot_query_indexes
+Revises: 012_add_keyset_pagination_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_add_hot_query_indexes'
+down_revision: Union[str, None] = '012_add_keyset_pagination_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # History is ordered by finished_at DESC, id DESC; the index from 012
+    # had id ASC, so it could not return rows in that order without a sort
+    op.drop_index('idx_workout_sessions_user_status_finished', table_name='workout_sessions')
+    op.create_index(
+        'idx_workout_sessions_user_status_finished',
+        'workout_sessions',
+        ['user_id', 'status', sa.text('finished_at DESC'), sa.text('id DESC')]
+    )
+
+    # Hourly reminder bucket; replaces the single-column index from 008
+    op.create_index(
+        'idx_users_notification_hour_enabled',
+        'users',
+        ['notification_hour', 'notifications_enabled']
+    )
+    op.drop_index('ix_users_notification_hour', table_name='users')
+
+    op.create_index(
+        'idx_users_enabled_last_workout',
+        'users',
+        ['notifications_enabled', 'last_workout_date']
+    )
+    op.create_index(
+        'idx_workout_sessions_status_finished',
+        'workout_sessions',
+        ['status', 'finished_at']
+    )
+    op.create_index(
+        'idx_user_goals_user_completed_end',
+        'user_goals',
+        ['user_id', 'completed', 'end_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_goals_user_completed_end', table_name='user_goals')
+    op.drop_index('idx_workout_sessions_status_finished', table_name='workout_sessions')
+    op.drop_index('idx_users_enabled_last_workout', table_name='users')
+    op.create_index('ix_users_notification_hour', 'users', ['notification_hour'])
+    op.drop_index('idx_users_notification_hour_enabled', table_name='users')
+
+    op.drop_index('idx_workout_sessions_user_status_finished', table_name='workout_sessions')
+    op.create_index(
+        'idx_workout_sessions_user_status_finished',
+        'workout_sessions',
+        ['user_id', 'status', sa.text('finished_at DESC'), 'id']
+    )
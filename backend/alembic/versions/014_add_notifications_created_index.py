@@ -0,0 +1,28 @@
+"""add notifications created_at index for the catch-all retention purge
+
+Revision ID: 014_add_notifications_created_index
+Revises: 013_add_hot_query_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_add_notifications_created_index'
+down_revision: Union[str, None] = '013_add_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The retention rule for unlisted types filters on notification_type
+    # NOT IN (...), which cannot use idx_notifications_type_created; without
+    # this index the purge scanned the whole table
+    op.create_index('idx_notifications_created', 'notifications', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notifications_created', table_name='notifications')
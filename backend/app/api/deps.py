@@ -1,6 +1,7 @@
 import hashlib
 import hmac
 import json
+from functools import lru_cache
 from urllib.parse import parse_qsl, unquote
 from typing import Annotated
 from datetime import datetime, timedelta
@@ -9,9 +10,27 @@ from fastapi import Depends, HTTPException, Header, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.db.database import get_async_session
+from app.db.database import get_async_session, get_read_session
 from app.db.models import User
 from app.config import settings
+from app.utils.cache import LRUCache
+
+INIT_DATA_MAX_AGE = timedelta(hours=24)
+
+# sha256(init_data) -> verified telegram_id, expiring with auth_date + 24h
+_verified_init_data = LRUCache(maxsize=settings.auth_cache_max_entries)
+# telegram_id -> users.id
+_user_ids = LRUCache(maxsize=settings.auth_cache_max_entries, ttl=3600)
+
+
+@lru_cache(maxsize=4)
+def get_webapp_secret_key(bot_token: str) -> bytes:
+    """HMAC secret for init data validation (depends only on the bot token)."""
+    return hmac.new(
+        b"WebAppData",
+        bot_token.encode(),
+        hashlib.sha256
+    ).digest()
 
 
 def validate_telegram_init_data(init_data: str, bot_token: str) -> dict | None:
@@ -31,7 +50,7 @@ def validate_telegram_init_data(init_data: str, bot_token: str) -> dict | None:
 
         # Check auth_date (data should not be older than 24 hours)
         auth_date = int(parsed_data.get("auth_date", 0))
-        if datetime.utcnow() - datetime.fromtimestamp(auth_date) > timedelta(hours=24):
+        if datetime.utcnow() - datetime.fromtimestamp(auth_date) > INIT_DATA_MAX_AGE:
             return None
 
         # Create data-check-string
@@ -39,16 +58,9 @@ def validate_telegram_init_data(init_data: str, bot_token: str) -> dict | None:
             f"{k}={v}" for k, v in sorted(parsed_data.items())
         )
 
-        # Create secret key
-        secret_key = hmac.new(
-            b"WebAppData",
-            bot_token.encode(),
-            hashlib.sha256
-        ).digest()
-
         # Calculate hash
         calculated_hash = hmac.new(
-            secret_key,
+            get_webapp_secret_key(bot_token),
             data_check_string.encode(),
             hashlib.sha256
         ).hexdigest()
@@ -66,6 +78,60 @@ def validate_telegram_init_data(init_data: str, bot_token: str) -> dict | None:
         return None
 
 
+def _verify_init_data(init_data: str) -> int | None:
+    """
+    Validate init data and return the Telegram user id.
+
+    Results are cached per init data string until its auth_date expires, so
+    repeated calls from the same Mini App session skip parsing and HMAC.
+    """
+    cache_key = hashlib.sha256(init_data.encode()).digest()
+    telegram_id = _verified_init_data.get(cache_key)
+    if telegram_id is not None:
+        return telegram_id
+
+    validated_data = validate_telegram_init_data(init_data, settings.bot_token)
+    if not validated_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired Telegram init data",
+        )
+
+    user_data = validated_data.get("user")
+    if not user_data:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User data not found in init data",
+        )
+
+    telegram_id = user_data.get("id")
+    if telegram_id is not None:
+        # Same clock as the auth_date check above (naive local timestamps)
+        expires_at = datetime.fromtimestamp(int(validated_data.get("auth_date", 0))) + INIT_DATA_MAX_AGE
+        ttl = (expires_at - datetime.utcnow()).total_seconds()
+        if ttl > 0:
+            _verified_init_data.set(cache_key, telegram_id, ttl=ttl)
+    return telegram_id
+
+
+async def _get_user_by_telegram_id(session: AsyncSession, telegram_id: int) -> User | None:
+    """Load a user by Telegram id, using the cached users.id when known."""
+    user_id = _user_ids.get(telegram_id)
+    if user_id is not None:
+        user = await session.get(User, user_id)
+        if user is not None and user.telegram_id == telegram_id:
+            return user
+        _user_ids.delete(telegram_id)
+
+    result = await session.execute(
+        select(User).where(User.telegram_id == telegram_id)
+    )
+    user = result.scalar_one_or_none()
+    if user is not None:
+        _user_ids.set(telegram_id, user.id)
+    return user
+
+
 async def get_current_user(
     authorization: Annotated[str | None, Header()] = None,
     session: AsyncSession = Depends(get_async_session),
@@ -74,6 +140,18 @@ async def get_current_user(
     Get current user from Telegram init data.
     Authorization header format: "tma <init_data>"
     """
+    return await _authenticate(authorization, session)
+
+
+async def get_read_current_user(
+    authorization: Annotated[str | None, Header()] = None,
+    session: AsyncSession = Depends(get_read_session),
+) -> User:
+    """Same as get_current_user, loaded through the read-only session."""
+    return await _authenticate(authorization, session)
+
+
+async def _authenticate(authorization: str | None, session: AsyncSession) -> User:
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,38 +170,17 @@ async def get_current_user(
     if settings.debug and init_data.startswith("debug_"):
         try:
             telegram_id = int(init_data.split("_")[1])
-            result = await session.execute(
-                select(User).where(User.telegram_id == telegram_id)
-            )
-            user = result.scalar_one_or_none()
+            user = await _get_user_by_telegram_id(session, telegram_id)
             if user:
                 return user
         except (ValueError, IndexError):
             pass
 
-    # Validate Telegram init data
-    validated_data = validate_telegram_init_data(init_data, settings.bot_token)
-
-    if not validated_data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired Telegram init data",
-        )
-
-    user_data = validated_data.get("user")
-    if not user_data:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User data not found in init data",
-        )
+    # Validate Telegram init data (cached per init data string)
+    telegram_id = _verify_init_data(init_data)
 
-    telegram_id = user_data.get("id")
-
-    # Get or create user
-    result = await session.execute(
-        select(User).where(User.telegram_id == telegram_id)
-    )
-    user = result.scalar_one_or_none()
+    # Get user
+    user = await _get_user_by_telegram_id(session, telegram_id)
 
     if not user:
         raise HTTPException(
@@ -137,3 +194,7 @@ async def get_current_user(
 # Type alias for dependency injection
 CurrentUser = Annotated[User, Depends(get_current_user)]
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+# Read-only endpoints (no commit, replica if configured)
+ReadCurrentUser = Annotated[User, Depends(get_read_current_user)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Query
 from sqlalchemy import select
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import ReadSessionDep, ReadCurrentUser
 from app.db.models import UserAchievement
 from app.utils.achievement_loader import load_achievements
 from app.schemas import (
@@ -19,8 +19,8 @@ router = APIRouter()
     tags=["Achievements"]
 )
 async def get_achievements(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     skip: int = Query(0, ge=0, description="Количество пропущенных элементов"),
     limit: int = Query(50, ge=1, le=100, description="Максимальное количество элементов"),
 ):
@@ -74,8 +74,8 @@ async def get_achievements(
     tags=["Achievements"]
 )
 async def get_recent_achievements(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     limit: int = Query(5, ge=1, le=20, description="Максимальное количество достижений"),
 ):
     achievements_data = load_achievements()
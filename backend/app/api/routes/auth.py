@@ -2,7 +2,8 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import select
 
 from app.api.deps import AsyncSessionDep, validate_telegram_init_data
-from app.db.models import User, Notification
+from app.db.models import User
+from app.services.notifications import save_notification
 from app.config import settings
 from app.schemas import AuthRequest, AuthResponse, UserResponse
 
@@ -98,14 +99,13 @@ async def validate_auth(
         is_new = True
 
         # Create welcome notification
-        welcome_notification = Notification(
+        await save_notification(
+            session,
             user_id=user.id,
             notification_type="welcome",
             title="Добро пожаловать!",
             message="Рады видеть тебя в BodyWeight! Начни первую тренировку прямо сейчас.",
         )
-        session.add(welcome_notification)
-        await session.flush()
     else:
         # Update existing user info
         user.username = username
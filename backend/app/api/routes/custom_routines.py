@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
 from app.db.models import (
     Exercise, UserCustomRoutine, UserCustomRoutineExercise
 )
@@ -21,8 +21,8 @@ router = APIRouter()
 
 @router.get("", response_model=list[CustomRoutineListItem])
 async def list_custom_routines(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     routine_type: str | None = None,
 ):
     """Get all custom routines for the current user."""
@@ -56,8 +56,8 @@ async def list_custom_routines(
 @router.get("/{routine_id}", response_model=CustomRoutineResponse)
 async def get_custom_routine(
     routine_id: int,
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     """Get a specific custom routine with all exercises."""
     result = await session.execute(
@@ -1,22 +1,24 @@
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
 from app.db.models import (
     Exercise,
     ExerciseCategory,
     UserExerciseProgress,
     UserFavoriteExercise
 )
-from app.services.data_loader import load_all_routines
+from app.services.exercise_catalog import exercise_catalog
+from app.services.routine_registry import routine_registry
 from app.utils.cache import timed_cache
 from app.schemas import (
     PaginatedResponse,
     ExerciseResponse,
     ExerciseWithProgressResponse,
     ExerciseProgressResponse,
+    RoutineData,
 )
 
 router = APIRouter()
@@ -46,8 +48,8 @@ class CategoryResponse(BaseModel):
     ),
     tags=["Exercises"]
 )
-@timed_cache(seconds=600)  # Cache for 10 minutes
-async def get_categories(session: AsyncSessionDep):
+@timed_cache(seconds=600, tags=("catalog",))  # Cache for 10 minutes
+async def get_categories(session: ReadSessionDep):
     result = await session.execute(
         select(ExerciseCategory)
         .options(selectinload(ExerciseCategory.exercises))
@@ -91,8 +93,8 @@ async def get_categories(session: AsyncSessionDep):
     tags=["Exercises"]
 )
 async def get_exercises(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     category: str | None = Query(
         None, description="Фильтр по slug категории"
     ),
@@ -111,27 +113,7 @@ async def get_exercises(
     skip: int = Query(0, ge=0, description="Количество пропущенных"),
     limit: int = Query(50, ge=1, le=100, description="Максимум элементов"),
 ):
-    query = (
-        select(Exercise)
-        .options(selectinload(Exercise.category))
-        .where(Exercise.is_active.is_(True))
-    )
-
-    if category:
-        query = query.join(Exercise.category).where(
-            ExerciseCategory.slug == category
-        )
-
-    if difficulty:
-        query = query.where(Exercise.difficulty == difficulty)
-
-    if max_level:
-        query = query.where(Exercise.required_level <= max_level)
-
-    query = query.order_by(Exercise.name_ru)
-
-    result = await session.execute(query)
-    exercises = result.scalars().all()
+    catalog = await exercise_catalog.get(session)
 
     # Get user's favorite exercise IDs
     favorites_result = await session.execute(
@@ -140,58 +122,17 @@ async def get_exercises(
     )
     favorite_ids = set(favorites_result.scalars().all())
 
-    # Parse tags filter
-    tag_filter = set(tags.split(",")) if tags else None
-
-    # Apply Python-level filters (tags, favorites)
-    filtered_exercises = []
-    for ex in exercises:
-        is_favorite = ex.id in favorite_ids
-
-        # Filter by favorites if requested
-        if favorites_only and not is_favorite:
-            continue
-
-        # Filter by tags if provided
-        if tag_filter:
-            ex_tags = set(ex.tags or [])
-            if not tag_filter.intersection(ex_tags):
-                continue
-
-        filtered_exercises.append(ex)
-
-    # Calculate total before pagination
-    total = len(filtered_exercises)
-
-    # Apply pagination
-    paginated_exercises = filtered_exercises[skip:skip + limit]
-
-    # Build response
-    response_items = []
-    for ex in paginated_exercises:
-        is_favorite = ex.id in favorite_ids
-        ex_response = ExerciseResponse(
-            id=ex.id,
-            slug=ex.slug,
-            name=ex.name,
-            name_ru=ex.name_ru,
-            description=ex.description,
-            description_ru=ex.description_ru,
-            tags=ex.tags or [],
-            difficulty=ex.difficulty,
-            base_xp=ex.base_xp,
-            required_level=ex.required_level,
-            equipment=ex.equipment,
-            is_timed=ex.is_timed,
-            gif_url=ex.gif_url,
-            thumbnail_url=ex.thumbnail_url,
-            category_slug=ex.category.slug if ex.category else "",
-            is_favorite=is_favorite,
-        )
-        response_items.append(ex_response)
+    positions = catalog.filter(
+        category=category,
+        tags=tags.split(",") if tags else None,
+        difficulty=difficulty,
+        max_level=max_level,
+        exercise_ids=favorite_ids if favorites_only else None,
+    )
+    total = len(positions)
 
     return PaginatedResponse(
-        items=response_items,
+        items=catalog.page(positions, skip, limit, favorite_ids),
         total=total,
         skip=skip,
         limit=limit,
@@ -211,8 +152,8 @@ async def get_exercises(
 )
 async def get_exercise(
     slug: str,
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     result = await session.execute(
         select(Exercise)
@@ -289,8 +230,8 @@ async def get_exercise(
 )
 async def get_exercise_progress(
     slug: str,
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     # First get the exercise
     exercise_result = await session.execute(
@@ -328,88 +269,52 @@ async def get_exercise_progress(
     )
 
 
-# Routine models and endpoints
-# Note: RoutineExerciseResponse and RoutineResponse are imported from schemas
-# But we need a different structure for the routines endpoint
-# So we'll create local models for this specific use case
-class RoutineExerciseData(BaseModel):
-    slug: str
-    reps: int | None = None
-    duration: int | None = None  # duration in seconds
-
+# Predefined routines (served from the in-memory registry, with ETag)
 
-class RoutineData(BaseModel):
-    slug: str
-    name: str
-    description: str
-    category: str  # morning, home, pullup-bar, dip-bars
-    duration_minutes: int
-    difficulty: int
-    exercises: list[RoutineExerciseData]
+def _not_modified(request: Request, etag: str) -> Response | None:
+    """304 response if the client already has this version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
 
 
 @router.get("/routines/all", response_model=list[RoutineData])
 async def get_routines(
+    request: Request,
+    response: Response,
     category: str | None = Query(
         None,
         description="Filter by category: morning, home, pullup-bar, dip-bars"
     )
 ):
     """Get all available workout routines from all categories."""
-    routines = load_all_routines()
+    etag = routine_registry.current_etag()
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
 
-    if category:
-        routines = [r for r in routines if r.get("category") == category]
-
-    return [
-        RoutineData(
-            slug=r["slug"],
-            name=r["name"],
-            description=r["description"],
-            category=r.get("category", "morning"),
-            duration_minutes=r["duration_minutes"],
-            difficulty=r["difficulty"],
-            exercises=[
-                RoutineExerciseData(
-                    slug=ex["slug"],
-                    reps=ex.get("reps"),
-                    duration=ex.get("duration"),
-                )
-                for ex in r["exercises"]
-            ],
-        )
-        for r in routines
-    ]
+    response.headers["ETag"] = etag
+    return list(routine_registry.all(category))
 
 
 @router.get("/routines/{slug}", response_model=RoutineData)
-async def get_routine(slug: str):
+async def get_routine(slug: str, request: Request, response: Response):
     """Get a specific routine by slug."""
-    routines = load_all_routines()
-
-    for r in routines:
-        if r["slug"] == slug:
-            return RoutineData(
-                slug=r["slug"],
-                name=r["name"],
-                description=r["description"],
-                category=r.get("category", "morning"),
-                duration_minutes=r["duration_minutes"],
-                difficulty=r["difficulty"],
-                exercises=[
-                    RoutineExerciseData(
-                        slug=ex["slug"],
-                        reps=ex.get("reps"),
-                        duration=ex.get("duration"),
-                    )
-                    for ex in r["exercises"]
-                ],
-            )
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="Routine not found",
-    )
+    routine = routine_registry.get(slug)
+    if routine is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Routine not found",
+        )
+
+    etag = routine_registry.current_etag()
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    response.headers["ETag"] = etag
+    return routine
 
 
 # ============== Favorites API ==============
@@ -458,8 +363,8 @@ async def toggle_favorite(
 
 @router.get("/favorites/list", response_model=list[int])
 async def get_favorite_ids(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     """Get list of favorite exercise IDs for the current user."""
     result = await session.execute(
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, status
 from sqlalchemy import select, or_
 
-from app.api.deps import AsyncSessionDep, CurrentUser
-from app.db.models import User, Friendship, Notification
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
+from app.db.models import User, Friendship
 from app.services.notifications import (
-    send_friend_request_notification, send_friend_accepted_notification
+    build_friend_request_text,
+    build_friend_accepted_text,
+    save_notification,
 )
+from app.services.notification_outbox import enqueue_push
 from app.schemas import FriendResponse, AddFriendRequest
 
 router = APIRouter()
@@ -19,8 +22,8 @@ router = APIRouter()
     tags=["Friends"]
 )
 async def get_friends(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     status_filter: str = Query(
         "accepted",
         description="Фильтр по статусу: accepted, pending, all"
@@ -62,8 +65,8 @@ async def get_friends(
     tags=["Friends"]
 )
 async def get_friend_requests(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     """Get pending friend requests (where someone added current user)."""
     result = await session.execute(
@@ -95,7 +98,6 @@ async def add_friend(
     request: AddFriendRequest,
     session: AsyncSessionDep,
     user: CurrentUser,
-    background_tasks: BackgroundTasks,
 ):
     """Send friend request."""
     if not request.user_id and not request.username:
@@ -151,24 +153,19 @@ async def add_friend(
     session.add(friendship)
     await session.flush()
 
-    # Send notification to target user in background
+    # Queue Telegram push to target user (sent by the outbox job after commit)
     from_name = user.username or user.first_name or "Пользователь"
-    background_tasks.add_task(
-        send_friend_request_notification,
-        telegram_id=target_user.telegram_id,
-        from_user_name=from_name,
-    )
+    enqueue_push(session, target_user.telegram_id, build_friend_request_text(from_name))
 
     # Save notification to database for badge counter
-    notification = Notification(
+    await save_notification(
+        session,
         user_id=target_user.id,
         notification_type="friend_request",
         title="Новая заявка в друзья!",
         message=f"{from_name} хочет добавить тебя в друзья.",
         related_user_id=user.id,
     )
-    session.add(notification)
-    await session.flush()
 
     return FriendResponse(
         id=friendship.id,
@@ -188,7 +185,6 @@ async def accept_friend_request(
     friendship_id: int,
     session: AsyncSessionDep,
     user: CurrentUser,
-    background_tasks: BackgroundTasks,
 ):
     """Accept a friend request."""
     result = await session.execute(
@@ -225,23 +221,19 @@ async def accept_friend_request(
     await session.flush()
 
     # Notify the original requester that their request was accepted
+    # (queued, sent by the outbox job after commit)
     accepter_name = user.username or user.first_name or "Пользователь"
-    background_tasks.add_task(
-        send_friend_accepted_notification,
-        telegram_id=friend_user.telegram_id,
-        friend_name=accepter_name,
-    )
+    enqueue_push(session, friend_user.telegram_id, build_friend_accepted_text(accepter_name))
 
     # Save notification to database for badge counter
-    notification = Notification(
+    await save_notification(
+        session,
         user_id=friend_user.id,
         notification_type="friend_accepted",
         title="Заявка принята!",
         message=f"{accepter_name} теперь твой друг.",
         related_user_id=user.id,
     )
-    session.add(notification)
-    await session.flush()
 
     return FriendResponse(
         id=reverse.id,
@@ -299,8 +291,8 @@ async def remove_friend(
 
 @router.get("/search", response_model=list[FriendResponse])
 async def search_users(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     q: str = Query(..., min_length=2, description="Search query (username or name)"),
     limit: int = Query(10, ge=1, le=50),
 ):
@@ -2,7 +2,7 @@ from datetime import date, datetime, timedelta
 from fastapi import APIRouter, HTTPException, Query, status
 from sqlalchemy import select
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
 from app.db.models import UserGoal
 from app.schemas import CreateGoalRequest, GoalResponse
 
@@ -17,8 +17,8 @@ router = APIRouter()
     tags=["Goals"]
 )
 async def get_goals(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     active_only: bool = Query(True, description="Показывать только активные цели"),
 ):
     query = select(UserGoal).where(UserGoal.user_id == user.id)
@@ -159,8 +159,8 @@ async def update_goal_progress(
 
 @router.get("/progress", response_model=list[GoalResponse])
 async def get_goals_progress(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     """
     Get detailed progress for all active goals.
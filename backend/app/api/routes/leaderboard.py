@@ -1,16 +1,34 @@
 import logging
-from datetime import datetime, timedelta
 from fastapi import APIRouter, Query
-from sqlalchemy import select, func, and_
+from sqlalchemy import Select, select, and_
 
-from app.api.deps import AsyncSessionDep, CurrentUser
-from app.db.models import User, WorkoutSession, Friendship
+from app.api.deps import ReadSessionDep, ReadCurrentUser
+from app.db.models import User, Friendship
 from app.schemas import LeaderboardEntry, LeaderboardResponse
+from app.services.leaderboard_index import leaderboard_index
+from app.services.weekly_leaderboard import get_weekly_top, get_weekly_rank
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def friends_leaderboard_query(user_id: int, limit: int = 50) -> Select:
+    """Select the user's accepted friends, most XP first (one JOIN)."""
+    return (
+        select(User)
+        .join(
+            Friendship,
+            and_(
+                Friendship.friend_id == User.id,
+                Friendship.user_id == user_id,
+                Friendship.status == "accepted"
+            )
+        )
+        .order_by(User.total_xp.desc())
+        .limit(limit)
+    )
+
+
 @router.get(
     "",
     response_model=LeaderboardResponse,
@@ -19,38 +37,37 @@ logger = logging.getLogger(__name__)
     tags=["Leaderboard"]
 )
 async def get_global_leaderboard(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     limit: int = Query(50, ge=1, le=100, description="Максимальное количество пользователей в рейтинге"),
 ):
     logger.debug(f"[Leaderboard/Global] Request received: user_id={user.id}, limit={limit}")
 
-    # Debug: count all users
-    count_result = await session.execute(select(func.count(User.id)))
-    total_count = count_result.scalar()
-    logger.debug(f"[Leaderboard] Total users in database: {total_count}")
+    # Ranking comes from the in-memory index; the caller's own row is
+    # always fresh, so their rank reflects their latest XP.
+    await leaderboard_index.ensure_loaded(session)
+    leaderboard_index.update(user.id, user.total_xp)
+
+    top = leaderboard_index.top(limit)
+    top_ids = [user_id for user_id, _ in top]
 
+    # Primary-key lookup for display data of the top users only
     result = await session.execute(
-        select(User)
-        .order_by(User.total_xp.desc())
-        .limit(limit)
+        select(User).where(User.id.in_(top_ids))
     )
-    users = list(result.scalars().all())
-
-    logger.debug(f"[Leaderboard] Found {len(users)} users in query result")
-    for u in users[:3]:  # Log first 3 users for debug
-        logger.debug(f"[Leaderboard] User: id={u.id}, username={u.username}, xp={u.total_xp}")
+    users_by_id = {u.id: u for u in result.scalars().all()}
+    logger.debug(f"[Leaderboard] Index size={len(leaderboard_index)}, top={len(top_ids)}")
 
     entries = []
-    current_user_rank = None
-
-    for rank, u in enumerate(users, 1):
-        is_current = u.id == user.id
-        if is_current:
-            current_user_rank = rank
+    for user_id in top_ids:
+        u = users_by_id.get(user_id)
+        if u is None:
+            # Deleted since the index was loaded
+            leaderboard_index.discard(user_id)
+            continue
 
         entries.append(LeaderboardEntry(
-            rank=rank,
+            rank=len(entries) + 1,
             user_id=u.id,
             username=u.username,
             first_name=u.first_name,
@@ -58,20 +75,12 @@ async def get_global_leaderboard(
             level=u.level,
             total_xp=u.total_xp,
             current_streak=u.current_streak,
-            is_current_user=is_current,
+            is_current_user=u.id == user.id,
         ))
 
-    # If current user is not in top, find their rank
-    if current_user_rank is None:
-        rank_result = await session.execute(
-            select(func.count(User.id))
-            .where(User.total_xp > user.total_xp)
-        )
-        current_user_rank = (rank_result.scalar() or 0) + 1
-
     return LeaderboardResponse(
         entries=entries,
-        current_user_rank=current_user_rank,
+        current_user_rank=leaderboard_index.rank(user.id),
     )
 
 
@@ -83,34 +92,12 @@ async def get_global_leaderboard(
     tags=["Leaderboard"]
 )
 async def get_weekly_leaderboard(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     limit: int = Query(50, ge=1, le=100, description="Максимальное количество пользователей в рейтинге"),
 ):
-    # Calculate week start (Monday)
-    today = datetime.utcnow().date()
-    week_start = today - timedelta(days=today.weekday())
-    week_start_dt = datetime.combine(week_start, datetime.min.time())
-
-    # Subquery to get weekly XP per user
-    weekly_xp_subq = (
-        select(
-            WorkoutSession.user_id,
-            func.sum(WorkoutSession.total_xp_earned).label("weekly_xp")
-        )
-        .where(WorkoutSession.status == "completed")
-        .where(WorkoutSession.finished_at >= week_start_dt)
-        .group_by(WorkoutSession.user_id)
-        .subquery()
-    )
-
-    result = await session.execute(
-        select(User, weekly_xp_subq.c.weekly_xp)
-        .join(weekly_xp_subq, User.id == weekly_xp_subq.c.user_id)
-        .order_by(weekly_xp_subq.c.weekly_xp.desc())
-        .limit(limit)
-    )
-    rows = result.all()
+    # Range read over the materialized (iso_week, xp DESC) buckets
+    rows = await get_weekly_top(session, limit)
 
     entries = []
     current_user_rank = None
@@ -132,6 +119,10 @@ async def get_weekly_leaderboard(
             is_current_user=is_current,
         ))
 
+    # If current user is not on the page, look up their weekly rank
+    if current_user_rank is None:
+        current_user_rank = await get_weekly_rank(session, user.id)
+
     return LeaderboardResponse(
         entries=entries,
         current_user_rank=current_user_rank,
@@ -146,28 +137,13 @@ async def get_weekly_leaderboard(
     tags=["Leaderboard"]
 )
 async def get_friends_leaderboard(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     logger.debug(f"[Leaderboard/Friends] Getting friends leaderboard, user_id={user.id}")
 
     # Optimized: One JOIN query instead of two separate queries
-    # Get friends where current user is the requester
-    stmt = (
-        select(User)
-        .join(
-            Friendship,
-            and_(
-                Friendship.friend_id == User.id,
-                Friendship.user_id == user.id,
-                Friendship.status == "accepted"
-            )
-        )
-        .order_by(User.total_xp.desc())
-        .limit(50)
-    )
-
-    result = await session.execute(stmt)
+    result = await session.execute(friends_leaderboard_query(user.id))
     friends = list(result.scalars().all())
     logger.debug(f"[Leaderboard/Friends] Found {len(friends)} friends via JOIN")
 
@@ -1,15 +1,39 @@
 import logging
-from fastapi import APIRouter, Query
-from sqlalchemy import select, func, update
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import AsyncSessionDep, CurrentUser
-from app.db.models import Notification
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
+from app.config import settings
+from app.db.models import Notification, User
+from app.services.notifications import mark_notifications_read
+from app.services.unread_hub import unread_hub
+from app.utils.pagination import encode_cursor, decode_cursor
 from app.schemas import NotificationResponse, UnreadCountResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def notifications_page_query(user_id: int, limit: int, before_id: int | None = None) -> Select:
+    """
+    Select one keyset page of the user's notifications, newest first.
+
+    Pages over id (ids grow with created_at), served by
+    idx_notifications_user_id. created_at is not unique, so it is not a
+    usable keyset column on its own.
+    """
+    stmt = (
+        select(Notification)
+        .where(Notification.user_id == user_id)
+        .order_by(Notification.id.desc())
+        .limit(limit)
+    )
+    if before_id is not None:
+        stmt = stmt.where(Notification.id < before_id)
+    return stmt
+
+
 @router.get(
     "/unread-count",
     response_model=UnreadCountResponse,
@@ -18,38 +42,93 @@ router = APIRouter()
     tags=["Notifications"]
 )
 async def get_unread_count(
+    # Primary session: the badge must reflect mark-read even with a lagging replica
     user: CurrentUser,
     session: AsyncSessionDep,
 ):
-    result = await session.execute(
-        select(func.count(Notification.id))
-        .where(Notification.user_id == user.id)
-        .where(Notification.is_read == False)
-    )
-    count = result.scalar() or 0
+    # Served from the counter maintained by the notification service
+    count = user.unread_notifications
     logger.debug(f"Unread count for user {user.id}: {count}")
     return UnreadCountResponse(count=count)
 
 
+@router.get(
+    "/unread-count/wait",
+    response_model=UnreadCountResponse,
+    summary="Дождаться изменения счётчика непрочитанных",
+    description=(
+        "Long-poll: отвечает сразу, если счётчик отличается от since, иначе ждёт "
+        "его изменения не дольше timeout секунд и возвращает текущее значение."
+    ),
+    tags=["Notifications"]
+)
+async def wait_unread_count(
+    user: CurrentUser,
+    session: AsyncSessionDep,
+    since: int | None = Query(None, ge=0, description="Значение счётчика, известное клиенту"),
+    timeout: int = Query(25, ge=1, description="Максимальное время ожидания, секунд"),
+):
+    timeout = min(timeout, settings.unread_poll_max_seconds)
+    # Subscribe before reading so a commit in between still wakes us
+    waiter = unread_hub.subscribe(user.id)
+    try:
+        count = await _read_unread_count(session, user.id)
+        if since is None or count != since:
+            return UnreadCountResponse(count=count)
+        # Release the DB connection while waiting
+        await session.commit()
+        await unread_hub.wait(user.id, waiter, timeout)
+    finally:
+        unread_hub.unsubscribe(user.id, waiter)
+
+    # Re-read even on timeout: changes committed by other workers do not
+    # wake this one
+    count = await _read_unread_count(session, user.id)
+    return UnreadCountResponse(count=count)
+
+
+async def _read_unread_count(session: AsyncSession, user_id: int) -> int:
+    result = await session.execute(
+        select(User.unread_notifications).where(User.id == user_id)
+    )
+    return result.scalar() or 0
+
+
 @router.get(
     "",
     response_model=list[NotificationResponse],
     summary="Получить уведомления",
-    description="Возвращает список уведомлений пользователя, отсортированных по дате создания (новые первыми).",
+    description=(
+        "Возвращает список уведомлений пользователя, отсортированных по дате создания (новые первыми). "
+        "Если есть следующая страница, её курсор возвращается в заголовке X-Next-Cursor."
+    ),
     tags=["Notifications"]
 )
 async def get_notifications(
-    user: CurrentUser,
-    session: AsyncSessionDep,
+    user: ReadCurrentUser,
+    session: ReadSessionDep,
+    response: Response,
     limit: int = Query(20, ge=1, le=100, description="Максимальное количество уведомлений"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы (заголовок X-Next-Cursor)"),
 ):
-    result = await session.execute(
-        select(Notification)
-        .where(Notification.user_id == user.id)
-        .order_by(Notification.created_at.desc())
-        .limit(limit)
-    )
+    before_id = None
+    if cursor:
+        try:
+            (before_id,) = decode_cursor(cursor, int)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
+    result = await session.execute(notifications_page_query(user.id, limit + 1, before_id))
     notifications = result.scalars().all()
+
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.id)
+
     logger.debug(f"Get notifications for user {user.id}: found {len(notifications)}")
     return [NotificationResponse.model_validate(n) for n in notifications]
 
@@ -60,12 +139,7 @@ async def mark_all_read(
     session: AsyncSessionDep,
 ):
     """Mark all notifications as read."""
-    await session.execute(
-        update(Notification)
-        .where(Notification.user_id == user.id)
-        .where(Notification.is_read == False)
-        .values(is_read=True)
-    )
+    await mark_notifications_read(session, user.id)
     await session.commit()
     return {"status": "ok"}
 
@@ -77,11 +151,6 @@ async def mark_notification_read(
     session: AsyncSessionDep,
 ):
     """Mark specific notification as read."""
-    await session.execute(
-        update(Notification)
-        .where(Notification.id == notification_id)
-        .where(Notification.user_id == user.id)
-        .values(is_read=True)
-    )
+    await mark_notifications_read(session, user.id, notification_id)
     await session.commit()
     return {"status": "ok"}
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Query, status
 from sqlalchemy import select
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
 from app.db.models import ShopItem, UserPurchase
 from app.schemas import ShopItemResponse, InventoryItemResponse
 
@@ -16,8 +16,8 @@ router = APIRouter()
     tags=["Shop"]
 )
 async def get_shop_items(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
     item_type: str | None = Query(
         None, description="Фильтр по типу товара"
     ),
@@ -132,8 +132,8 @@ async def purchase_item(
 
 @router.get("/inventory", response_model=list[InventoryItemResponse])
 async def get_inventory(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     """Get user's purchased items."""
     result = await session.execute(
@@ -1,15 +1,14 @@
-from datetime import date, timedelta
-from fastapi import APIRouter, HTTPException, status
-from sqlalchemy import select, func
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlalchemy import select
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
 from app.db.models import (
     User,
-    WorkoutSession,
-    UserAchievement,
     UserAvatarPurchase,
 )
-from app.services.xp_calculator import xp_for_level
+from app.services.xp_calculator import get_level_progress
+from app.services.user_stats import get_user_stats, get_week_counters
+from app.services.profiles import get_profile_card, get_profile_cards
 from app.schemas import (
     UserResponse,
     UserStatsResponse,
@@ -18,11 +17,6 @@ from app.schemas import (
 )
 
 
-def get_week_start(d: date) -> date:
-    """Get Monday of the current week."""
-    return d - timedelta(days=d.weekday())
-
-
 # Avatar prices and requirements (must match frontend)
 AVATAR_DATA = {
     # Free avatars
@@ -43,6 +37,9 @@ AVATAR_DATA = {
     'titan': {'price': 1500, 'required_level': 25},
 }
 
+# Most profile cards returned by GET /users/profiles
+MAX_PROFILE_BATCH = 100
+
 
 router = APIRouter()
 
@@ -54,7 +51,7 @@ router = APIRouter()
     description="Возвращает полную информацию о текущем аутентифицированном пользователе.",
     tags=["Users"]
 )
-async def get_current_user_profile(user: CurrentUser):
+async def get_current_user_profile(user: ReadCurrentUser):
     return UserResponse.model_validate(user)
 
 
@@ -66,8 +63,8 @@ async def get_current_user_profile(user: CurrentUser):
     tags=["Users"]
 )
 async def get_purchased_avatars(
-    user: CurrentUser,
-    session: AsyncSessionDep,
+    user: ReadCurrentUser,
+    session: ReadSessionDep,
 ):
     result = await session.execute(
         select(UserAvatarPurchase.avatar_id)
@@ -169,82 +166,28 @@ async def complete_onboarding(
     tags=["Users"]
 )
 async def get_current_user_stats(
+    # Primary session: a missing rollup is rebuilt and persisted here
     user: CurrentUser,
     session: AsyncSessionDep,
 ):
-    # Total workouts
-    workouts_result = await session.execute(
-        select(func.count(WorkoutSession.id))
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-    )
-    total_workouts = workouts_result.scalar() or 0
-
-    # Total reps
-    reps_result = await session.execute(
-        select(func.sum(WorkoutSession.total_reps))
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-    )
-    total_reps = reps_result.scalar() or 0
-
-    # Total workout time (sum of duration_seconds, convert to minutes)
-    time_result = await session.execute(
-        select(func.sum(WorkoutSession.duration_seconds))
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-        .where(WorkoutSession.duration_seconds.isnot(None))
-    )
-    total_time_seconds = time_result.scalar() or 0
-    total_time_minutes = total_time_seconds // 60
-
-    # Achievements count
-    achievements_result = await session.execute(
-        select(func.count(UserAchievement.id))
-        .where(UserAchievement.user_id == user.id)
-    )
-    achievements_count = achievements_result.scalar() or 0
-
-    # This week stats
-    week_start = get_week_start(date.today())
-    week_workouts_result = await session.execute(
-        select(func.count(WorkoutSession.id))
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-        .where(func.date(WorkoutSession.started_at) >= week_start)
-    )
-    this_week_workouts = week_workouts_result.scalar() or 0
-
-    week_xp_result = await session.execute(
-        select(func.sum(WorkoutSession.total_xp_earned))
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-        .where(func.date(WorkoutSession.started_at) >= week_start)
-    )
-    this_week_xp = week_xp_result.scalar() or 0
+    # Single primary-key read of the maintained rollup
+    stats = await get_user_stats(session, user.id)
+    this_week_workouts, this_week_xp = get_week_counters(stats)
 
     # Level progress
-    current_level = user.level
-    current_level_xp = xp_for_level(current_level)
-    next_level_xp = xp_for_level(current_level + 1)
-    xp_in_current_level = user.total_xp - current_level_xp
-    xp_needed_for_level = next_level_xp - current_level_xp
-    if xp_needed_for_level > 0:
-        xp_progress_percent = (xp_in_current_level / xp_needed_for_level) * 100
-    else:
-        xp_progress_percent = 0
+    progress = get_level_progress(user.total_xp, user.level)
 
     return UserStatsResponse(
-        total_workouts=total_workouts,
+        total_workouts=stats.total_workouts,
         total_xp=user.total_xp,
-        total_reps=total_reps,
-        total_time_minutes=total_time_minutes,
-        current_level=current_level,
-        xp_for_next_level=next_level_xp,
-        xp_progress_percent=min(xp_progress_percent, 100),
+        total_reps=stats.total_reps,
+        total_time_minutes=stats.total_duration_seconds // 60,
+        current_level=progress.level,
+        xp_for_next_level=progress.xp_ceiling,
+        xp_progress_percent=progress.progress_percent,
         current_streak=user.current_streak,
         max_streak=user.max_streak,
-        achievements_count=achievements_count,
+        achievements_count=stats.achievements_count,
         coins=user.coins,
         this_week_workouts=this_week_workouts,
         this_week_xp=this_week_xp,
@@ -253,11 +196,41 @@ async def get_current_user_stats(
 
 
 
+@router.get(
+    "/profiles",
+    response_model=list[UserProfileResponse],
+    summary="Получить профили нескольких пользователей",
+    description=(
+        "Возвращает профили пользователей (достижения и статус дружбы) по списку ID "
+        "через запятую, например `?ids=1,2,3`. Несуществующие ID пропускаются."
+    ),
+    tags=["Users"]
+)
+async def get_user_profiles(
+    session: ReadSessionDep,
+    current_user: ReadCurrentUser,
+    ids: str = Query(..., description="ID пользователей через запятую"),
+):
+    try:
+        user_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma-separated list of integers",
+        )
+    if len(user_ids) > MAX_PROFILE_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_PROFILE_BATCH} ids per request",
+        )
+    return await get_profile_cards(session, current_user.id, user_ids)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: int,
-    session: AsyncSessionDep,
-    current_user: CurrentUser,  # Require auth to view profiles
+    session: ReadSessionDep,
+    current_user: ReadCurrentUser,  # Require auth to view profiles
 ):
     """Get user profile by ID (public info only)."""
     result = await session.execute(
@@ -277,77 +250,16 @@ async def get_user_by_id(
 @router.get("/{user_id}/profile", response_model=UserProfileResponse)
 async def get_user_profile(
     user_id: int,
-    session: AsyncSessionDep,
-    current_user: CurrentUser,
+    session: ReadSessionDep,
+    current_user: ReadCurrentUser,
 ):
     """Get user profile with achievements and friendship status."""
-    from app.db.models import Friendship
+    profile = await get_profile_card(session, current_user.id, user_id)
 
-    # Get user
-    result = await session.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
-
-    if not user:
+    if not profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    # Get unlocked achievements
-    achievements_result = await session.execute(
-        select(UserAchievement.achievement_slug)
-        .where(UserAchievement.user_id == user_id)
-    )
-    achievements = [row[0] for row in achievements_result.all()]
-
-    # Check friendship status
-    # For accepted friendships, there are 2 records (bidirectional).
-    # For pending, only 1 record exists (from requester to target).
-    is_friend = False
-    friend_request_sent = False
-    friend_request_received = False
-    friendship_id = None
-
-    if current_user.id != user_id:
-        # Check friendship from current user's side (I → them)
-        friendship_result = await session.execute(
-            select(Friendship)
-            .where(Friendship.user_id == current_user.id)
-            .where(Friendship.friend_id == user_id)
-        )
-        friendship = friendship_result.scalar_one_or_none()
-
-        if friendship:
-            is_friend = friendship.status == "accepted"
-            friend_request_sent = friendship.status == "pending"
-            friendship_id = friendship.id
-        else:
-            # Check reverse direction (them → me)
-            reverse_result = await session.execute(
-                select(Friendship)
-                .where(Friendship.user_id == user_id)
-                .where(Friendship.friend_id == current_user.id)
-                .where(Friendship.status == "pending")
-            )
-            reverse_friendship = reverse_result.scalar_one_or_none()
-            if reverse_friendship:
-                friend_request_received = True
-                friendship_id = reverse_friendship.id
-
-    return UserProfileResponse(
-        id=user.id,
-        username=user.username,
-        first_name=user.first_name,
-        avatar_id=user.avatar_id or "shadow-wolf",
-        level=user.level,
-        total_xp=user.total_xp,
-        coins=user.coins,
-        current_streak=user.current_streak,
-        achievements=achievements,
-        is_friend=is_friend,
-        friend_request_sent=friend_request_sent,
-        friend_request_received=friend_request_received,
-        friendship_id=friendship_id,
-    )
+    return profile
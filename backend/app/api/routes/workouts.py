@@ -1,12 +1,13 @@
 from datetime import datetime, date, timedelta
 from fastapi import APIRouter, HTTPException, Query, status
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func, or_, and_
 from sqlalchemy.orm import selectinload
 
-from app.api.deps import AsyncSessionDep, CurrentUser
+from app.api.deps import AsyncSessionDep, CurrentUser, ReadSessionDep, ReadCurrentUser
 from app.db.models import (
     WorkoutSession,
     WorkoutExercise,
+    UserStats,
 )
 from app.services.xp_calculator import (
     get_streak_multiplier,
@@ -16,6 +17,7 @@ from app.services.workout_processor import (
     WorkoutCompletionData,
     ExerciseSetData as ProcessorExerciseSetData,
 )
+from app.utils.pagination import encode_cursor, decode_cursor
 from app.schemas import (
     CompleteWorkoutRequest,
     WorkoutExerciseResponse,
@@ -28,6 +30,83 @@ from app.schemas import (
 router = APIRouter()
 
 
+def active_workout_query(user_id: int) -> Select:
+    """Select the user's active workouts."""
+    return (
+        select(WorkoutSession)
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "active")
+    )
+
+
+def workout_history_query(
+    user_id: int,
+    limit: int,
+    after: tuple[datetime, int] | None = None,
+) -> Select:
+    """
+    Select one keyset page of completed workouts, newest first.
+
+    Served by idx_workout_sessions_user_status_finished.
+
+    Args:
+        user_id: Owner of the workouts
+        limit: Page size
+        after: (finished_at, id) of the last workout of the previous page
+    """
+    stmt = (
+        select(WorkoutSession)
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "completed")
+        .order_by(WorkoutSession.finished_at.desc(), WorkoutSession.id.desc())
+        .limit(limit)
+    )
+    if after is not None:
+        finished_at, workout_id = after
+        stmt = stmt.where(or_(
+            WorkoutSession.finished_at < finished_at,
+            and_(WorkoutSession.finished_at == finished_at, WorkoutSession.id < workout_id),
+        ))
+    return stmt
+
+
+def today_stats_query(user_id: int, day: date) -> Select:
+    """
+    Select (workouts, xp, reps, duration, distinct exercises) of the user's
+    completed workouts on the given day in one aggregate.
+
+    Served by idx_workout_sessions_user_status_finished.
+    """
+    day_start = datetime.combine(day, datetime.min.time())
+    next_day_start = day_start + timedelta(days=1)
+
+    day_workouts = (
+        select(WorkoutSession.id)
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "completed")
+        .where(WorkoutSession.finished_at >= day_start)
+        .where(WorkoutSession.finished_at < next_day_start)
+    )
+    exercises_done = (
+        select(func.count(func.distinct(WorkoutExercise.exercise_id)))
+        .where(WorkoutExercise.workout_session_id.in_(day_workouts))
+        .scalar_subquery()
+    )
+    return (
+        select(
+            func.count(WorkoutSession.id),
+            func.coalesce(func.sum(WorkoutSession.total_xp_earned), 0),
+            func.coalesce(func.sum(WorkoutSession.total_reps), 0),
+            func.coalesce(func.sum(WorkoutSession.total_duration_seconds), 0),
+            exercises_done,
+        )
+        .where(WorkoutSession.user_id == user_id)
+        .where(WorkoutSession.status == "completed")
+        .where(WorkoutSession.finished_at >= day_start)
+        .where(WorkoutSession.finished_at < next_day_start)
+    )
+
+
 def _make_exercise_response(we: WorkoutExercise) -> WorkoutExerciseResponse:
     """Helper to create WorkoutExerciseResponse from WorkoutExercise model."""
     return WorkoutExerciseResponse(
@@ -70,16 +149,14 @@ def _make_workout_response(workout: WorkoutSession) -> WorkoutResponse:
     tags=["Workouts"]
 )
 async def get_active_workout(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     result = await session.execute(
-        select(WorkoutSession)
+        active_workout_query(user.id)
         .options(
             selectinload(WorkoutSession.exercises).selectinload(WorkoutExercise.exercise)
         )
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "active")
     )
     workout = result.scalar_one_or_none()
 
@@ -103,9 +180,7 @@ async def start_workout(
 ):
     # Check if there's an active workout
     active_result = await session.execute(
-        select(WorkoutSession)
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "active")
+        active_workout_query(user.id)
     )
     active_workout = active_result.scalar_one_or_none()
 
@@ -149,11 +224,11 @@ async def start_workout(
     )
 
 
-@router.get("/{workout_id}", response_model=WorkoutResponse)
+@router.get("/{workout_id:int}", response_model=WorkoutResponse)
 async def get_workout(
     workout_id: int,
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
     """Get workout details."""
     result = await session.execute(
@@ -179,7 +254,7 @@ async def get_workout(
 # Use POST /workouts/submit instead
 
 
-@router.delete("/{workout_id}")
+@router.delete("/{workout_id:int}")
 async def cancel_workout(
     workout_id: int,
     session: AsyncSessionDep,
@@ -246,9 +321,7 @@ async def submit_workout(
 
     # Cancel any stale active workouts
     active_result = await session.execute(
-        select(WorkoutSession)
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "active")
+        active_workout_query(user.id)
     )
     for old_workout in active_result.scalars().all():
         old_workout.status = "cancelled"
@@ -295,44 +368,61 @@ async def submit_workout(
     "/history",
     response_model=PaginatedResponse[WorkoutResponse],
     summary="История тренировок",
-    description="Возвращает историю завершённых тренировок пользователя с пагинацией.",
+    description="Возвращает историю завершённых тренировок пользователя с пагинацией по курсору (next_cursor).",
     tags=["Workouts"]
 )
 async def get_workout_history(
-    session: AsyncSessionDep,
-    user: CurrentUser,
-    skip: int = Query(0, ge=0, description="Количество пропущенных элементов"),
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
+    cursor: str | None = Query(None, description="Курсор следующей страницы (next_cursor из предыдущего ответа)"),
+    skip: int = Query(0, ge=0, description="Количество пропущенных элементов (устарело, используйте cursor)"),
     limit: int = Query(20, ge=1, le=100, description="Максимальное количество элементов для возврата"),
 ):
-    # Count total workouts
-    count_stmt = (
-        select(func.count(WorkoutSession.id))
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-    )
-    total_result = await session.execute(count_stmt)
-    total = total_result.scalar() or 0
-
-    # Get paginated workouts
-    result = await session.execute(
-        select(WorkoutSession)
-        .options(
-            selectinload(WorkoutSession.exercises).selectinload(WorkoutExercise.exercise)
+    # Total from the maintained rollup; count only if it was never built
+    stats = await session.get(UserStats, user.id)
+    if stats is not None:
+        total = stats.total_workouts
+    else:
+        total_result = await session.execute(
+            select(func.count(WorkoutSession.id))
+            .where(WorkoutSession.user_id == user.id)
+            .where(WorkoutSession.status == "completed")
         )
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-        .order_by(WorkoutSession.finished_at.desc())
-        .offset(skip)
-        .limit(limit)
+        total = total_result.scalar() or 0
+
+    # Keyset page over (finished_at, id)
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime, int)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+    stmt = workout_history_query(user.id, limit + 1, after).options(
+        selectinload(WorkoutSession.exercises).selectinload(WorkoutExercise.exercise)
     )
+    if after is None and skip:
+        stmt = stmt.offset(skip)
+
+    result = await session.execute(stmt)
     workouts = result.scalars().all()
 
+    has_more = len(workouts) > limit
+    workouts = workouts[:limit]
+    next_cursor = None
+    if has_more:
+        last = workouts[-1]
+        next_cursor = encode_cursor(last.finished_at, last.id)
+
     return PaginatedResponse(
         items=[_make_workout_response(w) for w in workouts],
         total=total,
         skip=skip,
         limit=limit,
-        has_more=skip + limit < total,
+        has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
@@ -344,37 +434,17 @@ async def get_workout_history(
     tags=["Workouts"]
 )
 async def get_today_stats(
-    session: AsyncSessionDep,
-    user: CurrentUser,
+    session: ReadSessionDep,
+    user: ReadCurrentUser,
 ):
-    today = date.today()
-    today_start = datetime.combine(today, datetime.min.time())
-    today_end = datetime.combine(today, datetime.max.time())
-
-    # Count today's completed workouts
-    workouts_result = await session.execute(
-        select(WorkoutSession)
-        .where(WorkoutSession.user_id == user.id)
-        .where(WorkoutSession.status == "completed")
-        .where(WorkoutSession.finished_at >= today_start)
-        .where(WorkoutSession.finished_at <= today_end)
-    )
-    workouts = workouts_result.scalars().all()
-
-    total_xp = sum(w.total_xp_earned for w in workouts)
-    total_reps = sum(w.total_reps for w in workouts)
-    total_duration = sum(w.total_duration_seconds for w in workouts)
-
-    # Count unique exercises
-    exercise_ids = set()
-    for w in workouts:
-        for we in w.exercises:
-            exercise_ids.add(we.exercise_id)
+    # One aggregate over today's completed workouts
+    result = await session.execute(today_stats_query(user.id, date.today()))
+    workouts_count, total_xp, total_reps, total_duration, exercises_done = result.one()
 
     return TodayStatsResponse(
-        workouts_count=len(workouts),
+        workouts_count=workouts_count,
         total_xp=total_xp,
         total_reps=total_reps,
         total_duration_seconds=total_duration,
-        exercises_done=len(exercise_ids),
+        exercises_done=exercises_done or 0,
     )
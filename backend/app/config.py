@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from functools import lru_cache
@@ -19,6 +20,26 @@ class Settings(BaseSettings):
     # Database (use absolute path to ensure bot and API use same DB)
     database_url: str = f"sqlite+aiosqlite:///{DEFAULT_DB_PATH}"
 
+    # Optional read replica for GET endpoints (may lag behind the primary)
+    database_read_url: str = ""
+
+    # Engine profile: "" = pick from database_url, or "sqlite", "postgresql", "default"
+    db_profile: str = ""
+
+    # sqlite profile pragmas
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 20000
+
+    # postgresql profile pool and asyncpg prepared statement cache
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_statement_cache_size: int = 500
+
     # Mini App URL
     mini_app_url: str = "https://stepaproject.ru/bodyweight"
 
@@ -28,6 +49,47 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"  # DEBUG, INFO, WARNING, ERROR
 
+    # Leaderboard index resync interval (minutes)
+    leaderboard_refresh_minutes: int = 5
+
+    # Weekly leaderboard buckets to keep (current week included)
+    weekly_xp_keep_weeks: int = 4
+
+    # Response cache: per-worker LRU size and optional shared tier
+    # shared by all workers ("" = none, "memory", "sqlite")
+    cache_max_entries: int = 1024
+    cache_backend: str = ""
+    # Disposable, so it lives in the temp directory, not the source tree
+    cache_sqlite_path: str = str(Path(tempfile.gettempdir()) / "bodyweight-cache.db")
+
+    # Verified init data / user id cache size (per worker)
+    auth_cache_max_entries: int = 10000
+
+    # Telegram push dispatcher (Bot API allows ~30 msg/s overall, 1 msg/s per chat)
+    push_concurrency: int = 20
+    push_global_rate: float = 25.0
+    push_per_chat_rate: float = 1.0
+    push_max_retries: int = 3
+
+    # Notification outbox drain (friend request/accept pushes)
+    outbox_drain_seconds: int = 10
+    outbox_batch_size: int = 100
+    outbox_max_attempts: int = 5
+
+    # In-app notification retention: days to keep per notification_type
+    # (unlisted types use the default), purged nightly in chunks
+    notification_retention_days: dict[str, int] = {
+        "daily_reminder": 7,
+        "inactivity_reminder": 14,
+        "friend_request": 30,
+        "friend_accepted": 30,
+    }
+    notification_default_retention_days: int = 180
+    notification_purge_batch_size: int = 5000
+
+    # Longest wait for GET /notifications/unread-count/wait (seconds)
+    unread_poll_max_seconds: int = 55
+
     # CORS
     cors_origins: list[str] = ["*"]
 
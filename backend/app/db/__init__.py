@@ -5,6 +5,8 @@ from .models import (
     Exercise,
     WorkoutSession,
     WorkoutExercise,
+    UserStats,
+    UserWeeklyXP,
     UserAchievement,
     UserGoal,
     Friendship,
@@ -12,6 +14,8 @@ from .models import (
     UserPurchase,
     UserAvatarPurchase,
     UserExerciseProgress,
+    NotificationOutbox,
+    AppMetadata,
 )
 
 __all__ = [
@@ -24,6 +28,8 @@ __all__ = [
     "Exercise",
     "WorkoutSession",
     "WorkoutExercise",
+    "UserStats",
+    "UserWeeklyXP",
     "UserAchievement",
     "UserGoal",
     "Friendship",
@@ -31,4 +37,6 @@ __all__ = [
     "UserPurchase",
     "UserAvatarPurchase",
     "UserExerciseProgress",
+    "NotificationOutbox",
+    "AppMetadata",
 ]
@@ -1,18 +1,122 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import logging
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 from typing import AsyncGenerator
 
 from app.config import settings
+from app.db.upsert import check_upsert_support
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-async_engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-)
+def get_engine_profile(database_url: str) -> str:
+    """
+    Engine profile for the URL: settings.db_profile if set, otherwise
+    picked from the dialect ("sqlite", "postgresql" or "default").
+    """
+    if settings.db_profile:
+        return settings.db_profile
+    dialect = make_url(database_url).get_backend_name()
+    return dialect if dialect in ("sqlite", "postgresql") else "default"
+
+
+def get_sqlite_pragmas() -> dict[str, str | int]:
+    """Per-connection pragmas of the sqlite profile."""
+    return {
+        # WAL lets readers run while /workouts/submit writes
+        "journal_mode": settings.sqlite_journal_mode,
+        # Durable at checkpoints only; safe with WAL, far fewer fsyncs
+        "synchronous": settings.sqlite_synchronous,
+        # Wait for the write lock instead of failing with "database is locked"
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": -settings.sqlite_cache_size_kib,
+        "temp_store": "MEMORY",
+    }
+
+
+def _is_sqlite_file(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def build_engine(database_url: str, read_only: bool = False) -> AsyncEngine:
+    """
+    Create the async engine with the settings of its profile.
+
+    - sqlite: WAL, synchronous=NORMAL, busy timeout, mmap and page cache
+      pragmas applied on every new connection
+    - postgresql: sized pool with pre-ping and recycle, asyncpg prepared
+      statement cache
+    - default: SQLAlchemy defaults
+
+    With read_only, SQLite connections are opened with query_only=ON.
+
+    Raises:
+        ValueError: If the database has no ON CONFLICT upsert support
+    """
+    profile = get_engine_profile(database_url)
+    url = make_url(database_url)
+    check_upsert_support(url.get_backend_name())
+    kwargs: dict = {"echo": settings.debug}
+
+    if profile == "postgresql":
+        if url.get_driver_name() == "asyncpg" and "prepared_statement_cache_size" not in url.query:
+            url = url.update_query_dict(
+                {"prepared_statement_cache_size": str(settings.db_statement_cache_size)}
+            )
+        kwargs.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+        )
+
+    engine = create_async_engine(url, **kwargs)
+
+    if profile == "sqlite" and _is_sqlite_file(database_url):
+        pragmas = get_sqlite_pragmas()
+        if read_only:
+            pragmas["query_only"] = "ON"
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return engine
+
+
+async def get_engine_report(engine: AsyncEngine) -> str:
+    """One-line description of the active engine profile (logged at startup)."""
+    profile = get_engine_profile(str(engine.url))
+    parts = [f"profile={profile}", f"dialect={engine.dialect.name}"]
+
+    if profile == "sqlite":
+        async with engine.connect() as conn:
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size"):
+                value = (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                parts.append(f"{name}={value}")
+    elif profile == "postgresql":
+        parts.append(
+            f"pool_size={settings.db_pool_size} max_overflow={settings.db_max_overflow} "
+            f"recycle={settings.db_pool_recycle}s pre_ping=on "
+            f"statement_cache={settings.db_statement_cache_size}"
+        )
+    return " ".join(parts)
+
+
+async_engine = build_engine(settings.database_url)
 
 async_session_maker = async_sessionmaker(
     async_engine,
@@ -21,6 +125,38 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def build_read_engine() -> AsyncEngine:
+    """
+    Engine for read-only requests: the replica at database_read_url if set,
+    a separate connection pool on the same file for SQLite (WAL readers do
+    not wait for the writer), otherwise the primary engine.
+    """
+    if settings.database_read_url:
+        return build_engine(settings.database_read_url, read_only=True)
+    if _is_sqlite_file(settings.database_url):
+        return build_engine(settings.database_url, read_only=True)
+    return async_engine
+
+
+read_engine = build_read_engine()
+
+read_session_maker = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only endpoints: never flushed or committed; the
+    transaction is discarded when the connection returns to the pool.
+    """
+    async with read_session_maker() as session:
+        yield session
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         try:
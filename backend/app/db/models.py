@@ -16,8 +16,8 @@ from sqlalchemy import (
     CheckConstraint,
     JSON,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy.sql import func, text
 
 from .database import Base
 
@@ -44,8 +44,15 @@ class User(Base):
 
     # Settings
     notification_time: Mapped[time | None] = mapped_column(Time)
+    # Hour of notification_time, kept in sync by _sync_notification_hour;
+    # indexed so the hourly reminder job reads only its bucket
+    notification_hour: Mapped[int | None] = mapped_column(Integer)
     notifications_enabled: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    # Unread in-app notifications; maintained by the notification service
+    # so the badge never has to count the notifications table
+    unread_notifications: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     # Onboarding
     is_onboarded: Mapped[bool] = mapped_column(Boolean, default=False)
 
@@ -62,6 +69,18 @@ class User(Base):
     favorite_exercises: Mapped[list["UserFavoriteExercise"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     custom_routines: Mapped[list["UserCustomRoutine"]] = relationship(back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Hourly daily-reminder bucket
+        Index("idx_users_notification_hour_enabled", "notification_hour", "notifications_enabled"),
+        # Inactivity reminders
+        Index("idx_users_enabled_last_workout", "notifications_enabled", "last_workout_date"),
+    )
+
+    @validates("notification_time")
+    def _sync_notification_hour(self, key: str, value: time | None) -> time | None:
+        self.notification_hour = value.hour if value is not None else None
+        return value
+
 
 class ExerciseCategory(Base):
     __tablename__ = "exercise_categories"
@@ -153,6 +172,16 @@ class WorkoutSession(Base):
     user: Mapped["User"] = relationship(back_populates="workout_sessions")
     exercises: Mapped[list["WorkoutExercise"]] = relationship(back_populates="workout_session", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of history: WHERE user_id, status ORDER BY finished_at DESC, id DESC
+        Index(
+            "idx_workout_sessions_user_status_finished",
+            "user_id", "status", text("finished_at DESC"), text("id DESC"),
+        ),
+        # Weekly leaderboard rebuild: WHERE status AND finished_at >= week start
+        Index("idx_workout_sessions_status_finished", "status", "finished_at"),
+    )
+
 
 class WorkoutExercise(Base):
     __tablename__ = "workout_exercises"
@@ -175,6 +204,42 @@ class WorkoutExercise(Base):
     exercise: Mapped["Exercise"] = relationship()
 
 
+class UserStats(Base):
+    """Denormalized per-user stats rollup, maintained on workout completion."""
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    # Lifetime totals (completed workouts only)
+    total_workouts: Mapped[int] = mapped_column(Integer, default=0)
+    total_reps: Mapped[int] = mapped_column(Integer, default=0)
+    total_duration_seconds: Mapped[int] = mapped_column(Integer, default=0)
+    achievements_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Current ISO-week bucket (Monday of the week the counters belong to)
+    week_start: Mapped[date | None] = mapped_column(Date)
+    week_workouts: Mapped[int] = mapped_column(Integer, default=0)
+    week_xp: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class UserWeeklyXP(Base):
+    """XP earned from workouts per user and ISO week (weekly leaderboard)."""
+    __tablename__ = "user_weekly_xp"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    iso_week: Mapped[str] = mapped_column(String(8), primary_key=True)  # e.g. 2026-W42
+    xp: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Weekly leaderboard: WHERE iso_week ORDER BY xp DESC
+        Index("idx_user_weekly_xp_week_xp", "iso_week", text("xp DESC")),
+    )
+
+
 class UserAchievement(Base):
     __tablename__ = "user_achievements"
 
@@ -213,6 +278,11 @@ class UserGoal(Base):
     # Relationships
     user: Mapped["User"] = relationship(back_populates="goals")
 
+    __table_args__ = (
+        # Active goals of a user: WHERE user_id AND completed AND end_date >= today
+        Index("idx_user_goals_user_completed_end", "user_id", "completed", "end_date"),
+    )
+
 
 class Friendship(Base):
     __tablename__ = "friendships"
@@ -398,7 +468,8 @@ class Notification(Base):
     # Related data (e.g., friend_id for friend requests)
     related_user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    # Python-side UTC clock, the same one the retention purge cutoffs use
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
     user: Mapped["User"] = relationship(foreign_keys=[user_id])
@@ -406,4 +477,43 @@ class Notification(Base):
 
     __table_args__ = (
         Index("idx_notifications_user_unread", "user_id", "is_read"),
+        # Keyset pagination: WHERE user_id ORDER BY id DESC
+        Index("idx_notifications_user_id", "user_id", "id"),
+        # Retention purge deletes by type and age
+        Index("idx_notifications_type_created", "notification_type", "created_at"),
+        # Catch-all retention rule (type NOT IN ...) reads by age only
+        Index("idx_notifications_created", "created_at"),
+    )
+
+
+class NotificationOutbox(Base):
+    """Telegram pushes queued in the same transaction as the domain change."""
+    __tablename__ = "notification_outbox"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # pending -> deleted once sent; dead after too many failed attempts
+    status: Mapped[str] = mapped_column(String(20), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    # Python-side UTC clock, the same one drain_outbox_batch compares against
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_error: Mapped[str | None] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_notification_outbox_status_next", "status", "next_attempt_at"),
+    )
+
+
+class AppMetadata(Base):
+    """Key/value state of the application itself (e.g. seed data hashes)."""
+    __tablename__ = "app_metadata"
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(Text, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now()
     )
@@ -0,0 +1,42 @@
+"""Dialect-aware INSERT constructs supporting ON CONFLICT upserts."""
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Dialects whose INSERT supports on_conflict_do_update / on_conflict_do_nothing
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def check_upsert_support(dialect: str) -> None:
+    """
+    Fail fast for databases the stats, weekly XP and seed loaders cannot
+    write to.
+
+    Raises:
+        ValueError: If the dialect has no ON CONFLICT upsert
+    """
+    if dialect not in UPSERT_INSERTS:
+        raise ValueError(
+            f"Database dialect '{dialect}' is not supported: ON CONFLICT upserts "
+            f"are required (supported: {', '.join(sorted(UPSERT_INSERTS))})"
+        )
+
+
+def upsert_insert(session: AsyncSession, table):
+    """
+    Create an INSERT for the session's dialect that supports
+    on_conflict_do_update / on_conflict_do_nothing.
+
+    Args:
+        session: Database session (its bind decides the dialect)
+        table: Mapped class or Table
+
+    Returns:
+        Dialect-specific Insert construct
+    """
+    dialect = session.get_bind().dialect.name
+    check_upsert_support(dialect)
+    return UPSERT_INSERTS[dialect](table)
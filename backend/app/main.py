@@ -5,9 +5,13 @@ import logging
 
 from app.config import settings
 from app.api import api_router
-from app.db.database import async_engine, async_session_maker
+from app.db.database import async_engine, async_session_maker, get_engine_report, read_engine
 from app.services.data_loader import init_data
+from app.services.exercise_catalog import exercise_catalog
+from app.services.leaderboard_index import leaderboard_index
+from app.services.routine_registry import routine_registry
 from app.services.scheduler import start_scheduler, stop_scheduler
+from app.utils.cache import get_cache_stats
 
 # Configure logging based on settings
 log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
@@ -23,6 +27,7 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler."""
     # Startup
     logger.info("Starting BodyWeight API...")
+    logger.info(f"Database engine: {await get_engine_report(async_engine)}")
 
     # NOTE: Database tables should be created via Alembic migrations
     # Run: alembic upgrade head
@@ -38,6 +43,28 @@ async def lifespan(app: FastAPI):
             except Exception as e:
                 logger.warning(f"Failed to load initial data: {e}")
 
+    # Load in-memory leaderboard index
+    async with async_session_maker() as session:
+        try:
+            await leaderboard_index.refresh(session)
+            logger.info(f"Leaderboard index loaded ({len(leaderboard_index)} users)")
+        except Exception as e:
+            logger.warning(f"Failed to load leaderboard index: {e}")
+
+    # Compile in-memory exercise catalog
+    async with async_session_maker() as session:
+        try:
+            catalog = await exercise_catalog.get(session)
+            logger.info(f"Exercise catalog compiled ({len(catalog.items)} exercises)")
+        except Exception as e:
+            logger.warning(f"Failed to compile exercise catalog: {e}")
+
+    # Load predefined routines
+    try:
+        routine_registry.load()
+    except Exception as e:
+        logger.warning(f"Failed to load routines: {e}")
+
     # Start notification scheduler
     start_scheduler()
 
@@ -47,6 +74,8 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down BodyWeight API...")
     stop_scheduler()
     await async_engine.dispose()
+    if read_engine is not async_engine:
+        await read_engine.dispose()
 
 
 app = FastAPI(
@@ -99,6 +128,12 @@ async def health_check():
     return {"status": "ok", "version": "1.0.0"}
 
 
+@app.get("/health/cache")
+async def cache_stats():
+    """Hit/miss counters of the response caches (this worker)."""
+    return get_cache_stats()
+
+
 # For local development
 if __name__ == "__main__":
     import uvicorn
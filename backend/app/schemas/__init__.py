@@ -23,6 +23,8 @@ from .exercises import (
     ExerciseWithProgressResponse,
     RoutineExerciseResponse,
     RoutineResponse,
+    RoutineExerciseData,
+    RoutineData,
     FavoriteResponse,
 )
 from .goals import CreateGoalRequest, GoalResponse
@@ -65,6 +67,8 @@ __all__ = [
     "ExerciseWithProgressResponse",
     "RoutineExerciseResponse",
     "RoutineResponse",
+    "RoutineExerciseData",
+    "RoutineData",
     "FavoriteResponse",
     # Goals
     "CreateGoalRequest",
@@ -13,3 +13,5 @@ class PaginatedResponse(BaseModel, Generic[T]):
     skip: int
     limit: int
     has_more: bool
+    # Opaque keyset cursor for the next page (endpoints that support it)
+    next_cursor: str | None = None
@@ -76,6 +76,24 @@ class RoutineResponse(BaseModel):
     estimated_duration_minutes: int
 
 
+class RoutineExerciseData(BaseModel):
+    """Exercise entry of a predefined routine."""
+    slug: str
+    reps: int | None = None
+    duration: int | None = None  # duration in seconds
+
+
+class RoutineData(BaseModel):
+    """Predefined routine loaded from data/routines."""
+    slug: str
+    name: str
+    description: str
+    category: str  # morning, home, pullup-bar, dip-bars
+    duration_minutes: int
+    difficulty: int
+    exercises: list[RoutineExerciseData]
+
+
 class FavoriteResponse(BaseModel):
     """Favorite exercise toggle response."""
     exercise_slug: str
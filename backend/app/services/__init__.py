@@ -1,10 +1,19 @@
-from .xp_calculator import calculate_xp, calculate_coins, xp_for_level, get_level_from_xp
+from .xp_calculator import (
+    calculate_xp,
+    calculate_xp_batch,
+    calculate_coins,
+    xp_for_level,
+    get_level_from_xp,
+    get_level_progress,
+)
 from .achievement_checker import check_achievements
 
 __all__ = [
     "calculate_xp",
+    "calculate_xp_batch",
     "calculate_coins",
     "xp_for_level",
     "get_level_from_xp",
+    "get_level_progress",
     "check_achievements",
 ]
@@ -1,122 +1,219 @@
+"""
+Achievement engine.
+
+Achievements are pre-grouped by condition type with thresholds sorted
+ascending (see load_achievements_index), so each check:
+- computes every metric at most once (one query per condition type at most)
+- skips condition types that have no locked achievements left
+- evaluates only the condition types the caller says may have changed
+"""
+
 from datetime import datetime
+from itertools import takewhile
+from typing import Iterable
 
-from sqlalchemy import select, func
+from sqlalchemy import select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import User, UserAchievement, WorkoutSession, UserExerciseProgress
-from app.utils.achievement_loader import load_achievements
+from app.db.models import User, UserAchievement, WorkoutSession, UserExerciseProgress, Exercise
+from app.services.user_stats import get_user_stats, record_achievements
+from app.services.leaderboard_index import track_xp_change
+from app.utils.achievement_loader import load_achievements_index
+
+
+# total_xp goes last so XP rewarded by other unlocks in the same check
+# counts towards XP achievements.
+EVALUATION_ORDER = (
+    "total_workouts",
+    "streak",
+    "level",
+    "exercise_reps",
+    "time_of_day",
+    "total_xp",
+)
 
 
 async def check_achievements(
     session: AsyncSession,
     user: User,
+    condition_types: Iterable[str] | None = None,
+    exercise_slugs: Iterable[str] | None = None,
+    finished_at: datetime | None = None,
 ) -> list[dict]:
     """
     Check and unlock achievements for a user.
 
+    Args:
+        session: Database session
+        user: User to check
+        condition_types: Condition types whose inputs changed; None checks all
+        exercise_slugs: Exercises touched by the workout; limits exercise_reps
+            checks to matching achievements (None checks all of them)
+        finished_at: Finish time of the workout being processed; when None the
+            latest completed workout is used for time_of_day conditions
+
     Returns list of newly unlocked achievements.
     """
-    achievements_data = load_achievements()
-    newly_unlocked = []
+    index = load_achievements_index()
+    types = [
+        t for t in EVALUATION_ORDER
+        if t in index and (condition_types is None or t in condition_types)
+    ]
+    if not types:
+        return []
 
     # Get already unlocked achievements
     result = await session.execute(
         select(UserAchievement.achievement_slug)
         .where(UserAchievement.user_id == user.id)
     )
-    unlocked_slugs = set(row[0] for row in result.fetchall())
+    unlocked_slugs = set(result.scalars().all())
 
-    for achievement in achievements_data:
-        slug = achievement["slug"]
+    newly_unlocked = []
 
-        # Skip if already unlocked
-        if slug in unlocked_slugs:
+    for condition_type in types:
+        locked = [a for a in index[condition_type] if a["slug"] not in unlocked_slugs]
+        if not locked:
             continue
 
-        # Check condition
-        condition = achievement.get("condition", {})
-        condition_type = condition.get("type")
-        condition_value = condition.get("value", 0)
-
-        unlocked = False
-
-        if condition_type == "total_workouts":
-            count_result = await session.execute(
-                select(func.count(WorkoutSession.id))
-                .where(WorkoutSession.user_id == user.id)
-                .where(WorkoutSession.status == "completed")
-            )
-            count = count_result.scalar() or 0
-            unlocked = count >= condition_value
-
-        elif condition_type == "streak":
-            unlocked = user.current_streak >= condition_value
-
-        elif condition_type == "level":
-            unlocked = user.level >= condition_value
-
-        elif condition_type == "total_xp":
-            unlocked = user.total_xp >= condition_value
-
-        elif condition_type == "exercise_reps":
-            # Count total reps for matching exercises
-            exercise_pattern = condition.get("exercise", "")
-            if exercise_pattern.endswith("*"):
-                # Wildcard match
-                prefix = exercise_pattern[:-1]
-                reps_result = await session.execute(
-                    select(func.sum(UserExerciseProgress.total_reps_ever))
-                    .join(UserExerciseProgress.exercise)
-                    .where(UserExerciseProgress.user_id == user.id)
-                    .where(UserExerciseProgress.exercise.has(slug=prefix))  # Simplified
-                )
-            else:
-                reps_result = await session.execute(
-                    select(func.sum(UserExerciseProgress.total_reps_ever))
-                    .join(UserExerciseProgress.exercise)
-                    .where(UserExerciseProgress.user_id == user.id)
-                    .where(UserExerciseProgress.exercise.has(slug=exercise_pattern))
-                )
-            total_reps = reps_result.scalar() or 0
-            unlocked = total_reps >= condition_value
-
+        if condition_type == "exercise_reps":
+            reached = await _check_exercise_reps(session, user, locked, exercise_slugs)
         elif condition_type == "time_of_day":
-            # Check if last workout was before/after specific time
-            before_time = condition.get("before")
-            after_time = condition.get("after")
-
-            last_workout_result = await session.execute(
-                select(WorkoutSession)
-                .where(WorkoutSession.user_id == user.id)
-                .where(WorkoutSession.status == "completed")
-                .order_by(WorkoutSession.finished_at.desc())
-                .limit(1)
-            )
-            last_workout = last_workout_result.scalar_one_or_none()
-
-            if last_workout and last_workout.finished_at:
-                workout_time = last_workout.finished_at.time()
-                if before_time:
-                    target_time = datetime.strptime(before_time, "%H:%M").time()
-                    unlocked = workout_time < target_time
-                elif after_time:
-                    target_time = datetime.strptime(after_time, "%H:%M").time()
-                    unlocked = workout_time > target_time
+            reached = await _check_time_of_day(session, user, locked, finished_at)
+        else:
+            value = await _get_metric(session, user, condition_type)
+            reached = _reached_thresholds(locked, value)
+
+        for achievement in reached:
+            _unlock(session, user, achievement)
+            unlocked_slugs.add(achievement["slug"])
+            newly_unlocked.append(achievement)
+
+    await record_achievements(session, user.id, len(newly_unlocked))
+
+    return newly_unlocked
+
+
+def _reached_thresholds(achievements: list[dict], value: int) -> list[dict]:
+    """Return achievements (sorted by threshold) whose threshold is reached."""
+    return list(takewhile(
+        lambda a: a.get("condition", {}).get("value", 0) <= value,
+        achievements,
+    ))
+
+
+async def _get_metric(session: AsyncSession, user: User, condition_type: str) -> int:
+    """Compute the single metric value for a threshold-based condition type."""
+    if condition_type == "total_workouts":
+        stats = await get_user_stats(session, user.id)
+        return stats.total_workouts
+    if condition_type == "streak":
+        return user.current_streak
+    if condition_type == "level":
+        return user.level
+    if condition_type == "total_xp":
+        return user.total_xp
+    return 0
+
+
+def _pattern_matches(pattern: str, slug: str) -> bool:
+    """Match an exercise slug against an achievement pattern ("prefix*" allowed)."""
+    if pattern.endswith("*"):
+        return slug.startswith(pattern[:-1])
+    return slug == pattern
+
+
+async def _check_exercise_reps(
+    session: AsyncSession,
+    user: User,
+    achievements: list[dict],
+    exercise_slugs: Iterable[str] | None,
+) -> list[dict]:
+    """Evaluate exercise_reps achievements with a single progress query."""
+    if exercise_slugs is not None:
+        touched = set(exercise_slugs)
+        achievements = [
+            a for a in achievements
+            if any(_pattern_matches(a["condition"].get("exercise", ""), s) for s in touched)
+        ]
+        if not achievements:
+            return []
+
+    patterns = {a["condition"].get("exercise", "") for a in achievements}
+    exact = [p for p in patterns if not p.endswith("*")]
+    filters = [Exercise.slug.startswith(p[:-1]) for p in patterns if p.endswith("*")]
+    if exact:
+        filters.append(Exercise.slug.in_(exact))
+
+    progress_result = await session.execute(
+        select(Exercise.slug, UserExerciseProgress.total_reps_ever)
+        .join(Exercise, Exercise.id == UserExerciseProgress.exercise_id)
+        .where(UserExerciseProgress.user_id == user.id)
+        .where(or_(*filters))
+    )
+    reps_by_slug = progress_result.all()
+
+    totals = {
+        pattern: sum(reps or 0 for slug, reps in reps_by_slug if _pattern_matches(pattern, slug))
+        for pattern in patterns
+    }
+
+    return [
+        a for a in achievements
+        if totals[a["condition"].get("exercise", "")] >= a["condition"].get("value", 0)
+    ]
+
+
+async def _check_time_of_day(
+    session: AsyncSession,
+    user: User,
+    achievements: list[dict],
+    finished_at: datetime | None,
+) -> list[dict]:
+    """Evaluate time_of_day achievements against the latest workout."""
+    if finished_at is None:
+        last_workout_result = await session.execute(
+            select(WorkoutSession.finished_at)
+            .where(WorkoutSession.user_id == user.id)
+            .where(WorkoutSession.status == "completed")
+            .order_by(WorkoutSession.finished_at.desc())
+            .limit(1)
+        )
+        finished_at = last_workout_result.scalar_one_or_none()
+
+    if finished_at is None:
+        return []
+
+    workout_time = finished_at.time()
+    reached = []
+
+    for achievement in achievements:
+        condition = achievement.get("condition", {})
+        before_time = condition.get("before")
+        after_time = condition.get("after")
+
+        if before_time:
+            target_time = datetime.strptime(before_time, "%H:%M").time()
+            unlocked = workout_time < target_time
+        elif after_time:
+            target_time = datetime.strptime(after_time, "%H:%M").time()
+            unlocked = workout_time > target_time
+        else:
+            unlocked = False
 
         if unlocked:
-            # Create achievement record
-            user_achievement = UserAchievement(
-                user_id=user.id,
-                achievement_slug=slug,
-            )
-            session.add(user_achievement)
-
-            # Award XP and coins
-            xp_reward = achievement.get("xp_reward", 0)
-            coin_reward = achievement.get("coin_reward", 0)
-            user.total_xp += xp_reward
-            user.coins += coin_reward
+            reached.append(achievement)
 
-            newly_unlocked.append(achievement)
+    return reached
 
-    return newly_unlocked
+
+def _unlock(session: AsyncSession, user: User, achievement: dict) -> None:
+    """Create the achievement record and award its XP and coins."""
+    session.add(UserAchievement(
+        user_id=user.id,
+        achievement_slug=achievement["slug"],
+    ))
+
+    user.total_xp += achievement.get("xp_reward", 0)
+    user.coins += achievement.get("coin_reward", 0)
+    track_xp_change(session, user)
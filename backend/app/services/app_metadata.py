@@ -0,0 +1,23 @@
+"""Read and write application key/value state (app_metadata table)."""
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AppMetadata
+from app.db.upsert import upsert_insert
+
+
+async def get_metadata(session: AsyncSession, key: str) -> str | None:
+    """Return the stored value for key, or None."""
+    result = await session.execute(select(AppMetadata.value).where(AppMetadata.key == key))
+    return result.scalar_one_or_none()
+
+
+async def set_metadata(session: AsyncSession, key: str, value: str) -> None:
+    """Insert or replace the value for key (caller commits)."""
+    stmt = upsert_insert(session, AppMetadata.__table__).values(key=key, value=value)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"value": stmt.excluded.value, "updated_at": func.now()},
+    )
+    await session.execute(stmt)
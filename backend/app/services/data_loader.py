@@ -1,14 +1,30 @@
 """Service to load initial data from JSON files into database."""
+import hashlib
 import json
+import logging
+from dataclasses import dataclass, field
 from pathlib import Path
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import ExerciseCategory, Exercise
+from app.db.upsert import upsert_insert
+from app.services.app_metadata import get_metadata, set_metadata
+from app.services.exercise_catalog import bump_catalog_version
+from app.utils.cache import invalidate_tag
 
 
+logger = logging.getLogger(__name__)
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+# Bump when the loader changes how JSON maps to rows, to force a full re-sync
+LOADER_VERSION = 1
+
+# app_metadata keys
+SEED_HASH_KEY = "seed_data_hash"
+SEED_FILES_KEY = "seed_data_files"
+
 
 def load_json(filename: str) -> dict | list:
     """Load JSON file from data directory."""
@@ -34,131 +50,253 @@ def load_all_exercises() -> list[dict]:
     return all_exercises
 
 
-def load_all_routines() -> list[dict]:
-    """Load all routines from routines/ directory."""
-    routines_dir = DATA_DIR / "routines"
-    all_routines = []
+# Exercise columns re-synced from JSON for rows that already exist; other
+# columns are only written when the exercise is created
+SYNCED_EXERCISE_FIELDS = ("category_id", "tags", "is_timed", "gif_url")
 
-    for json_file in routines_dir.glob("*.json"):
-        routines = load_json(f"routines/{json_file.name}")
-        all_routines.extend(routines)
 
-    return all_routines
+@dataclass
+class LoadReport:
+    """What a data load changed."""
+    categories_added: int = 0
+    exercises_added: int = 0
+    exercises_updated: int = 0
+    links_updated: int = 0
+    skipped: list[str] = field(default_factory=list)
+    # Data files that were applied (empty if the seed data was unchanged)
+    files: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.categories_added or self.exercises_added
+            or self.exercises_updated or self.links_updated
+        )
 
 
-async def load_categories(session: AsyncSession) -> dict[str, int]:
-    """Load exercise categories into database. Returns slug -> id mapping."""
+async def load_categories(session: AsyncSession, report: LoadReport | None = None) -> dict[str, int]:
+    """
+    Load exercise categories into database. Returns slug -> id mapping.
+
+    Missing categories are inserted with one INSERT .. ON CONFLICT DO NOTHING;
+    existing ones are left untouched.
+    """
     categories = load_categories_data()
-    slug_to_id = {}
+    table = ExerciseCategory.__table__
+
+    result = await session.execute(select(table.c.slug))
+    existing = set(result.scalars().all())
+    new_rows = [
+        {
+            "slug": cat_data["slug"],
+            "name": cat_data["name"],
+            "name_ru": cat_data["name_ru"],
+            "icon": cat_data.get("icon"),
+            "color": cat_data.get("color"),
+            "sort_order": cat_data.get("sort_order", 0),
+        }
+        for cat_data in categories
+        if cat_data["slug"] not in existing
+    ]
+    if new_rows:
+        stmt = upsert_insert(session, table).on_conflict_do_nothing(index_elements=["slug"])
+        await session.execute(stmt, new_rows)
+        if report is not None:
+            report.categories_added += len(new_rows)
+
+    result = await session.execute(select(table.c.slug, table.c.id))
+    return {slug: category_id for slug, category_id in result.all()}
+
+
+def _exercise_row(ex_data: dict, category_id: int) -> dict:
+    """Full exercises row for an exercise from JSON."""
+    slug = ex_data["slug"]
+    return {
+        "slug": slug,
+        "category_id": category_id,
+        "name": ex_data["name"],
+        "name_ru": ex_data["name_ru"],
+        "description": ex_data.get("description"),
+        "description_ru": ex_data.get("description_ru"),
+        "tags": ex_data.get("tags", []),
+        "difficulty": ex_data.get("difficulty", 1),
+        "base_xp": ex_data.get("base_xp", 10),
+        "required_level": ex_data.get("required_level", 1),
+        "equipment": ex_data.get("equipment", "none"),
+        # Use is_timed from JSON, default to False
+        "is_timed": ex_data.get("is_timed", False),
+        # SVG animation URL based on slug
+        "gif_url": f"/sprites/exercises/{slug}.svg",
+        "is_active": True,
+    }
+
+
+async def load_exercises(session: AsyncSession, exercises_data: list[dict] | None = None) -> LoadReport:
+    """
+    Load exercises into database.
+
+    Reads the existing exercises in one query, diffs them against the JSON and
+    writes only new and changed rows with a single dialect-aware upsert, then
+    links easier/harder progressions with one executemany UPDATE. Links are
+    always resolved over all exercise files, so a link from an unchanged file
+    to a newly added exercise is set too.
+
+    Args:
+        session: Database session (committed here)
+        exercises_data: Exercises to load (default: all files in exercises/)
+
+    Returns:
+        LoadReport with the number of changed rows
+    """
+    report = LoadReport()
+    category_map = await load_categories(session, report)
+
+    all_exercises_data = load_all_exercises()
+    if exercises_data is None:
+        exercises_data = all_exercises_data
+    table = Exercise.__table__
+
+    result = await session.execute(
+        select(table.c.slug, *(table.c[name] for name in SYNCED_EXERCISE_FIELDS))
+    )
+    existing = {row.slug: row for row in result.all()}
+
+    upserts = []
+    for ex_data in exercises_data:
+        category_id = category_map.get(ex_data["category"])
+        if not category_id:
+            report.skipped.append(ex_data["slug"])
+            continue
 
-    for cat_data in categories:
-        # Check if exists
-        result = await session.execute(
-            select(ExerciseCategory).where(ExerciseCategory.slug == cat_data["slug"])
-        )
-        category = result.scalar_one_or_none()
+        row = _exercise_row(ex_data, category_id)
+        current = existing.get(row["slug"])
+        if current is None:
+            report.exercises_added += 1
+        elif any(getattr(current, name) != row[name] for name in SYNCED_EXERCISE_FIELDS):
+            report.exercises_updated += 1
+        else:
+            continue
+        upserts.append(row)
 
-        if not category:
-            category = ExerciseCategory(
-                slug=cat_data["slug"],
-                name=cat_data["name"],
-                name_ru=cat_data["name_ru"],
-                icon=cat_data.get("icon"),
-                color=cat_data.get("color"),
-                sort_order=cat_data.get("sort_order", 0),
-            )
-            session.add(category)
-            await session.flush()
+    if upserts:
+        stmt = upsert_insert(session, table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["slug"],
+            set_={name: stmt.excluded[name] for name in SYNCED_EXERCISE_FIELDS},
+        )
+        await session.execute(stmt, upserts)
 
-        slug_to_id[category.slug] = category.id
+    report.links_updated = await _link_progressions(session, all_exercises_data)
 
-    return slug_to_id
+    await session.commit()
 
+    if report.changed:
+        # Compiled catalog and cached catalog responses are stale now
+        bump_catalog_version()
+        await invalidate_tag("catalog")
 
-async def load_exercises(session: AsyncSession) -> None:
-    """Load exercises into database."""
-    # First, load categories
-    category_map = await load_categories(session)
+    return report
 
-    # Load all exercises from the exercises/ directory
-    exercises_data = load_all_exercises()
 
-    # Track exercise slug -> id for linking easier/harder
-    slug_to_id = {}
+async def _link_progressions(session: AsyncSession, exercises_data: list[dict]) -> int:
+    """Set easier/harder exercise links from JSON. Returns number of updated rows."""
+    table = Exercise.__table__
+    result = await session.execute(
+        select(table.c.slug, table.c.id, table.c.easier_exercise_id, table.c.harder_exercise_id)
+    )
+    rows = {row.slug: row for row in result.all()}
 
-    # First pass: create all exercises without links
+    updates = []
     for ex_data in exercises_data:
-        # Check if exists
-        result = await session.execute(
-            select(Exercise).where(Exercise.slug == ex_data["slug"])
+        row = rows.get(ex_data["slug"])
+        if row is None:
+            continue
+
+        easier = rows.get(ex_data.get("easier") or "")
+        harder = rows.get(ex_data.get("harder") or "")
+        easier_id = easier.id if easier else row.easier_exercise_id
+        harder_id = harder.id if harder else row.harder_exercise_id
+
+        if (easier_id, harder_id) != (row.easier_exercise_id, row.harder_exercise_id):
+            updates.append({"row_id": row.id, "easier_id": easier_id, "harder_id": harder_id})
+
+    if updates:
+        await session.execute(
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(easier_exercise_id=bindparam("easier_id"), harder_exercise_id=bindparam("harder_id")),
+            updates,
         )
-        exercise = result.scalar_one_or_none()
+    return len(updates)
 
-        category_slug = ex_data["category"]
-        category_id = category_map.get(category_slug)
-        if not category_id:
-            continue
 
-        # Use is_timed from JSON, default to False
-        is_timed = ex_data.get("is_timed", False)
+def get_seed_files() -> list[str]:
+    """Data files synced into the database, relative to DATA_DIR."""
+    exercise_files = sorted(f"exercises/{path.name}" for path in (DATA_DIR / "exercises").glob("*.json"))
+    return ["categories.json", *exercise_files]
 
-        # Get tags from data or default empty list
-        tags = ex_data.get("tags", [])
 
-        slug = ex_data["slug"]
-        # SVG animation URL based on slug
-        gif_url = f"/sprites/exercises/{slug}.svg"
-
-        if not exercise:
-            exercise = Exercise(
-                slug=slug,
-                category_id=category_id,
-                name=ex_data["name"],
-                name_ru=ex_data["name_ru"],
-                description=ex_data.get("description"),
-                description_ru=ex_data.get("description_ru"),
-                tags=tags,
-                difficulty=ex_data.get("difficulty", 1),
-                base_xp=ex_data.get("base_xp", 10),
-                required_level=ex_data.get("required_level", 1),
-                equipment=ex_data.get("equipment", "none"),
-                is_timed=is_timed,
-                gif_url=gif_url,
-            )
-            session.add(exercise)
-            await session.flush()
-        else:
-            # Update existing exercise
-            exercise.is_timed = is_timed
-            exercise.tags = tags
-            exercise.category_id = category_id
-            exercise.gif_url = gif_url
+def compute_file_hashes() -> dict[str, str]:
+    """sha256 of every seed data file."""
+    return {
+        name: hashlib.sha256((DATA_DIR / name).read_bytes()).hexdigest()
+        for name in get_seed_files()
+    }
 
-        slug_to_id[exercise.slug] = exercise.id
 
-    # Second pass: link easier/harder exercises
-    for ex_data in exercises_data:
-        exercise_id = slug_to_id.get(ex_data["slug"])
-        if not exercise_id:
-            continue
+def compute_data_hash(file_hashes: dict[str, str]) -> str:
+    """Hash of the whole seed data set, including the loader version."""
+    digest = hashlib.sha256(f"loader:{LOADER_VERSION}\n".encode())
+    for name in sorted(file_hashes):
+        digest.update(f"{name}:{file_hashes[name]}\n".encode())
+    return digest.hexdigest()
 
-        result = await session.execute(
-            select(Exercise).where(Exercise.id == exercise_id)
-        )
-        exercise = result.scalar_one()
 
-        easier_slug = ex_data.get("easier")
-        harder_slug = ex_data.get("harder")
+async def init_data(session: AsyncSession, force: bool = False) -> LoadReport:
+    """
+    Initialize all data from JSON files.
 
-        if easier_slug and easier_slug in slug_to_id:
-            exercise.easier_exercise_id = slug_to_id[easier_slug]
+    The content hash of the data directory is stored in app_metadata. When it
+    matches, nothing is read from the files or written to the database; when
+    it differs, only exercise files whose own hash changed are applied
+    (everything is applied if categories.json or LOADER_VERSION changed).
 
-        if harder_slug and harder_slug in slug_to_id:
-            exercise.harder_exercise_id = slug_to_id[harder_slug]
+    Args:
+        session: Database session
+        force: Apply all files even if the stored hash matches
+    """
+    file_hashes = compute_file_hashes()
+    data_hash = compute_data_hash(file_hashes)
 
-    await session.commit()
+    if not force and await get_metadata(session, SEED_HASH_KEY) == data_hash:
+        logger.info("Data load: seed data unchanged, skipping")
+        return LoadReport()
 
+    stored = json.loads(await get_metadata(session, SEED_FILES_KEY) or "{}")
+    stored_files = stored.get("files", {}) if stored.get("version") == LOADER_VERSION else {}
+    changed_files = [name for name, digest in file_hashes.items() if stored_files.get(name) != digest]
+
+    if force or "categories.json" in changed_files:
+        changed_files = list(file_hashes)
+        exercises_data = None
+    else:
+        exercises_data = [ex for name in changed_files for ex in load_json(name)]
+
+    report = await load_exercises(session, exercises_data)
+    report.files = changed_files
+
+    # Recorded after the data commit: an interrupted run just re-applies
+    await set_metadata(session, SEED_HASH_KEY, data_hash)
+    await set_metadata(
+        session, SEED_FILES_KEY, json.dumps({"version": LOADER_VERSION, "files": file_hashes})
+    )
+    await session.commit()
 
-async def init_data(session: AsyncSession) -> None:
-    """Initialize all data from JSON files."""
-    await load_exercises(session)
+    logger.info(
+        f"Data load ({len(changed_files)} files): {report.categories_added} categories added, "
+        f"{report.exercises_added} exercises added, {report.exercises_updated} updated, "
+        f"{report.links_updated} progression links updated"
+    )
+    if report.skipped:
+        logger.warning(f"Data load: skipped exercises with unknown category: {report.skipped}")
+    return report
@@ -0,0 +1,202 @@
+"""
+Precompiled in-memory exercise catalog.
+
+The catalog only changes when exercise data is (re)loaded, so active
+exercises are compiled once into an immutable snapshot:
+- ExerciseResponse payloads built ahead of time, ordered like the catalog
+  screen (by name_ru)
+- inverted indexes (category, difficulty, required_level, tag) mapping to
+  positions in that order
+
+Requests intersect index sets instead of querying and filtering the whole
+table; only is_favorite is overlaid per user.
+
+The snapshot is rebuilt lazily after bump_catalog_version() (called by the
+data loader).
+"""
+
+import asyncio
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.db.models import Exercise
+from app.schemas import ExerciseResponse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable compiled catalog."""
+    version: int
+    items: tuple[ExerciseResponse, ...] = ()
+    by_category: dict[str, frozenset[int]] = field(default_factory=dict)
+    by_difficulty: dict[int, frozenset[int]] = field(default_factory=dict)
+    by_tag: dict[str, frozenset[int]] = field(default_factory=dict)
+    by_id: dict[int, int] = field(default_factory=dict)
+    # (required_level, position) sorted, for "required_level <= max_level"
+    levels: tuple[tuple[int, int], ...] = ()
+
+    def filter(
+        self,
+        category: str | None = None,
+        tags: Iterable[str] | None = None,
+        difficulty: int | None = None,
+        max_level: int | None = None,
+        exercise_ids: Iterable[int] | None = None,
+    ) -> list[int]:
+        """
+        Get positions of matching exercises, in catalog order.
+
+        Args:
+            category: Category slug
+            tags: Match exercises having any of these tags
+            difficulty: Exact difficulty
+            max_level: Maximum required level
+            exercise_ids: Restrict to these exercise IDs (e.g. favorites)
+
+        Returns:
+            Sorted list of positions in items
+        """
+        candidates: list[frozenset[int] | set[int]] = []
+
+        if category:
+            candidates.append(self.by_category.get(category, frozenset()))
+        if difficulty:
+            candidates.append(self.by_difficulty.get(difficulty, frozenset()))
+        if max_level:
+            end = bisect_right(self.levels, (max_level, len(self.items)))
+            candidates.append({pos for _, pos in self.levels[:end]})
+        if tags:
+            matched: set[int] = set()
+            for tag in tags:
+                matched |= self.by_tag.get(tag, frozenset())
+            candidates.append(matched)
+        if exercise_ids is not None:
+            candidates.append({self.by_id[i] for i in exercise_ids if i in self.by_id})
+
+        if not candidates:
+            return list(range(len(self.items)))
+
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            result &= other
+            if not result:
+                break
+        return sorted(result)
+
+    def page(
+        self,
+        positions: list[int],
+        skip: int,
+        limit: int,
+        favorite_ids: set[int],
+    ) -> list[ExerciseResponse]:
+        """Slice positions and overlay is_favorite on the payloads."""
+        page = []
+        for pos in positions[skip:skip + limit]:
+            item = self.items[pos]
+            if item.id in favorite_ids:
+                item = item.model_copy(update={"is_favorite": True})
+            page.append(item)
+        return page
+
+
+def build_snapshot(exercises: Iterable[Exercise], version: int) -> CatalogSnapshot:
+    """Compile active exercises (with categories loaded) into a snapshot."""
+    ordered = sorted(exercises, key=lambda ex: (ex.name_ru, ex.id))
+
+    items = []
+    by_category: dict[str, set[int]] = {}
+    by_difficulty: dict[int, set[int]] = {}
+    by_tag: dict[str, set[int]] = {}
+    by_id: dict[int, int] = {}
+    levels = []
+
+    for pos, ex in enumerate(ordered):
+        category_slug = ex.category.slug if ex.category else ""
+        items.append(ExerciseResponse(
+            id=ex.id,
+            slug=ex.slug,
+            name=ex.name,
+            name_ru=ex.name_ru,
+            description=ex.description,
+            description_ru=ex.description_ru,
+            tags=ex.tags or [],
+            difficulty=ex.difficulty,
+            base_xp=ex.base_xp,
+            required_level=ex.required_level,
+            equipment=ex.equipment,
+            is_timed=ex.is_timed,
+            gif_url=ex.gif_url,
+            thumbnail_url=ex.thumbnail_url,
+            category_slug=category_slug,
+            is_favorite=False,
+        ))
+
+        if ex.category:
+            by_category.setdefault(category_slug, set()).add(pos)
+        by_difficulty.setdefault(ex.difficulty, set()).add(pos)
+        for tag in set(ex.tags or []):
+            by_tag.setdefault(tag, set()).add(pos)
+        by_id[ex.id] = pos
+        levels.append((ex.required_level, pos))
+
+    return CatalogSnapshot(
+        version=version,
+        items=tuple(items),
+        by_category={k: frozenset(v) for k, v in by_category.items()},
+        by_difficulty={k: frozenset(v) for k, v in by_difficulty.items()},
+        by_tag={k: frozenset(v) for k, v in by_tag.items()},
+        by_id=by_id,
+        levels=tuple(sorted(levels)),
+    )
+
+
+class ExerciseCatalog:
+    """Holder of the current catalog snapshot (process-local)."""
+
+    def __init__(self):
+        self.version = 0
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = asyncio.Lock()
+
+    def bump_version(self) -> None:
+        """Mark the snapshot stale; it is rebuilt on next access."""
+        self.version += 1
+
+    async def get(self, session: AsyncSession) -> CatalogSnapshot:
+        """Get the current snapshot, rebuilding it if stale."""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        async with self._lock:
+            if self._snapshot is None or self._snapshot.version != self.version:
+                await self.refresh(session)
+            return self._snapshot
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Rebuild the snapshot from the exercises table."""
+        version = self.version
+        result = await session.execute(
+            select(Exercise)
+            .options(selectinload(Exercise.category))
+            .where(Exercise.is_active.is_(True))
+        )
+        self._snapshot = build_snapshot(result.scalars().all(), version)
+        logger.debug(f"[ExerciseCatalog] Built v{version} with {len(self._snapshot.items)} exercises")
+
+
+exercise_catalog = ExerciseCatalog()
+
+
+def bump_catalog_version() -> None:
+    """Invalidate the compiled catalog after exercise data changed."""
+    exercise_catalog.bump_version()
@@ -0,0 +1,247 @@
+"""
+Process-local ranked index of users by total XP.
+
+Serves the global leaderboard (top-N and "my rank") without ORDER BY or
+COUNT queries. Keys are (-total_xp, user_id), so ascending key order is
+XP descending with ties broken by user id.
+
+The index is loaded at startup, updated after commit for every session
+that changed a user's XP (see track_xp_change), and periodically resynced
+from the database so changes made by other workers/processes converge.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class OrderStatisticList:
+    """
+    Sorted list with O(log n) rank lookup.
+
+    Keys are kept in sorted buckets; a Fenwick tree over bucket sizes gives
+    the number of keys before any bucket in O(log n). Inserts and removals
+    touch one bucket plus O(log n) tree nodes.
+    """
+
+    LOAD = 512
+
+    def __init__(self, keys: Iterable = ()):
+        self._buckets: list[list] = []
+        self._maxes: list = []
+        self._tree: list[int] = [0]
+        self._len = 0
+        self.reset(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def reset(self, keys: Iterable) -> None:
+        """Replace contents with the given keys."""
+        ordered = sorted(keys)
+        load = self.LOAD
+        self._buckets = [ordered[i:i + load] for i in range(0, len(ordered), load)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(ordered)
+        self._build_tree()
+
+    def _build_tree(self) -> None:
+        size = len(self._buckets)
+        tree = [0] * (size + 1)
+        for i, bucket in enumerate(self._buckets, 1):
+            tree[i] += len(bucket)
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, pos: int, delta: int) -> None:
+        i = pos + 1
+        size = len(self._buckets)
+        while i <= size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _count_before(self, pos: int) -> int:
+        """Number of keys stored in buckets[0:pos]."""
+        total = 0
+        i = pos
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def add(self, key) -> None:
+        """Insert a key."""
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._build_tree()
+            return
+
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._buckets):
+            pos -= 1
+            self._buckets[pos].append(key)
+            self._maxes[pos] = key
+        else:
+            insort(self._buckets[pos], key)
+        self._len += 1
+
+        bucket = self._buckets[pos]
+        if len(bucket) > 2 * self.LOAD:
+            half = len(bucket) // 2
+            self._buckets[pos:pos + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[pos:pos + 1] = [bucket[half - 1], bucket[-1]]
+            self._build_tree()
+        else:
+            self._tree_add(pos, 1)
+
+    def remove(self, key) -> None:
+        """Remove a key. Raises KeyError if it is not present."""
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._buckets):
+            raise KeyError(key)
+
+        bucket = self._buckets[pos]
+        idx = bisect_left(bucket, key)
+        if idx == len(bucket) or bucket[idx] != key:
+            raise KeyError(key)
+
+        del bucket[idx]
+        self._len -= 1
+
+        if not bucket:
+            del self._buckets[pos]
+            del self._maxes[pos]
+            self._build_tree()
+        else:
+            self._maxes[pos] = bucket[-1]
+            self._tree_add(pos, -1)
+
+    def index(self, key) -> int:
+        """Number of keys strictly less than key."""
+        pos = bisect_left(self._maxes, key)
+        if pos == len(self._buckets):
+            return self._len
+        return self._count_before(pos) + bisect_left(self._buckets[pos], key)
+
+    def head(self, limit: int) -> list:
+        """First `limit` keys in order."""
+        result = []
+        for bucket in self._buckets:
+            if len(result) >= limit:
+                break
+            result.extend(bucket[:limit - len(result)])
+        return result
+
+
+class LeaderboardIndex:
+    """Ranked index of users by total XP (process-local)."""
+
+    def __init__(self):
+        self._keys = OrderStatisticList()
+        self._xp: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def load(self, rows: Iterable[tuple[int, int]]) -> None:
+        """Replace the index with (user_id, total_xp) rows."""
+        self._xp = {user_id: total_xp or 0 for user_id, total_xp in rows}
+        self._keys.reset((-xp, user_id) for user_id, xp in self._xp.items())
+        self.loaded = True
+
+    def update(self, user_id: int, total_xp: int) -> None:
+        """Insert or move a user."""
+        total_xp = total_xp or 0
+        old_xp = self._xp.get(user_id)
+        if old_xp == total_xp:
+            return
+        if old_xp is not None:
+            self._keys.remove((-old_xp, user_id))
+        self._keys.add((-total_xp, user_id))
+        self._xp[user_id] = total_xp
+
+    def discard(self, user_id: int) -> None:
+        """Remove a user if present."""
+        old_xp = self._xp.pop(user_id, None)
+        if old_xp is not None:
+            self._keys.remove((-old_xp, user_id))
+
+    def rank(self, user_id: int) -> int | None:
+        """1-based rank of a user, or None if not indexed."""
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return None
+        return self._keys.index((-xp, user_id)) + 1
+
+    def top(self, limit: int) -> list[tuple[int, int]]:
+        """Top users as (user_id, total_xp), best first."""
+        return [(user_id, -neg_xp) for neg_xp, user_id in self._keys.head(limit)]
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        """Load from the database if startup loading was skipped."""
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self.refresh(session)
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Reload the whole index from the users table."""
+        result = await session.execute(select(User.id, User.total_xp))
+        self.load(result.all())
+        logger.debug(f"[LeaderboardIndex] Loaded {len(self)} users")
+
+
+leaderboard_index = LeaderboardIndex()
+
+
+_PENDING_KEY = "leaderboard_pending_users"
+_SNAPSHOT_KEY = "leaderboard_pending_xp"
+
+
+def track_xp_change(session: AsyncSession, user: User) -> None:
+    """
+    Schedule an index update for a user whose XP changed in this session.
+
+    The user's total_xp is read when the session commits and applied to the
+    index only after the commit succeeds.
+    """
+    session.info.setdefault(_PENDING_KEY, {})[user.id] = user
+
+
+@event.listens_for(Session, "before_commit")
+def _snapshot_xp_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        snapshot = session.info.setdefault(_SNAPSHOT_KEY, {})
+        for user_id, user in pending.items():
+            snapshot[user_id] = user.total_xp
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_xp_changes(session: Session) -> None:
+    snapshot = session.info.pop(_SNAPSHOT_KEY, None)
+    if snapshot and leaderboard_index.loaded:
+        for user_id, total_xp in snapshot.items():
+            leaderboard_index.update(user_id, total_xp)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_xp_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_SNAPSHOT_KEY, None)
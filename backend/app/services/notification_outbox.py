@@ -0,0 +1,129 @@
+"""
+Durable outbox for Telegram pushes (notification_outbox table).
+
+Request handlers call enqueue_push() in the same transaction as the domain
+change, so a push is queued if and only if the change is committed, and the
+request never waits on the Telegram API. A scheduler job drains the outbox
+in batches through PushDispatcher:
+- delivered rows are deleted
+- failed rows are retried with exponential backoff
+- rows failing outbox_max_attempts times are dead-lettered (status 'dead')
+  and kept for inspection
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select, select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import NotificationOutbox
+from app.services.notifications import PushDispatcher, PushMessage
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+@dataclass
+class OutboxDrainResult:
+    """Outcome of draining the outbox."""
+    sent: int = 0
+    retried: int = 0
+    dead: int = 0
+
+
+def enqueue_push(session: AsyncSession, chat_id: int, text: str) -> None:
+    """
+    Queue a Telegram push; it is sent after the session commits.
+
+    Args:
+        session: Database session of the current unit of work
+        chat_id: Telegram chat ID
+        text: Message text (HTML)
+    """
+    session.add(NotificationOutbox(chat_id=chat_id, text=text))
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next attempt after `attempts` failures."""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def due_outbox_query(now: datetime, batch_size: int) -> Select:
+    """
+    Select pending pushes due at now, oldest first
+    (idx_notification_outbox_status_next).
+
+    Rows locked by another drainer are skipped.
+    """
+    return (
+        select(NotificationOutbox)
+        .where(NotificationOutbox.status == "pending")
+        .where(NotificationOutbox.next_attempt_at <= now)
+        .order_by(NotificationOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+
+
+async def drain_outbox_batch(
+    session: AsyncSession,
+    dispatcher: PushDispatcher | None = None,
+    batch_size: int | None = None,
+) -> tuple[OutboxDrainResult, int]:
+    """
+    Send one batch of due pushes.
+
+    Rows are locked with FOR UPDATE SKIP LOCKED where supported, so several
+    workers can drain concurrently without sending a push twice.
+
+    Args:
+        session: Database session (caller commits)
+        dispatcher: Push dispatcher (default: new PushDispatcher)
+        batch_size: Rows per batch (default: settings.outbox_batch_size)
+
+    Returns:
+        (result, number of rows fetched)
+    """
+    batch_size = batch_size or settings.outbox_batch_size
+    now = datetime.utcnow()
+
+    rows_result = await session.execute(due_outbox_query(now, batch_size))
+    rows = rows_result.scalars().all()
+    result = OutboxDrainResult()
+    if not rows:
+        return result, 0
+
+    messages = [PushMessage(chat_id=row.chat_id, text=row.text, outbox_id=row.id) for row in rows]
+    dispatch = await (dispatcher or PushDispatcher()).dispatch(messages)
+
+    failed = {push.outbox_id: push for push in dispatch.failed_messages}
+    sent_ids = [row.id for row in rows if row.id not in failed]
+
+    for row in rows:
+        push = failed.get(row.id)
+        if push is None:
+            continue
+        row.attempts += 1
+        row.last_error = push.error
+        if row.attempts >= settings.outbox_max_attempts:
+            row.status = "dead"
+            result.dead += 1
+            logger.error(f"[Outbox] Push {row.id} to {row.chat_id} dead-lettered: {push.error}")
+        else:
+            row.next_attempt_at = now + get_retry_delay(row.attempts)
+            result.retried += 1
+
+    if sent_ids:
+        await session.execute(
+            delete(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(sent_ids))
+            .execution_options(synchronize_session=False)
+        )
+    result.sent = len(sent_ids)
+
+    return result, len(rows)
@@ -0,0 +1,94 @@
+"""
+Retention for in-app notifications (notifications table).
+
+Every notification_type has a time to live (settings.notification_retention_days,
+settings.notification_default_retention_days for unlisted types). A nightly
+job deletes expired rows in chunks so no single transaction holds locks on
+millions of rows; users.unread_notifications is recounted for the owners of
+deleted unread rows.
+
+Repeated reminders are collapsed at insert time (see
+COLLAPSED_NOTIFICATION_TYPES in app.services.notifications), so they never
+pile up between purges.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select, select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import Notification
+from app.services.notifications import recount_unread
+
+logger = logging.getLogger(__name__)
+
+
+def get_retention_rules(now: datetime | None = None) -> list[tuple[list, datetime]]:
+    """
+    Build (filter criteria, cutoff) pairs, one per configured type plus one
+    for all remaining types.
+    """
+    now = now or datetime.utcnow()
+    configured = settings.notification_retention_days
+    rules = [
+        ([Notification.notification_type == notification_type], now - timedelta(days=days))
+        for notification_type, days in configured.items()
+    ]
+    rules.append((
+        [Notification.notification_type.not_in(list(configured))],
+        now - timedelta(days=settings.notification_default_retention_days),
+    ))
+    return rules
+
+
+def expired_notifications_query(criteria: list, cutoff: datetime, batch_size: int) -> Select:
+    """
+    Select (id, user_id, is_read) of up to batch_size notifications matching
+    a retention rule that were created before cutoff, oldest first
+    (idx_notifications_type_created).
+    """
+    return (
+        select(Notification.id, Notification.user_id, Notification.is_read)
+        .where(*criteria)
+        .where(Notification.created_at < cutoff)
+        .order_by(Notification.created_at)
+        .limit(batch_size)
+    )
+
+
+async def purge_expired_batch(
+    session: AsyncSession,
+    now: datetime | None = None,
+    batch_size: int | None = None,
+) -> int:
+    """
+    Delete up to batch_size expired notifications per retention rule.
+
+    Args:
+        session: Database session (caller commits)
+        now: Reference time (default: utcnow)
+        batch_size: Rows per rule (default: settings.notification_purge_batch_size)
+
+    Returns:
+        Number of deleted notifications
+    """
+    batch_size = batch_size or settings.notification_purge_batch_size
+    deleted = 0
+
+    for criteria, cutoff in get_retention_rules(now):
+        result = await session.execute(expired_notifications_query(criteria, cutoff, batch_size))
+        rows = result.all()
+        if not rows:
+            continue
+
+        await session.execute(
+            delete(Notification)
+            .where(Notification.id.in_([row.id for row in rows]))
+            .execution_options(synchronize_session=False)
+        )
+        await recount_unread(session, {row.user_id for row in rows if not row.is_read})
+        deleted += len(rows)
+
+    return deleted
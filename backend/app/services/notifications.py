@@ -1,11 +1,24 @@
+import asyncio
 import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
 from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from sqlalchemy import bindparam, case, delete, event, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.services.unread_hub import unread_hub
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +54,13 @@ def get_open_app_keyboard() -> InlineKeyboardMarkup:
     )
 
 
+_PENDING_NOTIFICATIONS_KEY = "pending_notifications"
+_UNREAD_CHANGED_KEY = "unread_changed_user_ids"
+
+# Reminder types where only the latest row per user is kept
+COLLAPSED_NOTIFICATION_TYPES = frozenset({"daily_reminder", "inactivity_reminder"})
+
+
 async def save_notification(
     session: AsyncSession,
     user_id: int,
@@ -49,170 +69,494 @@ async def save_notification(
     message: str,
     related_user_id: int | None = None,
 ) -> None:
-    """Save notification to database for badge display."""
-    from app.db.models import Notification
-
-    notification = Notification(
-        user_id=user_id,
-        notification_type=notification_type,
-        title=title,
-        message=message,
-        related_user_id=related_user_id,
-    )
-    session.add(notification)
-    await session.flush()
-
+    """
+    Save notification to database for badge display.
 
-async def send_friend_request_notification(
-    telegram_id: int,
-    from_user_name: str,
-) -> bool:
+    The row is queued on the session and written together with the other
+    queued notifications by flush_notifications(), or automatically right
+    before the session commits.
     """
-    Send notification about new friend request.
+    session.info.setdefault(_PENDING_NOTIFICATIONS_KEY, []).append({
+        "user_id": user_id,
+        "notification_type": notification_type,
+        "title": title,
+        "message": message,
+        "related_user_id": related_user_id,
+    })
 
-    Args:
-        telegram_id: Telegram ID of the user to notify
-        from_user_name: Name/username of the user who sent the request
+
+async def flush_notifications(session: AsyncSession) -> int:
+    """
+    Write notifications queued by save_notification with one multi-row insert.
 
     Returns:
-        True if notification was sent successfully
+        Number of rows written
     """
-    try:
-        bot = get_bot()
+    rows = session.info.pop(_PENDING_NOTIFICATIONS_KEY, None)
+    if not rows:
+        return 0
+    await save_notifications(session, rows)
+    return len(rows)
 
-        text = (
-            f"👋 <b>Новая заявка в друзья!</b>\n\n"
-            f"Пользователь <b>{from_user_name}</b> хочет добавить тебя в друзья."
-        )
 
-        await bot.send_message(
-            chat_id=telegram_id,
-            text=text,
-            reply_markup=get_open_app_keyboard(),
-        )
+async def save_notifications(
+    session: AsyncSession,
+    rows: list[dict[str, Any]],
+    batch_size: int = 500,
+) -> None:
+    """
+    Bulk-insert notifications immediately (scheduler jobs, bulk writers).
 
-        logger.info(f"Friend request notification sent to {telegram_id}")
-        return True
+    Reminder rows replace the user's previous reminder of the same type,
+    and users.unread_notifications is kept in step with the inserted rows.
 
-    except Exception as e:
-        logger.error(f"Failed to send friend request notification to {telegram_id}: {e}")
-        return False
+    Args:
+        session: Database session
+        rows: Dicts with user_id, notification_type, title, message and
+            optionally related_user_id
+        batch_size: Rows per INSERT
+    """
+    for i in range(0, len(rows), batch_size):
+        for statement, params in _build_write_statements(rows[i:i + batch_size]):
+            await session.execute(statement, params)
+    _unread_changed(session, (row["user_id"] for row in rows))
+
+
+def _build_write_statements(rows: list[dict[str, Any]]) -> list[tuple[Any, Any]]:
+    """Statements (with executemany params) that write one batch of notifications."""
+    from app.db.models import Notification, User
+
+    users = User.__table__
+    collapsed: dict[str, set[int]] = {}
+    increments: dict[int, int] = {}
+    for row in rows:
+        if row["notification_type"] in COLLAPSED_NOTIFICATION_TYPES:
+            collapsed.setdefault(row["notification_type"], set()).add(row["user_id"])
+        else:
+            increments[row["user_id"]] = increments.get(row["user_id"], 0) + 1
+
+    statements: list[tuple[Any, Any]] = []
+    for notification_type, user_ids in collapsed.items():
+        statements.append((
+            delete(Notification)
+            .where(Notification.notification_type == notification_type)
+            .where(Notification.user_id.in_(user_ids))
+            .execution_options(synchronize_session=False),
+            None,
+        ))
+    statements.append((insert(Notification), rows))
+    if increments:
+        statements.append((
+            update(users)
+            .where(users.c.id == bindparam("uid"))
+            .values(unread_notifications=users.c.unread_notifications + bindparam("delta")),
+            [{"uid": user_id, "delta": delta} for user_id, delta in increments.items()],
+        ))
+    recount_ids = set().union(*collapsed.values())
+    if recount_ids:
+        statements.append((_recount_unread_statement(recount_ids), None))
+    return statements
+
+
+def _recount_unread_statement(user_ids: Iterable[int]):
+    from app.db.models import Notification, User
+
+    users = User.__table__
+    unread = (
+        select(func.count(Notification.id))
+        .where(Notification.user_id == users.c.id)
+        .where(Notification.is_read == False)
+        .scalar_subquery()
+    )
+    return update(users).where(users.c.id.in_(list(user_ids))).values(unread_notifications=unread)
 
 
+async def recount_unread(session: AsyncSession, user_ids: Iterable[int]) -> None:
+    """
+    Recompute users.unread_notifications from the notifications table.
 
+    Used after bulk deletes (collapsing, retention purge) where per-row
+    bookkeeping would cost more than a recount of the affected users.
+    """
+    user_ids = set(user_ids)
+    if user_ids:
+        await session.execute(_recount_unread_statement(user_ids))
+        _unread_changed(session, user_ids)
 
-async def send_daily_reminder(telegram_id: int, streak: int = 0) -> bool:
+
+async def mark_notifications_read(
+    session: AsyncSession,
+    user_id: int,
+    notification_id: int | None = None,
+) -> int:
     """
-    Send daily workout reminder.
+    Mark one or all of the user's notifications as read and update the counter.
 
     Args:
-        telegram_id: Telegram ID of the user to notify
-        streak: Current streak days
+        session: Database session
+        user_id: Owner of the notifications
+        notification_id: Single notification to mark (None = all)
 
     Returns:
-        True if notification was sent successfully
+        Number of notifications that changed from unread to read
     """
-    try:
-        bot = get_bot()
+    from app.db.models import Notification, User
+
+    stmt = (
+        update(Notification)
+        .where(Notification.user_id == user_id)
+        .where(Notification.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if notification_id is not None:
+        stmt = stmt.where(Notification.id == notification_id)
+    result = await session.execute(stmt)
+    changed = result.rowcount or 0
+
+    users = User.__table__
+    if notification_id is None:
+        await session.execute(
+            update(users).where(users.c.id == user_id).values(unread_notifications=0)
+        )
+    elif changed:
+        await session.execute(
+            update(users)
+            .where(users.c.id == user_id)
+            .values(unread_notifications=case(
+                (users.c.unread_notifications > changed, users.c.unread_notifications - changed),
+                else_=0,
+            ))
+        )
+    if notification_id is None or changed:
+        _unread_changed(session, (user_id,))
+    return changed
 
-        if streak > 0:
-            text = (
-                f"🏋️ <b>Время тренировки!</b>\n\n"
-                f"🔥 Твой streak: <b>{streak}</b> дней подряд!\n"
-                f"Не останавливайся — продолжай в том же духе!"
-            )
-        else:
-            text = (
-                f"🏋️ <b>Время тренировки!</b>\n\n"
-                f"Начни свой день с упражнений.\n"
-                f"Даже 10 минут — это уже прогресс!"
-            )
 
-        await bot.send_message(
-            chat_id=telegram_id,
-            text=text,
-            reply_markup=get_open_app_keyboard(),
-        )
+def _unread_changed(session: AsyncSession | Session, user_ids: Iterable[int]) -> None:
+    """Remember users whose unread counter changed; they are woken on commit."""
+    session.info.setdefault(_UNREAD_CHANGED_KEY, set()).update(user_ids)
 
-        logger.info(f"Daily reminder sent to {telegram_id}")
-        return True
 
-    except Exception as e:
-        logger.error(f"Failed to send daily reminder to {telegram_id}: {e}")
-        return False
+@event.listens_for(Session, "before_commit")
+def _flush_pending_notifications(session: Session) -> None:
+    # Safety net for callers that commit without flush_notifications();
+    # runs inside the AsyncSession's greenlet, so sync execute is allowed
+    rows = session.info.pop(_PENDING_NOTIFICATIONS_KEY, None)
+    if rows:
+        for statement, params in _build_write_statements(rows):
+            session.execute(statement, params)
+        _unread_changed(session, (row["user_id"] for row in rows))
 
 
-async def send_inactivity_reminder(telegram_id: int, days_inactive: int) -> bool:
-    """
-    Send reminder to inactive user.
+@event.listens_for(Session, "after_commit")
+def _publish_unread_changes(session: Session) -> None:
+    user_ids = session.info.pop(_UNREAD_CHANGED_KEY, None)
+    if user_ids:
+        unread_hub.publish(user_ids)
 
-    Args:
-        telegram_id: Telegram ID of the user to notify
-        days_inactive: Number of days since last workout
 
-    Returns:
-        True if notification was sent successfully
-    """
-    try:
-        bot = get_bot()
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_notifications(session: Session) -> None:
+    session.info.pop(_PENDING_NOTIFICATIONS_KEY, None)
+    session.info.pop(_UNREAD_CHANGED_KEY, None)
 
-        text = (
-            f"😢 <b>Мы скучаем!</b>\n\n"
-            f"Прошло уже <b>{days_inactive}</b> дня без тренировок.\n"
-            f"Твои мышцы тоже скучают! Вернись к занятиям — "
-            f"начни с лёгкой разминки."
-        )
 
-        await bot.send_message(
-            chat_id=telegram_id,
-            text=text,
-            reply_markup=get_open_app_keyboard(),
+def build_friend_request_text(from_user_name: str) -> str:
+    """Telegram text of the friend request push."""
+    return (
+        f"👋 <b>Новая заявка в друзья!</b>\n\n"
+        f"Пользователь <b>{from_user_name}</b> хочет добавить тебя в друзья."
+    )
+
+
+def build_friend_accepted_text(friend_name: str) -> str:
+    """Telegram text of the friend request accepted push."""
+    return (
+        f"✅ <b>Заявка принята!</b>\n\n"
+        f"<b>{friend_name}</b> теперь твой друг.\n"
+        f"Тренируйтесь вместе и соревнуйтесь!"
+    )
+
+
+def build_daily_reminder_text(streak: int = 0) -> str:
+    """Telegram text of the daily workout reminder."""
+    if streak > 0:
+        return (
+            f"🏋️ <b>Время тренировки!</b>\n\n"
+            f"🔥 Твой streak: <b>{streak}</b> дней подряд!\n"
+            f"Не останавливайся — продолжай в том же духе!"
         )
+    return (
+        f"🏋️ <b>Время тренировки!</b>\n\n"
+        f"Начни свой день с упражнений.\n"
+        f"Даже 10 минут — это уже прогресс!"
+    )
 
-        logger.info(f"Inactivity reminder sent to {telegram_id} ({days_inactive} days)")
-        return True
 
-    except Exception as e:
-        logger.error(f"Failed to send inactivity reminder to {telegram_id}: {e}")
-        return False
+def build_daily_reminder_notification(streak: int = 0) -> tuple[str, str]:
+    """In-app (title, message) of the daily workout reminder."""
+    if streak > 0:
+        return "Время тренировки!", f"Твой streak: {streak} дней подряд! Не останавливайся!"
+    return "Время тренировки!", "Начни свой день с упражнений. Даже 10 минут — это уже прогресс!"
+
+
+def build_inactivity_reminder_text(days_inactive: int) -> str:
+    """Telegram text of the inactivity reminder."""
+    return (
+        f"😢 <b>Мы скучаем!</b>\n\n"
+        f"Прошло уже <b>{days_inactive}</b> дня без тренировок.\n"
+        f"Твои мышцы тоже скучают! Вернись к занятиям — "
+        f"начни с лёгкой разминки."
+    )
+
+
+def build_inactivity_reminder_notification(days_inactive: int) -> tuple[str, str]:
+    """In-app (title, message) of the inactivity reminder."""
+    return "Мы скучаем!", f"Прошло уже {days_inactive} дней без тренировок. Вернись к занятиям!"
 
 
-async def send_friend_accepted_notification(
-    telegram_id: int,
-    friend_name: str,
-) -> bool:
+# ============== Push dispatcher ==============
+
+
+class TokenBucket:
     """
-    Send notification that friend request was accepted.
+    Token bucket rate limiter.
 
     Args:
-        telegram_id: Telegram ID of the user to notify
-        friend_name: Name/username of the friend who accepted
+        rate: Tokens added per second
+        capacity: Maximum burst size
+    """
 
-    Returns:
-        True if notification was sent successfully
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class PushMessage:
+    """A Telegram push plus the in-app notification to store if it is delivered."""
+    chat_id: int
+    text: str
+    user_id: int | None = None
+    notification_type: str | None = None
+    title: str | None = None
+    message: str | None = None
+    outbox_id: int | None = None  # Set when sent from notification_outbox
+    error: str | None = None  # Last error, filled in by the dispatcher
+
+    def notification_row(self) -> dict[str, Any] | None:
+        if self.user_id is None or self.notification_type is None:
+            return None
+        return {
+            "user_id": self.user_id,
+            "notification_type": self.notification_type,
+            "title": self.title,
+            "message": self.message,
+            "related_user_id": None,
+        }
+
+
+@dataclass
+class DispatchResult:
+    """Outcome of a dispatch run."""
+    sent: int = 0
+    failed: int = 0
+    retried: int = 0
+    failed_messages: list[PushMessage] = field(default_factory=list)
+
+
+class FakeBot:
     """
-    try:
-        bot = get_bot()
+    Offline stand-in for aiogram.Bot (tests, dry runs).
 
-        text = (
-            f"✅ <b>Заявка принята!</b>\n\n"
-            f"<b>{friend_name}</b> теперь твой друг.\n"
-            f"Тренируйтесь вместе и соревнуйтесь!"
-        )
+    Records sent messages; retry_after maps chat_id -> seconds for which the
+    first send to that chat raises TelegramRetryAfter.
+    """
 
-        await bot.send_message(
-            chat_id=telegram_id,
-            text=text,
-            reply_markup=get_open_app_keyboard(),
-        )
+    def __init__(
+        self,
+        latency: float = 0.0,
+        retry_after: dict[int, int] | None = None,
+        fail_chat_ids: Iterable[int] = (),
+    ):
+        self.latency = latency
+        self.retry_after = dict(retry_after or {})
+        self.fail_chat_ids = set(fail_chat_ids)
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if chat_id in self.retry_after:
+            from aiogram.methods import SendMessage
+
+            seconds = self.retry_after.pop(chat_id)
+            raise TelegramRetryAfter(
+                method=SendMessage(chat_id=chat_id, text=text),
+                message="Too Many Requests",
+                retry_after=seconds,
+            )
+        if chat_id in self.fail_chat_ids:
+            raise RuntimeError(f"chat {chat_id} unreachable")
+        self.sent.append((chat_id, text))
 
-        logger.info(f"Friend accepted notification sent to {telegram_id}")
-        return True
 
-    except Exception as e:
-        logger.error(f"Failed to send friend accepted notification to {telegram_id}: {e}")
+class PushDispatcher:
+    """
+    Concurrent, rate-limited sender of Telegram pushes.
+
+    A bounded pool of workers sends messages while respecting a global and a
+    per-chat token bucket. TelegramRetryAfter (429) pauses every worker for
+    the requested time and retries; network/server errors are retried with
+    backoff; other errors fail the message. In-app notifications of
+    delivered messages are written in multi-row batches.
+
+    Args:
+        bot: Bot client (default: get_bot()); FakeBot works offline
+        concurrency: Number of workers
+        global_rate: Messages per second across all chats
+        per_chat_rate: Messages per second to one chat
+        max_retries: Retries per message after the first attempt
+        persist_batch_size: In-app notification rows per INSERT
+    """
+
+    def __init__(
+        self,
+        bot: Any | None = None,
+        concurrency: int | None = None,
+        global_rate: float | None = None,
+        per_chat_rate: float | None = None,
+        max_retries: int | None = None,
+        persist_batch_size: int = 500,
+    ):
+        self._bot = bot
+        self.concurrency = concurrency or settings.push_concurrency
+        self.global_bucket = TokenBucket(global_rate or settings.push_global_rate)
+        self.per_chat_rate = per_chat_rate or settings.push_per_chat_rate
+        self.max_retries = max_retries if max_retries is not None else settings.push_max_retries
+        self.persist_batch_size = persist_batch_size
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        self._paused_until = 0.0
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, 1)
+        return bucket
+
+    async def _wait_if_paused(self) -> None:
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _send(self, bot: Any, push: PushMessage, result: DispatchResult) -> bool:
+        for attempt in range(self.max_retries + 1):
+            await self._wait_if_paused()
+            await self._chat_bucket(push.chat_id).acquire()
+            await self.global_bucket.acquire()
+            try:
+                await bot.send_message(
+                    chat_id=push.chat_id,
+                    text=push.text,
+                    reply_markup=get_open_app_keyboard(),
+                )
+                return True
+            except TelegramRetryAfter as e:
+                # Flood control applies to the whole bot: pause all workers
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                push.error = str(e)
+                logger.warning(f"[PushDispatcher] Rate limited, retry after {e.retry_after}s")
+            except (TelegramNetworkError, TelegramServerError) as e:
+                push.error = str(e)
+                logger.warning(f"[PushDispatcher] Transient error for {push.chat_id}: {e}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+            except Exception as e:
+                push.error = str(e)
+                logger.error(f"[PushDispatcher] Failed to send to {push.chat_id}: {e}")
+                return False
+            result.retried += 1
+        logger.error(f"[PushDispatcher] Giving up on {push.chat_id} after {self.max_retries} retries")
         return False
 
+    async def dispatch(
+        self,
+        messages: Iterable[PushMessage],
+        session: AsyncSession | None = None,
+    ) -> DispatchResult:
+        """
+        Send messages and store in-app notifications for delivered ones.
+
+        Args:
+            messages: Pushes to send
+            session: Session for in-app notification rows (not committed);
+                None skips persistence
+
+        Returns:
+            DispatchResult with counters
+        """
+        messages = list(messages)
+        result = DispatchResult()
+        if not messages:
+            return result
+
+        try:
+            bot = self._bot or get_bot()
+        except Exception as e:
+            logger.error(f"[PushDispatcher] Bot unavailable: {e}")
+            for push in messages:
+                push.error = str(e)
+            result.failed = len(messages)
+            result.failed_messages = messages
+            return result
+
+        queue: asyncio.Queue[PushMessage] = asyncio.Queue()
+        for push in messages:
+            queue.put_nowait(push)
+        delivered: list[PushMessage] = []
+
+        async def worker() -> None:
+            while True:
+                try:
+                    push = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                if await self._send(bot, push, result):
+                    result.sent += 1
+                    delivered.append(push)
+                else:
+                    result.failed += 1
+                    result.failed_messages.append(push)
+
+        workers = min(self.concurrency, len(messages))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+
+        if session is not None:
+            rows = [row for push in delivered if (row := push.notification_row())]
+            await save_notifications(session, rows, self.persist_batch_size)
+
+        # Per-chat buckets are only needed within one run
+        self._chat_buckets.clear()
+        return result
+
 
 async def close_bot():
     """Close bot session (call on app shutdown)."""
@@ -0,0 +1,131 @@
+"""
+Public profile cards of other users.
+
+A card is the user's public fields, unlocked achievement slugs and the
+friendship state relative to the viewer. All of it is read with one
+statement: users LEFT JOIN user_achievements, with the friendship lookups in
+both directions as correlated scalar subqueries. The same statement serves
+any number of users, so friend lists fetch all cards in one round trip.
+"""
+
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User, UserAchievement, Friendship
+from app.schemas import UserProfileResponse
+
+
+def _profile_query(viewer_id: int, user_ids: list[int]):
+    # Friendship row from the viewer's side (viewer → user). For accepted
+    # friendships there are 2 records (bidirectional); for pending, only the
+    # requester's record exists.
+    outgoing = (
+        select(Friendship.id)
+        .where(Friendship.user_id == viewer_id)
+        .where(Friendship.friend_id == User.id)
+        .correlate(User)
+    )
+    # Pending request from the user to the viewer (user → viewer)
+    incoming_id = (
+        select(Friendship.id)
+        .where(Friendship.user_id == User.id)
+        .where(Friendship.friend_id == viewer_id)
+        .where(Friendship.status == "pending")
+        .correlate(User)
+        .limit(1)
+        .scalar_subquery()
+    )
+    outgoing_id = outgoing.limit(1).scalar_subquery()
+    outgoing_status = outgoing.with_only_columns(Friendship.status).limit(1).scalar_subquery()
+
+    return (
+        select(
+            User.id,
+            User.username,
+            User.first_name,
+            User.avatar_id,
+            User.level,
+            User.total_xp,
+            User.coins,
+            User.current_streak,
+            UserAchievement.achievement_slug,
+            outgoing_id.label("outgoing_id"),
+            outgoing_status.label("outgoing_status"),
+            incoming_id.label("incoming_id"),
+        )
+        .outerjoin(UserAchievement, UserAchievement.user_id == User.id)
+        .where(User.id.in_(user_ids))
+        .order_by(User.id, UserAchievement.id)
+    )
+
+
+async def get_profile_cards(
+    session: AsyncSession,
+    viewer_id: int,
+    user_ids: Iterable[int],
+) -> list[UserProfileResponse]:
+    """
+    Build profile cards for several users in one query.
+
+    Args:
+        session: Database session
+        viewer_id: ID of the user looking at the profiles
+        user_ids: Users to load
+
+    Returns:
+        Cards in the order of user_ids; unknown IDs are skipped
+    """
+    user_ids = list(dict.fromkeys(user_ids))
+    if not user_ids:
+        return []
+
+    result = await session.execute(_profile_query(viewer_id, user_ids))
+
+    cards: dict[int, UserProfileResponse] = {}
+    for row in result.all():
+        card = cards.get(row.id)
+        if card is None:
+            is_friend = False
+            friend_request_sent = False
+            friend_request_received = False
+            friendship_id = None
+            if row.id != viewer_id:
+                if row.outgoing_id is not None:
+                    is_friend = row.outgoing_status == "accepted"
+                    friend_request_sent = row.outgoing_status == "pending"
+                    friendship_id = row.outgoing_id
+                elif row.incoming_id is not None:
+                    friend_request_received = True
+                    friendship_id = row.incoming_id
+
+            card = cards[row.id] = UserProfileResponse(
+                id=row.id,
+                username=row.username,
+                first_name=row.first_name,
+                avatar_id=row.avatar_id or "shadow-wolf",
+                level=row.level,
+                total_xp=row.total_xp,
+                coins=row.coins,
+                current_streak=row.current_streak,
+                achievements=[],
+                is_friend=is_friend,
+                friend_request_sent=friend_request_sent,
+                friend_request_received=friend_request_received,
+                friendship_id=friendship_id,
+            )
+        if row.achievement_slug is not None:
+            card.achievements.append(row.achievement_slug)
+
+    return [cards[user_id] for user_id in user_ids if user_id in cards]
+
+
+async def get_profile_card(
+    session: AsyncSession,
+    viewer_id: int,
+    user_id: int,
+) -> UserProfileResponse | None:
+    """Build one profile card (None if the user does not exist)."""
+    cards = await get_profile_cards(session, viewer_id, [user_id])
+    return cards[0] if cards else None
@@ -0,0 +1,99 @@
+"""
+Query plan checks for the hot queries of the API and scheduler.
+
+Each hot query is taken from the same builder function the route or job
+executes, explained on the current connection, and checked for full
+scans of the table it must read through an index. Used by
+scripts/check_query_plans.py and tests/test_query_plans.py.
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+def get_hot_queries() -> list[tuple[str, str, object]]:
+    """(name, table that must not be fully scanned, statement) per hot query."""
+    # Imported here: the builders live in route and service modules that
+    # import app.db themselves
+    from app.api.routes.leaderboard import friends_leaderboard_query
+    from app.api.routes.notifications import notifications_page_query
+    from app.api.routes.workouts import (
+        active_workout_query,
+        today_stats_query,
+        workout_history_query,
+    )
+    from app.services.notification_outbox import due_outbox_query
+    from app.services.notification_retention import (
+        expired_notifications_query,
+        get_retention_rules,
+    )
+    from app.services.scheduler import daily_reminder_query, inactivity_reminder_query
+    from app.services.weekly_leaderboard import (
+        get_iso_week,
+        weekly_top_query,
+        weekly_xp_totals_query,
+    )
+    from app.services.workout_processor import active_goals_query, exercise_progress_query
+
+    user_id = 1
+    today = date.today()
+    now = datetime.utcnow()
+    week_start = datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time())
+
+    queries = [
+        ("active workout", "workout_sessions", active_workout_query(user_id)),
+        ("workout history page", "workout_sessions", workout_history_query(user_id, 21)),
+        (
+            "workout history next page",
+            "workout_sessions",
+            workout_history_query(user_id, 21, after=(now, 100)),
+        ),
+        ("today stats", "workout_sessions", today_stats_query(user_id, today)),
+        ("weekly XP rebuild", "workout_sessions", weekly_xp_totals_query(week_start)),
+        ("weekly leaderboard top", "user_weekly_xp", weekly_top_query(get_iso_week(today), 50)),
+        ("friends leaderboard", "friendships", friends_leaderboard_query(user_id)),
+        ("daily reminders", "users", daily_reminder_query(9, today)),
+        ("daily reminders next chunk", "users", daily_reminder_query(9, today, after_id=100)),
+        ("inactivity reminders", "users", inactivity_reminder_query(today - timedelta(days=3))),
+        (
+            "inactivity reminders next chunk",
+            "users",
+            inactivity_reminder_query(today - timedelta(days=3), after=(today - timedelta(days=30), 100)),
+        ),
+        ("exercise progress", "user_exercise_progress", exercise_progress_query(user_id, [1, 2, 3])),
+        ("active goals", "user_goals", active_goals_query(user_id, today)),
+        ("notifications page", "notifications", notifications_page_query(user_id, 21)),
+        (
+            "notifications next page",
+            "notifications",
+            notifications_page_query(user_id, 21, before_id=100),
+        ),
+        ("outbox drain", "notification_outbox", due_outbox_query(now, 100)),
+    ]
+    for i, (criteria, cutoff) in enumerate(get_retention_rules(now)):
+        queries.append((
+            f"notification retention purge #{i + 1}",
+            "notifications",
+            expired_notifications_query(criteria, cutoff, 5000),
+        ))
+    return queries
+
+
+def find_full_scans(dialect: str, plan: list[str], table: str) -> list[str]:
+    """Plan lines that read the whole table."""
+    if dialect == "sqlite":
+        # "SCAN <table>" (optionally "USING INDEX" = full index scan);
+        # indexed lookups are reported as "SEARCH <table> ..."
+        return [line for line in plan if line.split()[:2] == ["SCAN", table]]
+    return [line for line in plan if f"Seq Scan on {table}" in line]
+
+
+async def explain(conn: AsyncConnection, stmt) -> list[str]:
+    """Plan lines of a statement (literal parameters inlined)."""
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in result.all()]
+    result = await conn.exec_driver_sql(f"EXPLAIN {sql}")
+    return [row[0] for row in result.all()]
@@ -0,0 +1,125 @@
+"""
+Registry of predefined workout routines (data/routines/*.json).
+
+Routine files are read and parsed once; requests are served from prebuilt
+RoutineData objects indexed by slug and category. A content hash of the
+files is exposed as an ETag so clients can revalidate with If-None-Match.
+
+In debug mode the registry checks file modification times (at most once
+per RELOAD_CHECK_SECONDS) and reloads after edits.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.schemas import RoutineData, RoutineExerciseData
+from app.services.data_loader import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+ROUTINES_DIR = DATA_DIR / "routines"
+RELOAD_CHECK_SECONDS = 1.0
+
+
+def _build_routine(r: dict) -> RoutineData:
+    return RoutineData(
+        slug=r["slug"],
+        name=r["name"],
+        description=r["description"],
+        category=r.get("category", "morning"),
+        duration_minutes=r["duration_minutes"],
+        difficulty=r["difficulty"],
+        exercises=[
+            RoutineExerciseData(
+                slug=ex["slug"],
+                reps=ex.get("reps"),
+                duration=ex.get("duration"),
+            )
+            for ex in r["exercises"]
+        ],
+    )
+
+
+class RoutineRegistry:
+    """In-memory routine registry (process-local)."""
+
+    def __init__(self, routines_dir: Path = ROUTINES_DIR, watch: bool = False):
+        self.routines_dir = routines_dir
+        self.watch = watch
+        self.etag = ""
+        self._routines: tuple[RoutineData, ...] = ()
+        self._by_slug: dict[str, RoutineData] = {}
+        self._by_category: dict[str, tuple[RoutineData, ...]] = {}
+        self._mtimes: dict[str, float] = {}
+        self._loaded = False
+        self._last_check = 0.0
+
+    def _scan_mtimes(self) -> dict[str, float]:
+        return {p.name: p.stat().st_mtime for p in self.routines_dir.glob("*.json")}
+
+    def load(self) -> None:
+        """(Re)load every routine file and rebuild the indexes."""
+        files = {path.name: path.read_bytes() for path in self.routines_dir.glob("*.json")}
+        digest = hashlib.sha256()
+        routines = []
+
+        for raw in files.values():
+            routines.extend(_build_routine(r) for r in json.loads(raw))
+
+        # Hash in name order so the ETag does not depend on listing order
+        for name in sorted(files):
+            digest.update(name.encode())
+            digest.update(files[name])
+
+        by_category: dict[str, list[RoutineData]] = {}
+        by_slug: dict[str, RoutineData] = {}
+        for routine in routines:
+            by_category.setdefault(routine.category, []).append(routine)
+            # First occurrence wins, like the previous linear scan
+            by_slug.setdefault(routine.slug, routine)
+
+        self._routines = tuple(routines)
+        self._by_slug = by_slug
+        self._by_category = {k: tuple(v) for k, v in by_category.items()}
+        self.etag = f'"{digest.hexdigest()[:32]}"'
+        self._mtimes = self._scan_mtimes()
+        self._loaded = True
+        logger.debug(f"[RoutineRegistry] Loaded {len(routines)} routines from {len(files)} files")
+
+    def _ensure_fresh(self) -> None:
+        if not self._loaded:
+            self.load()
+            return
+        if not self.watch:
+            return
+        now = time.monotonic()
+        if now - self._last_check < RELOAD_CHECK_SECONDS:
+            return
+        self._last_check = now
+        if self._scan_mtimes() != self._mtimes:
+            logger.info("[RoutineRegistry] Routine files changed, reloading")
+            self.load()
+
+    def all(self, category: str | None = None) -> tuple[RoutineData, ...]:
+        """All routines, optionally only one category."""
+        self._ensure_fresh()
+        if category:
+            return self._by_category.get(category, ())
+        return self._routines
+
+    def get(self, slug: str) -> RoutineData | None:
+        """Routine by slug."""
+        self._ensure_fresh()
+        return self._by_slug.get(slug)
+
+    def current_etag(self) -> str:
+        """ETag of the loaded routine files."""
+        self._ensure_fresh()
+        return self.etag
+
+
+routine_registry = RoutineRegistry(watch=settings.debug)
@@ -13,19 +13,143 @@ Includes built-in APScheduler integration for automatic scheduling.
 
 import logging
 from datetime import datetime, date, timedelta
-from sqlalchemy import select
+from typing import Callable
+from sqlalchemy import Row, Select, select, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
+from app.config import settings
 from app.db.models import User
-from app.services.notifications import send_daily_reminder, send_inactivity_reminder, save_notification
+from app.services.notifications import (
+    PushDispatcher,
+    PushMessage,
+    build_daily_reminder_notification,
+    build_daily_reminder_text,
+    build_inactivity_reminder_notification,
+    build_inactivity_reminder_text,
+)
 
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler: AsyncIOScheduler | None = None
 
+# Recipients loaded, pushes sent and in-app rows committed per chunk by
+# the reminder jobs
+REMINDER_CHUNK_SIZE = 500
+
+
+def daily_reminder_query(
+    hour: int,
+    today: date,
+    after_id: int | None = None,
+    limit: int | None = None,
+) -> Select:
+    """
+    Select one chunk of (id, telegram_id, current_streak) of opted-in users
+    in the hour's notification bucket who haven't worked out today.
+
+    Keyset over id, served by idx_users_notification_hour_enabled.
+
+    Args:
+        hour: Notification hour bucket
+        today: Users who worked out on this date are skipped
+        after_id: Last id of the previous chunk
+        limit: Chunk size (default: REMINDER_CHUNK_SIZE)
+    """
+    stmt = (
+        select(User.id, User.telegram_id, User.current_streak)
+        .where(User.notification_hour == hour)
+        .where(User.notifications_enabled == True)
+        .where(or_(User.last_workout_date.is_(None), User.last_workout_date != today))
+        .order_by(User.id)
+        .limit(limit or REMINDER_CHUNK_SIZE)
+    )
+    if after_id is not None:
+        stmt = stmt.where(User.id > after_id)
+    return stmt
+
+
+def inactivity_reminder_query(
+    last_workout_before: date,
+    after: tuple[date, int] | None = None,
+    limit: int | None = None,
+) -> Select:
+    """
+    Select one chunk of (id, telegram_id, last_workout_date) of opted-in
+    users whose last workout was on or before the given date.
+
+    Keyset over (last_workout_date, id), served by
+    idx_users_enabled_last_workout.
+
+    Args:
+        last_workout_before: Latest last_workout_date to remind
+        after: (last_workout_date, id) of the last row of the previous chunk
+        limit: Chunk size (default: REMINDER_CHUNK_SIZE)
+    """
+    stmt = (
+        select(User.id, User.telegram_id, User.last_workout_date)
+        .where(User.notifications_enabled == True)
+        .where(User.last_workout_date.isnot(None))
+        .where(User.last_workout_date <= last_workout_before)
+        .order_by(User.last_workout_date, User.id)
+        .limit(limit or REMINDER_CHUNK_SIZE)
+    )
+    if after is not None:
+        after_date, after_id = after
+        # The >= bound lets the index range start at the previous chunk
+        stmt = (
+            stmt.where(User.last_workout_date >= after_date)
+            .where(or_(User.last_workout_date > after_date, User.id > after_id))
+        )
+    return stmt
+
+
+async def _send_in_chunks(
+    session: AsyncSession,
+    chunk_query: Callable[[Row | None], Select],
+    to_message: Callable[[Row], PushMessage],
+) -> int:
+    """
+    Stream recipients chunk by chunk, send their pushes and commit each
+    chunk's in-app rows.
+
+    The read transaction of a chunk ends before its pushes are sent, and
+    the in-app rows are written after the sends finish and committed right
+    away, so no transaction is held while Telegram is called.
+
+    Args:
+        session: Database session (committed per chunk)
+        chunk_query: Builds the next chunk's query from the previous
+            chunk's last row (None for the first chunk)
+        to_message: Builds the push for a recipient row
+
+    Returns:
+        Number of pushes sent
+    """
+    dispatcher = PushDispatcher()
+    sent_count = 0
+    last_row = None
+
+    while True:
+        result = await session.execute(chunk_query(last_row))
+        rows = result.all()
+        await session.commit()
+        if not rows:
+            break
+
+        dispatched = await dispatcher.dispatch([to_message(row) for row in rows], session)
+        await session.commit()
+        sent_count += dispatched.sent
+
+        if len(rows) < REMINDER_CHUNK_SIZE:
+            break
+        last_row = rows[-1]
+
+    return sent_count
+
 
 async def check_daily_reminders(session: AsyncSession) -> int:
     """
@@ -33,9 +157,11 @@ async def check_daily_reminders(session: AsyncSession) -> int:
 
     Sends to users who:
     - Have notifications_enabled = True (opted in for Telegram pushes)
-    - Have notification_time set matching current hour
+    - Have notification_time set matching current hour (notification_hour bucket)
     - Haven't worked out today
 
+    Commits the in-app notifications of each sent chunk.
+
     Returns:
         Number of reminders sent
     """
@@ -43,50 +169,24 @@ async def check_daily_reminders(session: AsyncSession) -> int:
     current_hour = now.hour
     today = now.date()
 
-    # Find users whose notification_time hour matches current hour
-    result = await session.execute(
-        select(User)
-        .where(User.notifications_enabled == True)
-        .where(User.notification_time.isnot(None))
-    )
-    users = result.scalars().all()
-
-    sent_count = 0
-
-    for user in users:
-        if user.notification_time is None:
-            continue
-
-        # Check if it's the right hour for this user
-        if user.notification_time.hour != current_hour:
-            continue
-
-        # Don't send if already worked out today
-        if user.last_workout_date == today:
-            continue
-
-        # Send Telegram push
-        success = await send_daily_reminder(
-            telegram_id=user.telegram_id,
-            streak=user.current_streak,
+    def to_message(row: Row) -> PushMessage:
+        title, message = build_daily_reminder_notification(row.current_streak)
+        return PushMessage(
+            chat_id=row.telegram_id,
+            text=build_daily_reminder_text(row.current_streak),
+            # Also saved as in-app notification when delivered
+            user_id=row.id,
+            notification_type="daily_reminder",
+            title=title,
+            message=message,
         )
 
-        if success:
-            sent_count += 1
-            # Also save as in-app notification
-            if user.current_streak > 0:
-                title = "Время тренировки!"
-                message = f"Твой streak: {user.current_streak} дней подряд! Не останавливайся!"
-            else:
-                title = "Время тренировки!"
-                message = "Начни свой день с упражнений. Даже 10 минут — это уже прогресс!"
-            await save_notification(
-                session=session,
-                user_id=user.id,
-                notification_type="daily_reminder",
-                title=title,
-                message=message,
-            )
+    # Only users in this hour's bucket who haven't worked out today
+    sent_count = await _send_in_chunks(
+        session,
+        lambda last: daily_reminder_query(current_hour, today, after_id=last.id if last else None),
+        to_message,
+    )
 
     if sent_count > 0:
         logger.info(f"Sent {sent_count} daily reminders")
@@ -103,42 +203,36 @@ async def check_inactivity_reminders(session: AsyncSession) -> int:
     - Haven't worked out in 3+ days
     - Have done at least one workout before
 
+    Commits the in-app notifications of each sent chunk.
+
     Returns:
         Number of reminders sent
     """
     today = date.today()
     three_days_ago = today - timedelta(days=3)
 
-    # Find users who last worked out 3+ days ago
-    result = await session.execute(
-        select(User)
-        .where(User.notifications_enabled == True)
-        .where(User.last_workout_date.isnot(None))
-        .where(User.last_workout_date <= three_days_ago)
-    )
-    users = result.scalars().all()
-
-    sent_count = 0
-
-    for user in users:
-        days_inactive = (today - user.last_workout_date).days
-
-        # Send Telegram push
-        success = await send_inactivity_reminder(
-            telegram_id=user.telegram_id,
-            days_inactive=days_inactive,
+    def to_message(row: Row) -> PushMessage:
+        days_inactive = (today - row.last_workout_date).days
+        title, message = build_inactivity_reminder_notification(days_inactive)
+        return PushMessage(
+            chat_id=row.telegram_id,
+            text=build_inactivity_reminder_text(days_inactive),
+            # Also saved as in-app notification when delivered
+            user_id=row.id,
+            notification_type="inactivity_reminder",
+            title=title,
+            message=message,
         )
 
-        if success:
-            sent_count += 1
-            # Also save as in-app notification
-            await save_notification(
-                session=session,
-                user_id=user.id,
-                notification_type="inactivity_reminder",
-                title="Мы скучаем!",
-                message=f"Прошло уже {days_inactive} дней без тренировок. Вернись к занятиям!",
-            )
+    # Users who last worked out 3+ days ago
+    sent_count = await _send_in_chunks(
+        session,
+        lambda last: inactivity_reminder_query(
+            three_days_ago,
+            after=(last.last_workout_date, last.id) if last else None,
+        ),
+        to_message,
+    )
 
     if sent_count > 0:
         logger.info(f"Sent {sent_count} inactivity reminders")
@@ -156,7 +250,6 @@ async def hourly_notification_job():
     async with async_session_maker() as session:
         try:
             count = await check_daily_reminders(session)
-            await session.commit()
             if count > 0:
                 logger.info(f"Hourly job: sent {count} daily reminders")
         except Exception as e:
@@ -173,13 +266,92 @@ async def daily_inactivity_job():
     async with async_session_maker() as session:
         try:
             count = await check_inactivity_reminders(session)
-            await session.commit()
             if count > 0:
                 logger.info(f"Daily job: sent {count} inactivity reminders")
         except Exception as e:
             logger.error(f"Error in daily inactivity job: {e}")
 
 
+async def leaderboard_refresh_job():
+    """
+    Job function called by APScheduler periodically.
+    Resyncs the in-memory leaderboard index with the database so XP
+    changes committed by other workers/processes are picked up.
+    """
+    from app.db.database import async_session_maker
+    from app.services.leaderboard_index import leaderboard_index
+
+    async with async_session_maker() as session:
+        try:
+            await leaderboard_index.refresh(session)
+        except Exception as e:
+            logger.error(f"Error in leaderboard refresh job: {e}")
+
+
+async def weekly_rollover_job():
+    """
+    Job function called by APScheduler at the start of every ISO week (UTC).
+    Purges weekly leaderboard buckets that are no longer needed.
+    """
+    from app.db.database import async_session_maker
+    from app.services.weekly_leaderboard import rollover_weekly_xp
+
+    async with async_session_maker() as session:
+        try:
+            count = await rollover_weekly_xp(session, settings.weekly_xp_keep_weeks)
+            await session.commit()
+            logger.info(f"Weekly rollover: purged {count} old weekly XP buckets")
+        except Exception as e:
+            logger.error(f"Error in weekly rollover job: {e}")
+
+
+async def outbox_drain_job():
+    """
+    Job function called by APScheduler every few seconds.
+    Sends queued Telegram pushes from the notification outbox.
+    """
+    from app.db.database import async_session_maker
+    from app.services.notification_outbox import drain_outbox_batch
+
+    async with async_session_maker() as session:
+        try:
+            while True:
+                result, fetched = await drain_outbox_batch(session)
+                await session.commit()
+                if fetched:
+                    logger.info(
+                        f"Outbox: sent {result.sent}, retrying {result.retried}, "
+                        f"dead {result.dead}"
+                    )
+                if fetched < settings.outbox_batch_size:
+                    break
+        except Exception as e:
+            logger.error(f"Error in outbox drain job: {e}")
+
+
+async def notification_purge_job():
+    """
+    Job function called by APScheduler once per night.
+    Deletes in-app notifications past their retention period, one chunk
+    per transaction.
+    """
+    from app.db.database import async_session_maker
+    from app.services.notification_retention import purge_expired_batch
+
+    total = 0
+    async with async_session_maker() as session:
+        try:
+            while True:
+                deleted = await purge_expired_batch(session)
+                await session.commit()
+                total += deleted
+                if not deleted:
+                    break
+            logger.info(f"Notification purge: deleted {total} expired notifications")
+        except Exception as e:
+            logger.error(f"Error in notification purge job: {e}")
+
+
 def start_scheduler():
     """
     Start the APScheduler for periodic notification checks.
@@ -211,6 +383,45 @@ def start_scheduler():
         replace_existing=True,
     )
 
+    # Roll weekly leaderboard buckets over at Monday 00:00 UTC
+    scheduler.add_job(
+        weekly_rollover_job,
+        trigger=CronTrigger(day_of_week="mon", hour=0, minute=0, timezone="UTC"),
+        id="weekly_rollover",
+        name="Roll over weekly leaderboard (weekly)",
+        replace_existing=True,
+    )
+
+    # Resync leaderboard index
+    scheduler.add_job(
+        leaderboard_refresh_job,
+        trigger=IntervalTrigger(minutes=settings.leaderboard_refresh_minutes),
+        id="leaderboard_refresh",
+        name="Resync leaderboard index",
+        replace_existing=True,
+    )
+
+    # Purge expired in-app notifications at 03:30
+    scheduler.add_job(
+        notification_purge_job,
+        trigger=CronTrigger(hour=3, minute=30),
+        id="notification_purge",
+        name="Purge expired notifications (daily)",
+        replace_existing=True,
+        max_instances=1,
+    )
+
+    # Drain queued Telegram pushes
+    scheduler.add_job(
+        outbox_drain_job,
+        trigger=IntervalTrigger(seconds=settings.outbox_drain_seconds),
+        id="outbox_drain",
+        name="Send queued Telegram pushes",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
     scheduler.start()
     logger.info("Notification scheduler started (hourly + daily jobs)")
 
@@ -0,0 +1,62 @@
+"""
+In-process wake-up hub for unread notification counters.
+
+Long-poll requests for the badge subscribe here and are woken as soon as a
+transaction that changed the user's users.unread_notifications commits in
+this worker (see the after_commit listener in app.services.notifications).
+Changes made by other workers are picked up when the long-poll times out
+and re-reads the counter, so the hub only ever makes updates faster.
+"""
+
+import asyncio
+
+
+class UnreadHub:
+    """Per-user futures resolved when the user's unread counter changes."""
+
+    def __init__(self):
+        self._waiters: dict[int, set[asyncio.Future]] = {}
+
+    def subscribe(self, user_id: int) -> asyncio.Future:
+        """Register interest in the next change for user_id."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, set()).add(waiter)
+        return waiter
+
+    def unsubscribe(self, user_id: int, waiter: asyncio.Future) -> None:
+        waiters = self._waiters.get(user_id)
+        if waiters is None:
+            return
+        waiters.discard(waiter)
+        if not waiters:
+            del self._waiters[user_id]
+
+    async def wait(self, user_id: int, waiter: asyncio.Future, timeout: float) -> bool:
+        """
+        Wait for a subscribed change.
+
+        Returns:
+            True if the counter changed, False on timeout
+        """
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.unsubscribe(user_id, waiter)
+
+    def publish(self, user_ids) -> None:
+        """Wake every waiter of the given users."""
+        for user_id in user_ids:
+            for waiter in self._waiters.pop(user_id, ()):
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+
+# Global instance used by the notification service and the long-poll route
+unread_hub = UnreadHub()
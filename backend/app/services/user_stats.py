@@ -0,0 +1,228 @@
+"""
+Per-user stats rollup (user_stats table).
+
+Lifetime totals and the current ISO-week bucket are maintained
+incrementally when a workout is completed and when achievements are
+unlocked, so the profile screen reads a single row by primary key.
+
+Counters are incremented with a single UPDATE ... SET col = col + n, so
+concurrent completions for the same user cannot lose an update.
+
+If a row is missing (new user, or rollup not backfilled yet) it is rebuilt
+from workout_sessions / user_achievements with an upsert, so concurrent
+rebuilds for the same user do not conflict. Pending changes are flushed
+first, so the rebuilt row already includes them and no increment is
+applied on top.
+"""
+
+from datetime import date, timedelta
+from typing import Iterable
+
+from sqlalchemy import select, func, update, case, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User, UserStats, WorkoutSession, UserAchievement
+from app.db.upsert import upsert_insert
+
+
+def get_week_start(d: date) -> date:
+    """Get Monday of the current week."""
+    return d - timedelta(days=d.weekday())
+
+
+async def get_user_stats(session: AsyncSession, user_id: int) -> UserStats:
+    """
+    Get the stats rollup for a user, rebuilding it if missing.
+
+    Args:
+        session: Database session
+        user_id: User ID
+
+    Returns:
+        UserStats row
+    """
+    stats = await session.get(UserStats, user_id)
+    if stats is None:
+        await rebuild_user_stats(session, [user_id])
+        stats = await session.get(UserStats, user_id)
+    return stats
+
+
+async def record_workout(session: AsyncSession, workout: WorkoutSession) -> None:
+    """
+    Add a completed (and flushed) workout to the user's rollup.
+
+    Args:
+        session: Database session
+        workout: Completed workout session
+    """
+    workout_week = get_week_start(workout.started_at.date())
+    workout_xp = workout.total_xp_earned or 0
+
+    # A newer week rolls the bucket over; an older week leaves it untouched
+    rolls_over = or_(UserStats.week_start.is_(None), UserStats.week_start < workout_week)
+    same_week = UserStats.week_start == workout_week
+
+    result = await session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == workout.user_id)
+        .values(
+            total_workouts=UserStats.total_workouts + 1,
+            total_reps=UserStats.total_reps + (workout.total_reps or 0),
+            total_duration_seconds=UserStats.total_duration_seconds + (workout.duration_seconds or 0),
+            week_start=case((rolls_over, workout_week), else_=UserStats.week_start),
+            week_workouts=case(
+                (rolls_over, 1),
+                (same_week, UserStats.week_workouts + 1),
+                else_=UserStats.week_workouts,
+            ),
+            week_xp=case(
+                (rolls_over, workout_xp),
+                (same_week, UserStats.week_xp + workout_xp),
+                else_=UserStats.week_xp,
+            ),
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+    if not result.rowcount:
+        # Rebuild already counts this workout
+        await rebuild_user_stats(session, [workout.user_id])
+
+
+async def record_achievements(session: AsyncSession, user_id: int, count: int) -> None:
+    """
+    Add newly unlocked achievements to the user's rollup.
+
+    Args:
+        session: Database session
+        user_id: User ID
+        count: Number of achievements unlocked
+    """
+    if count <= 0:
+        return
+
+    result = await session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(achievements_count=UserStats.achievements_count + count)
+        .execution_options(synchronize_session="fetch")
+    )
+    if not result.rowcount:
+        # Rebuild already counts the pending achievements
+        await rebuild_user_stats(session, [user_id])
+
+
+def get_week_counters(stats: UserStats, today: date | None = None) -> tuple[int, int]:
+    """
+    Get (workouts, xp) for the current week from a rollup row.
+
+    Returns zeros when the stored bucket belongs to a past week.
+    """
+    week_start = get_week_start(today or date.today())
+    if stats.week_start != week_start:
+        return 0, 0
+    return stats.week_workouts, stats.week_xp
+
+
+async def rebuild_user_stats(
+    session: AsyncSession,
+    user_ids: Iterable[int] | None = None,
+) -> int:
+    """
+    Rebuild rollup rows from source tables (backfill / repair).
+
+    Args:
+        session: Database session
+        user_ids: Users to rebuild; None rebuilds every user
+
+    Returns:
+        Number of rows written
+    """
+    ids = list(user_ids) if user_ids is not None else None
+    await session.flush()
+
+    def scoped(stmt, column):
+        return stmt.where(column.in_(ids)) if ids is not None else stmt
+
+    week_start = get_week_start(date.today())
+
+    users_result = await session.execute(scoped(select(User.id), User.id))
+    target_ids = list(users_result.scalars().all())
+    if not target_ids:
+        return 0
+
+    totals_result = await session.execute(
+        scoped(
+            select(
+                WorkoutSession.user_id,
+                func.count(WorkoutSession.id),
+                func.coalesce(func.sum(WorkoutSession.total_reps), 0),
+                func.coalesce(func.sum(WorkoutSession.duration_seconds), 0),
+            )
+            .where(WorkoutSession.status == "completed")
+            .group_by(WorkoutSession.user_id),
+            WorkoutSession.user_id,
+        )
+    )
+    totals = {row[0]: row[1:] for row in totals_result.all()}
+
+    week_result = await session.execute(
+        scoped(
+            select(
+                WorkoutSession.user_id,
+                func.count(WorkoutSession.id),
+                func.coalesce(func.sum(WorkoutSession.total_xp_earned), 0),
+            )
+            .where(WorkoutSession.status == "completed")
+            .where(func.date(WorkoutSession.started_at) >= week_start)
+            .group_by(WorkoutSession.user_id),
+            WorkoutSession.user_id,
+        )
+    )
+    week = {row[0]: row[1:] for row in week_result.all()}
+
+    achievements_result = await session.execute(
+        scoped(
+            select(UserAchievement.user_id, func.count(UserAchievement.id))
+            .group_by(UserAchievement.user_id),
+            UserAchievement.user_id,
+        )
+    )
+    achievements = dict(achievements_result.all())
+
+    rows = []
+    for user_id in target_ids:
+        total_workouts, total_reps, total_duration = totals.get(user_id, (0, 0, 0))
+        week_workouts, week_xp = week.get(user_id, (0, 0))
+        rows.append({
+            "user_id": user_id,
+            "total_workouts": total_workouts,
+            "total_reps": total_reps,
+            "total_duration_seconds": total_duration,
+            "achievements_count": achievements.get(user_id, 0),
+            "week_start": week_start,
+            "week_workouts": week_workouts,
+            "week_xp": week_xp,
+        })
+
+    stmt = upsert_insert(session, UserStats.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={
+            name: stmt.excluded[name]
+            for name in rows[0]
+            if name != "user_id"
+        },
+    )
+    await session.execute(stmt, rows)
+
+    # Drop stale identity-map copies of the rebuilt rows so the next get()
+    # reads them fresh
+    rebuilt = set(target_ids)
+    for stats in [
+        obj for obj in session.identity_map.values()
+        if isinstance(obj, UserStats) and obj.user_id in rebuilt
+    ]:
+        session.expunge(stats)
+
+    return len(rows)
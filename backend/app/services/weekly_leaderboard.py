@@ -0,0 +1,172 @@
+"""
+Materialized weekly XP leaderboard (user_weekly_xp table).
+
+Workout XP is added to a (user_id, iso_week) bucket when a workout is
+completed, so the weekly leaderboard is a range read over the
+(iso_week, xp DESC) index instead of re-aggregating workout_sessions.
+
+Weeks are ISO weeks in UTC, matching finished_at. A new week starts with
+empty buckets automatically; old buckets are purged by a weekly job.
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Select, select, func, delete, insert, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User, UserWeeklyXP, WorkoutSession
+from app.db.upsert import upsert_insert
+
+
+def get_iso_week(d: date) -> str:
+    """ISO week key for a date, e.g. '2026-W42'."""
+    year, week, _ = d.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def get_current_iso_week() -> str:
+    """ISO week key for the current UTC date."""
+    return get_iso_week(datetime.utcnow().date())
+
+
+async def add_weekly_xp(
+    session: AsyncSession,
+    user_id: int,
+    xp: int,
+    finished_at: datetime,
+) -> None:
+    """
+    Add workout XP to the user's bucket for the week of finished_at.
+
+    Args:
+        session: Database session
+        user_id: User ID
+        xp: XP earned by the workout
+        finished_at: Workout finish time (UTC)
+    """
+    if xp <= 0:
+        return
+
+    stmt = upsert_insert(session, UserWeeklyXP).values(
+        user_id=user_id,
+        iso_week=get_iso_week(finished_at.date()),
+        xp=xp,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserWeeklyXP.user_id, UserWeeklyXP.iso_week],
+        set_={"xp": UserWeeklyXP.xp + stmt.excluded.xp, "updated_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+def weekly_top_query(iso_week: str, limit: int) -> Select:
+    """Select (User, xp) of the week's best users (idx_user_weekly_xp_week_xp)."""
+    return (
+        select(User, UserWeeklyXP.xp)
+        .join(UserWeeklyXP, UserWeeklyXP.user_id == User.id)
+        .where(UserWeeklyXP.iso_week == iso_week)
+        .where(UserWeeklyXP.xp > 0)
+        .order_by(UserWeeklyXP.xp.desc(), UserWeeklyXP.user_id)
+        .limit(limit)
+    )
+
+
+def weekly_xp_totals_query(week_start: datetime) -> Select:
+    """Select (user_id, xp) summed over workouts completed since week_start."""
+    return (
+        select(
+            WorkoutSession.user_id,
+            func.sum(WorkoutSession.total_xp_earned),
+        )
+        .where(WorkoutSession.status == "completed")
+        .where(WorkoutSession.finished_at >= week_start)
+        .group_by(WorkoutSession.user_id)
+    )
+
+
+async def get_weekly_top(
+    session: AsyncSession,
+    limit: int,
+    iso_week: str | None = None,
+) -> list[tuple[User, int]]:
+    """
+    Get the top users of a week.
+
+    Returns:
+        List of (User, weekly_xp), best first
+    """
+    iso_week = iso_week or get_current_iso_week()
+    result = await session.execute(weekly_top_query(iso_week, limit))
+    return [(u, xp) for u, xp in result.all()]
+
+
+async def get_weekly_rank(
+    session: AsyncSession,
+    user_id: int,
+    iso_week: str | None = None,
+) -> int | None:
+    """
+    Get the user's 1-based rank for a week (same ordering as get_weekly_top).
+
+    Returns:
+        Rank, or None if the user has no XP this week
+    """
+    iso_week = iso_week or get_current_iso_week()
+    xp_result = await session.execute(
+        select(UserWeeklyXP.xp)
+        .where(UserWeeklyXP.user_id == user_id)
+        .where(UserWeeklyXP.iso_week == iso_week)
+    )
+    my_xp = xp_result.scalar_one_or_none()
+    if not my_xp:
+        return None
+
+    ahead_result = await session.execute(
+        select(func.count())
+        .select_from(UserWeeklyXP)
+        .where(UserWeeklyXP.iso_week == iso_week)
+        .where(or_(
+            UserWeeklyXP.xp > my_xp,
+            and_(UserWeeklyXP.xp == my_xp, UserWeeklyXP.user_id < user_id),
+        ))
+    )
+    return (ahead_result.scalar() or 0) + 1
+
+
+async def rollover_weekly_xp(session: AsyncSession, keep_weeks: int) -> int:
+    """
+    Purge buckets older than the last keep_weeks weeks.
+
+    Returns:
+        Number of deleted rows
+    """
+    today = datetime.utcnow().date()
+    oldest_kept = get_iso_week(today - timedelta(weeks=max(keep_weeks, 1) - 1))
+    # 'YYYY-Www' keys sort chronologically as strings
+    result = await session.execute(
+        delete(UserWeeklyXP).where(UserWeeklyXP.iso_week < oldest_kept)
+    )
+    return result.rowcount or 0
+
+
+async def rebuild_weekly_xp(session: AsyncSession) -> int:
+    """
+    Rebuild the current week's buckets from completed workouts (backfill).
+
+    Returns:
+        Number of buckets written
+    """
+    today = datetime.utcnow().date()
+    iso_week = get_iso_week(today)
+    week_start_dt = datetime.combine(today - timedelta(days=today.weekday()), datetime.min.time())
+
+    result = await session.execute(weekly_xp_totals_query(week_start_dt))
+    rows = [
+        {"user_id": user_id, "iso_week": iso_week, "xp": xp or 0}
+        for user_id, xp in result.all()
+    ]
+
+    await session.execute(delete(UserWeeklyXP).where(UserWeeklyXP.iso_week == iso_week))
+    if rows:
+        await session.execute(insert(UserWeeklyXP), rows)
+    return len(rows)
@@ -15,7 +15,7 @@ from typing import Any
 from dataclasses import dataclass
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Select, select
 
 from app.db.models import (
     User,
@@ -26,13 +26,16 @@ from app.db.models import (
     UserGoal,
 )
 from app.services.xp_calculator import (
-    calculate_xp,
+    calculate_xp_batch,
     calculate_coins,
     get_level_from_xp,
     get_streak_multiplier,
 )
 from app.services.achievement_checker import check_achievements
-from app.services.notifications import save_notification
+from app.services.notifications import save_notification, flush_notifications
+from app.services.user_stats import record_workout
+from app.services.leaderboard_index import track_xp_change
+from app.services.weekly_leaderboard import add_weekly_xp
 
 
 @dataclass
@@ -102,18 +105,24 @@ async def process_workout_completion(
     # 3. Calculate streak multiplier
     streak_mult = get_streak_multiplier(user.current_streak)
 
-    # 4. Create or get workout session
+    # 4. Resolve all exercises and progress rows with two IN queries
+    # (before anything is added, so no autoflush happens here)
+    exercises_by_slug = await _resolve_exercises(session, data.exercises)
+    progress_by_exercise = await _load_progress(
+        session, user.id, [ex.id for ex in exercises_by_slug.values()]
+    )
+
+    # 5. Create or get workout session (written by the single flush below)
+    duration = (data.finished_at - data.started_at).total_seconds()
     if data.workout_session_id:
         workout = await session.get(WorkoutSession, data.workout_session_id)
         if not workout:
             session_id = data.workout_session_id
             raise ValueError(f"Workout session {session_id} not found")
         workout.finished_at = data.finished_at
-        duration = (data.finished_at - data.started_at).total_seconds()
         workout.duration_seconds = int(duration)
         workout.status = "completed"
     else:
-        duration = (data.finished_at - data.started_at).total_seconds()
         workout = WorkoutSession(
             user_id=user.id,
             started_at=data.started_at,
@@ -127,64 +136,59 @@ async def process_workout_completion(
             total_duration_seconds=0,
         )
         session.add(workout)
-        await session.flush()
 
-    # 5. Process each exercise
+    # 6. Process exercises in memory, then add all rows at once
+    performed = [
+        (ex_data, exercises_by_slug[ex_data.exercise_slug])
+        for ex_data in data.exercises
+        if ex_data.exercise_slug in exercises_by_slug  # Skip unknown exercises
+    ]
+
+    # ALGORITHM: Calculate XP for EACH set separately, then sum
+    # Each set contributes fairly to total XP
+    # Formula: base_xp × difficulty_mult × volume_mult × streak_mult × first_bonus
+    # Timed exercises: 10 seconds = 1 rep equivalent
+    set_base_xp, set_difficulty, set_reps, set_exercise = [], [], [], []
+    for index, (ex_data, exercise) in enumerate(performed):
+        for set_value in ex_data.sets:
+            set_base_xp.append(exercise.base_xp)
+            set_difficulty.append(exercise.difficulty)
+            set_reps.append(max(1, set_value // 10) if ex_data.is_timed else set_value)
+            set_exercise.append(index)
+
+    xp_batch = calculate_xp_batch(
+        base_xp=set_base_xp,
+        difficulty=set_difficulty,
+        reps=set_reps,
+        exercise_index=set_exercise,
+        streak_days=user.current_streak,
+        is_first_today=is_first_today,
+        num_exercises=len(performed),
+    )
+
     total_xp = 0
     total_coins = 0
-    workout_exercises = []
+    new_rows = []
 
-    for ex_data in data.exercises:
-        # Get exercise from DB
-        exercise_result = await session.execute(
-            select(Exercise).where(Exercise.slug == ex_data.exercise_slug)
-        )
-        exercise = exercise_result.scalar_one_or_none()
-
-        if not exercise:
-            continue  # Skip unknown exercises
-
-        # ALGORITHM: Calculate XP for EACH set separately, then sum
-        # Each set contributes fairly to total XP
+    for (ex_data, exercise), xp_earned in zip(performed, xp_batch.exercise_xp):
         sets_count = len(ex_data.sets)
-        total_reps = 0
-        total_duration = 0
-        xp_earned = 0
-
-        for set_value in ex_data.sets:
-            # Convert timed exercises: 10 seconds = 1 rep equivalent
-            if ex_data.is_timed:
-                set_duration = set_value
-                total_duration += set_duration
-                reps_for_xp = max(1, set_duration // 10)
-            else:
-                total_reps += set_value
-                reps_for_xp = set_value
-
-            # Calculate XP for THIS set
-            # Formula: base_xp × difficulty_mult × volume_mult ×
-            #          streak_mult × first_bonus
-            set_xp = calculate_xp(
-                base_xp=exercise.base_xp,
-                difficulty=exercise.difficulty,
-                reps=reps_for_xp,  # For this set only
-                streak_days=user.current_streak,
-                is_first_today=is_first_today,
-            )
-            xp_earned += set_xp
+        if ex_data.is_timed:
+            total_reps = 0
+            total_duration = sum(ex_data.sets)
+        else:
+            total_reps = sum(ex_data.sets)
+            total_duration = 0
 
         # Create workout exercise entry
-        workout_exercise = WorkoutExercise(
-            workout_session_id=workout.id,
-            exercise_id=exercise.id,
+        new_rows.append(WorkoutExercise(
+            workout_session=workout,
+            exercise=exercise,
             sets_completed=sets_count,
             total_reps=total_reps,
             total_duration_seconds=total_duration,
             xp_earned=xp_earned,
             coins_earned=0,
-        )
-        session.add(workout_exercise)
-        workout_exercises.append(workout_exercise)
+        ))
 
         # Update workout totals
         workout.total_xp_earned += xp_earned
@@ -194,13 +198,7 @@ async def process_workout_completion(
         total_xp += xp_earned
 
         # Update user exercise progress
-        progress_result = await session.execute(
-            select(UserExerciseProgress)
-            .where(UserExerciseProgress.user_id == user.id)
-            .where(UserExerciseProgress.exercise_id == exercise.id)
-        )
-        progress = progress_result.scalar_one_or_none()
-
+        progress = progress_by_exercise.get(exercise.id)
         best_set = max(ex_data.sets) if ex_data.sets else 0
 
         if progress:
@@ -223,9 +221,12 @@ async def process_workout_completion(
                 times_performed=1,
                 last_performed_at=data.finished_at,
             )
-            session.add(progress)
+            progress_by_exercise[exercise.id] = progress
+            new_rows.append(progress)
+
+    session.add_all(new_rows)
 
-    # 6. Calculate coins
+    # 7. Calculate coins
     duration_sec = workout.duration_seconds
     workout_duration_minutes = duration_sec // 60 if duration_sec else 0
     coins_earned = calculate_coins(
@@ -236,12 +237,13 @@ async def process_workout_completion(
     workout.total_coins_earned = coins_earned
     total_coins = coins_earned
 
-    # 7. Update user stats
+    # 8. Update user stats
     old_level = user.level
     user.total_xp += total_xp
     user.coins += coins_earned
+    track_xp_change(session, user)
 
-    # 8. Update level
+    # 9. Update level
     new_level = get_level_from_xp(user.total_xp)
     user.level = new_level
     level_up = new_level > old_level
@@ -254,7 +256,8 @@ async def process_workout_completion(
         workout.total_coins_earned += level_up_bonus
         total_coins += level_up_bonus
 
-    # 9. Update streak
+    # 10. Update streak
+    old_streak = user.current_streak
     if user.last_workout_date is None:
         user.current_streak = 1
     elif user.last_workout_date == today - timedelta(days=1):
@@ -265,13 +268,31 @@ async def process_workout_completion(
     user.max_streak = max(user.max_streak, user.current_streak)
     user.last_workout_date = today
 
+    # Single flush: workout, exercise rows, progress and user changes
     await session.flush()
 
-    # 10. Update user goals
+    # Update stats rollup (lifetime totals + weekly bucket)
+    await record_workout(session, workout)
+
+    # Update weekly leaderboard bucket
+    await add_weekly_xp(session, user.id, workout.total_xp_earned, data.finished_at)
+
+    # 11. Update user goals
     await _update_user_goals(user.id, data, workout, session)
 
-    # 11. Check achievements
-    new_achievements = await check_achievements(session, user)
+    # 12. Check achievements (only conditions this workout could affect)
+    changed_conditions = {"total_workouts", "total_xp", "exercise_reps", "time_of_day"}
+    if user.current_streak != old_streak:
+        changed_conditions.add("streak")
+    if level_up:
+        changed_conditions.add("level")
+    new_achievements = await check_achievements(
+        session,
+        user,
+        condition_types=changed_conditions,
+        exercise_slugs={ex.exercise_slug for ex in data.exercises},
+        finished_at=data.finished_at,
+    )
 
     # Note: Coins and XP from achievements are already awarded
     # We just track them in workout summary for display
@@ -284,7 +305,7 @@ async def process_workout_completion(
 
     await session.flush()
 
-    # 12. Create notifications
+    # 13. Create notifications
     if level_up:
         await save_notification(
             session=session,
@@ -306,9 +327,10 @@ async def process_workout_completion(
             message=f"Получено: {ach_name}",
         )
 
-    await session.flush()
+    # Goal, level-up and achievement notifications in one insert
+    await flush_notifications(session)
 
-    # 13. Prepare summary
+    # 14. Prepare summary
     workout_summary = {
         "total_exercises": len(data.exercises),
         "total_reps": workout.total_reps,
@@ -330,6 +352,51 @@ async def process_workout_completion(
     )
 
 
+async def _resolve_exercises(
+    session: AsyncSession,
+    exercises: list[ExerciseSetData],
+) -> dict[str, Exercise]:
+    """Load all submitted exercises with one IN query (slug -> Exercise)."""
+    slugs = {ex.exercise_slug for ex in exercises}
+    if not slugs:
+        return {}
+    result = await session.execute(
+        select(Exercise).where(Exercise.slug.in_(slugs))
+    )
+    return {exercise.slug: exercise for exercise in result.scalars().all()}
+
+
+def exercise_progress_query(user_id: int, exercise_ids: list[int]) -> Select:
+    """Select the user's progress rows for the given exercises."""
+    return (
+        select(UserExerciseProgress)
+        .where(UserExerciseProgress.user_id == user_id)
+        .where(UserExerciseProgress.exercise_id.in_(exercise_ids))
+    )
+
+
+def active_goals_query(user_id: int, today: date) -> Select:
+    """Select the user's unfinished goals that have not ended yet."""
+    return (
+        select(UserGoal)
+        .where(UserGoal.user_id == user_id)
+        .where(UserGoal.completed.is_(False))
+        .where(UserGoal.end_date >= today)
+    )
+
+
+async def _load_progress(
+    session: AsyncSession,
+    user_id: int,
+    exercise_ids: list[int],
+) -> dict[int, UserExerciseProgress]:
+    """Load the user's progress rows for the given exercises (exercise_id -> row)."""
+    if not exercise_ids:
+        return {}
+    result = await session.execute(exercise_progress_query(user_id, exercise_ids))
+    return {progress.exercise_id: progress for progress in result.scalars().all()}
+
+
 async def _update_user_goals(
     user_id: int,
     data: WorkoutCompletionData,
@@ -339,12 +406,7 @@ async def _update_user_goals(
     """Update user goals based on completed workout."""
     today = date.today()
 
-    goals_result = await session.execute(
-        select(UserGoal)
-        .where(UserGoal.user_id == user_id)
-        .where(UserGoal.completed.is_(False))
-        .where(UserGoal.end_date >= today)
-    )
+    goals_result = await session.execute(active_goals_query(user_id, today))
     active_goals = goals_result.scalars().all()
 
     for goal in active_goals:
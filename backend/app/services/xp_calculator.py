@@ -1,3 +1,16 @@
+from dataclasses import dataclass
+from math import isqrt
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional: batch scoring falls back to pure Python
+    np = None
+
+# Below this many sets NumPy's call overhead outweighs vectorization
+NUMPY_MIN_BATCH = 256
+
+
 def calculate_xp(
     base_xp: int,
     difficulty: int,
@@ -45,6 +58,118 @@ def calculate_xp(
     return int(xp)
 
 
+@dataclass
+class XPBatchResult:
+    """XP computed for a batch of sets."""
+    set_xp: list[int]  # XP per set, same order as the input arrays
+    exercise_xp: list[int]  # XP summed per exercise index
+
+
+def calculate_xp_batch(
+    base_xp: Sequence[int],
+    difficulty: Sequence[int],
+    reps: Sequence[int],
+    exercise_index: Sequence[int],
+    streak_days: int | Sequence[int],
+    is_first_today: bool | Sequence[bool],
+    num_exercises: int | None = None,
+    use_numpy: bool | None = None,
+) -> XPBatchResult:
+    """
+    Calculate XP for many sets at once (a whole workout or many workouts).
+
+    Produces exactly the same integers as calling calculate_xp per set:
+    the multipliers are computed with the same float operations in the
+    same order. Uses NumPy when installed, pure Python otherwise.
+
+    Args:
+        base_xp: Base XP of the exercise, per set
+        difficulty: Exercise difficulty (1-5), per set
+        reps: Reps (or rep equivalent for timed) of each set
+        exercise_index: Exercise (group) index of each set, 0-based
+        streak_days: Streak in days, scalar or per set
+        is_first_today: First-workout-of-day flag, scalar or per set
+        num_exercises: Number of exercise groups (default: max index + 1)
+        use_numpy: Force (True) or disable (False) the NumPy path; by
+            default it is used for batches of NUMPY_MIN_BATCH sets or more
+
+    Returns:
+        XPBatchResult with per-set and per-exercise XP
+    """
+    count = len(reps)
+    if num_exercises is None:
+        num_exercises = max(exercise_index) + 1 if count else 0
+    if use_numpy is None:
+        use_numpy = np is not None and count >= NUMPY_MIN_BATCH
+    elif use_numpy and np is None:
+        raise RuntimeError("NumPy is not installed")
+
+    if isinstance(streak_days, int):
+        streak_days = [streak_days] * count
+    if isinstance(is_first_today, bool):
+        is_first_today = [is_first_today] * count
+
+    if use_numpy:
+        set_xp = _calculate_xp_numpy(base_xp, difficulty, reps, streak_days, is_first_today)
+    else:
+        set_xp = _calculate_xp_python(base_xp, difficulty, reps, streak_days, is_first_today)
+
+    exercise_xp = [0] * num_exercises
+    for index, xp in zip(exercise_index, set_xp):
+        exercise_xp[index] += xp
+
+    return XPBatchResult(set_xp=set_xp, exercise_xp=exercise_xp)
+
+
+def _calculate_xp_python(base_xp, difficulty, reps, streak_days, is_first_today) -> list[int]:
+    """Pure-Python batch version of calculate_xp with memoized multipliers."""
+    difficulty_mults: dict[int, float] = {}
+    streak_mults: dict[int, float] = {}
+    result = []
+
+    for base, diff, set_reps, streak, first in zip(
+        base_xp, difficulty, reps, streak_days, is_first_today
+    ):
+        difficulty_mult = difficulty_mults.get(diff)
+        if difficulty_mult is None:
+            difficulty_mult = difficulty_mults[diff] = 1 + (diff - 1) * 0.25
+
+        streak_mult = streak_mults.get(streak)
+        if streak_mult is None:
+            streak_mult = streak_mults[streak] = 1 + min(streak, 30) * 0.0167
+
+        if set_reps <= 20:
+            volume_mult = 1 + set_reps * 0.02
+        else:
+            volume_mult = 1.4 + (set_reps - 20) * 0.01
+
+        first_bonus = 1.2 if first else 1.0
+        result.append(int(base * difficulty_mult * volume_mult * streak_mult * first_bonus))
+
+    return result
+
+
+def _calculate_xp_numpy(base_xp, difficulty, reps, streak_days, is_first_today) -> list[int]:
+    """NumPy version of calculate_xp over arrays (float64, same op order)."""
+    base = np.asarray(base_xp, dtype=np.int64)
+    diff = np.asarray(difficulty, dtype=np.int64)
+    reps_arr = np.asarray(reps, dtype=np.int64)
+    streak = np.asarray(streak_days, dtype=np.int64)
+    first = np.asarray(is_first_today, dtype=bool)
+
+    difficulty_mult = 1 + (diff - 1) * 0.25
+    volume_mult = np.where(
+        reps_arr <= 20,
+        1 + reps_arr * 0.02,
+        1.4 + (reps_arr - 20) * 0.01,
+    )
+    streak_mult = 1 + np.minimum(streak, 30) * 0.0167
+    first_bonus = np.where(first, 1.2, 1.0)
+
+    xp = base * difficulty_mult * volume_mult * streak_mult * first_bonus
+    return np.trunc(xp).astype(np.int64).tolist()
+
+
 def calculate_coins(xp_earned: int, streak_days: int = 0, workout_duration_minutes: int = 0) -> int:
     """
     Calculate coins earned. Coins are rare and valuable!
@@ -105,16 +230,107 @@ def get_level_from_xp(total_xp: int) -> int:
     """
     Calculate level from total XP.
 
+    Exact integer inverse of xp_for_level: the level is L where
+    100 × (L-1)² <= total_xp < 100 × L², i.e. L = isqrt(total_xp // 100) + 1.
+
     Args:
         total_xp: Total accumulated XP
 
     Returns:
         Current level
     """
-    level = 1
-    while xp_for_level(level + 1) <= total_xp:
-        level += 1
-    return level
+    if total_xp < 100:
+        return 1
+    return isqrt(total_xp // 100) + 1
+
+
+def get_levels_from_xp_batch(
+    total_xps: Sequence[int],
+    use_numpy: bool | None = None,
+) -> list[int]:
+    """
+    Calculate levels for many XP totals at once (bulk re-leveling).
+
+    Args:
+        total_xps: Total XP values
+        use_numpy: Force (True) or disable (False) the NumPy path; by
+            default it is used for batches of NUMPY_MIN_BATCH values or more
+
+    Returns:
+        Levels, same order as total_xps (identical to get_level_from_xp)
+    """
+    if use_numpy is None:
+        use_numpy = np is not None and len(total_xps) >= NUMPY_MIN_BATCH
+    elif use_numpy and np is None:
+        raise RuntimeError("NumPy is not installed")
+
+    if not use_numpy:
+        return [get_level_from_xp(xp) for xp in total_xps]
+
+    steps = np.maximum(np.asarray(total_xps, dtype=np.int64), 0) // 100
+    # Float sqrt can be off by one for large values; correct it exactly
+    root = np.floor(np.sqrt(steps.astype(np.float64))).astype(np.int64)
+    root -= (root * root > steps)
+    root += ((root + 1) * (root + 1) <= steps)
+    return (root + 1).tolist()
+
+
+@dataclass(frozen=True)
+class LevelProgress:
+    """XP boundaries of a level and progress within it."""
+    level: int
+    xp_floor: int  # Total XP at which this level starts
+    xp_ceiling: int  # Total XP at which the next level starts
+    xp_into_level: int
+    xp_needed: int  # xp_ceiling - xp_floor
+    progress_percent: float  # 0-100
+
+
+# Precomputed level thresholds: LEVEL_THRESHOLDS[level] == xp_for_level(level)
+MAX_TABULATED_LEVEL = 200
+LEVEL_THRESHOLDS: tuple[int, ...] = (0,) + tuple(
+    xp_for_level(level) for level in range(1, MAX_TABULATED_LEVEL + 2)
+)
+
+
+def get_level_threshold(level: int) -> int:
+    """Total XP required to reach a level (table lookup, formula beyond it)."""
+    if 1 <= level <= MAX_TABULATED_LEVEL + 1:
+        return LEVEL_THRESHOLDS[level]
+    return xp_for_level(level)
+
+
+def get_level_progress(total_xp: int, level: int | None = None) -> LevelProgress:
+    """
+    Get level boundaries and progress for a user.
+
+    Args:
+        total_xp: Total accumulated XP
+        level: Stored level to report on; computed from total_xp if None
+
+    Returns:
+        LevelProgress (progress_percent is capped at 100)
+    """
+    if level is None:
+        level = get_level_from_xp(total_xp)
+
+    xp_floor = get_level_threshold(level)
+    xp_ceiling = get_level_threshold(level + 1)
+    xp_into_level = total_xp - xp_floor
+    xp_needed = xp_ceiling - xp_floor
+    if xp_needed > 0:
+        progress_percent = (xp_into_level / xp_needed) * 100
+    else:
+        progress_percent = 0
+
+    return LevelProgress(
+        level=level,
+        xp_floor=xp_floor,
+        xp_ceiling=xp_ceiling,
+        xp_into_level=xp_into_level,
+        xp_needed=xp_needed,
+        progress_percent=min(progress_percent, 100),
+    )
 
 
 def get_streak_multiplier(streak_days: int) -> float:
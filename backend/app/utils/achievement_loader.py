@@ -55,9 +55,36 @@ def get_achievements_by_condition_type(condition_type: str) -> list[dict]:
     ]
 
 
+@lru_cache(maxsize=1)
+def load_achievements_index() -> dict[str, tuple[dict, ...]]:
+    """
+    Group achievements by condition type with thresholds sorted ascending.
+
+    Conditions without a numeric threshold (e.g. time_of_day) keep
+    their file order.
+
+    Returns:
+        Mapping of condition type -> achievements sorted by condition value
+    """
+    grouped: dict[str, list[dict]] = {}
+    for achievement in load_achievements():
+        condition_type = achievement.get("condition", {}).get("type")
+        if condition_type:
+            grouped.setdefault(condition_type, []).append(achievement)
+
+    return {
+        condition_type: tuple(sorted(
+            items,
+            key=lambda a: a.get("condition", {}).get("value", 0),
+        ))
+        for condition_type, items in grouped.items()
+    }
+
+
 def clear_cache():
     """
     Clear the achievements cache.
     Useful for testing or if achievements.json is updated at runtime.
     """
     load_achievements.cache_clear()
+    load_achievements_index.cache_clear()
@@ -1,75 +1,444 @@
 """
 Cache utilities for API endpoints.
 
-Provides timed_cache decorator for caching function results with TTL.
+Two tiers:
+- local: size-bounded LRU with per-entry TTL (per worker process)
+- shared (optional): a CacheBackend shared by all workers, e.g. the SQLite
+  file backend; MemoryBackend is an in-process stand-in for tests
+
+Cache.get_or_set coalesces concurrent misses for the same key into a single
+call (single-flight). Entries can carry tags for explicit invalidation, and
+hit/miss counters are kept per cache. Invalidation clears this worker's
+local tier and the shared tier; other workers' local copies expire by TTL.
+
+Provides timed_cache decorator for caching async function results with TTL.
 """
 
-from functools import wraps
-from typing import Callable, Any
+import asyncio
+import logging
+import pickle
+import sqlite3
 import time
-import hashlib
-import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from functools import wraps
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a cache."""
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class LRUCache:
+    """
+    Size-bounded LRU cache with per-entry TTL and tags.
+
+    All operations are O(1) except tag invalidation, which is
+    O(entries with that tag).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Any, tuple[Any, float, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set] = {}
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """Return a live value (refreshing its LRU position) or default."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        if key in self._data:
+            self.delete(key)
+        tags = tuple(tags)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self.delete(oldest)
+            self.evictions += 1
+
+    def delete(self, key) -> bool:
+        """Remove a key. Returns True if it was present."""
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove every entry carrying the tag. Returns number removed."""
+        keys = self._tags.pop(tag, set())
+        for key in keys:
+            self.delete(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+
+class CacheBackend(ABC):
+    """
+    Interface of the shared (cross-worker) cache tier.
+
+    Values are opaque bytes; expiry is handled by the backend.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return a live value or None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()) -> None:
+        """Store a value for ttl seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+
+    @abstractmethod
+    async def invalidate_tag(self, tag: str) -> None:
+        """Remove every entry carrying the tag."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry."""
+
+
+class MemoryBackend(CacheBackend):
+    """In-process stand-in for a shared backend (tests, single worker)."""
+
+    def __init__(self, maxsize: int = 10_000):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()) -> None:
+        self._cache.set(key, value, ttl=ttl, tags=tags)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def invalidate_tag(self, tag: str) -> None:
+        self._cache.invalidate_tag(tag)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Shared cache stored in a local SQLite file.
+
+    Lets every uvicorn worker on the host reuse entries built by another
+    worker. Calls run in a thread so the event loop is never blocked.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._initialized = False
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "expires_at REAL NOT NULL, tags TEXT NOT NULL DEFAULT '')"
+            )
+            conn.commit()
+            self._initialized = True
+        return conn
 
-def timed_cache(seconds: int = 300):
+    def _run(self, sql: str, params: tuple = (), fetch: bool = False):
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            row = cursor.fetchone() if fetch else None
+            conn.commit()
+            return row
+        finally:
+            conn.close()
+
+    async def get(self, key: str) -> bytes | None:
+        row = await asyncio.to_thread(
+            self._run,
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+            True,
+        )
+        return row[0] if row else None
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: Iterable[str] = ()) -> None:
+        # Tags are stored as '|a|b|' so a tag can be matched with LIKE '%|a|%'
+        tags_field = "|" + "|".join(tags) + "|" if tags else ""
+        await asyncio.to_thread(
+            self._run,
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, tags) VALUES (?, ?, ?, ?)",
+            (key, value, time.time() + ttl, tags_field),
+        )
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._run, "DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    async def invalidate_tag(self, tag: str) -> None:
+        await asyncio.to_thread(
+            self._run,
+            "DELETE FROM cache_entries WHERE tags LIKE ? OR expires_at <= ?",
+            (f"%|{tag}|%", time.time()),
+        )
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._run, "DELETE FROM cache_entries")
+
+
+class Cache:
+    """
+    Two-tier cache with single-flight loading and tag invalidation.
+
+    Args:
+        name: Cache name (prefix of shared keys, shown in stats)
+        maxsize: Max entries in the local LRU tier
+        ttl: Default TTL in seconds
+        backend: Optional shared tier
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 1024,
+        ttl: float = 300,
+        backend: CacheBackend | None = None,
+    ):
+        self.name = name
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.backend = backend
+        self.stats = CacheStats()
+        self._inflight: dict[Any, asyncio.Future] = {}
+
+    def _shared_key(self, key) -> str:
+        return f"{self.name}:{key}"
+
+    async def get(self, key, default=None):
+        """Look a key up in the local tier, then the shared tier."""
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats.hits += 1
+            return value
+
+        if self.backend is not None:
+            try:
+                raw = await self.backend.get(self._shared_key(key))
+            except Exception as e:
+                logger.warning(f"[Cache:{self.name}] Shared get failed: {e}")
+                raw = None
+            if raw is not None:
+                value, tags = pickle.loads(raw)
+                self.local.set(key, value, tags=tags)
+                self.stats.shared_hits += 1
+                return value
+
+        self.stats.misses += 1
+        return default
+
+    async def set(self, key, value, ttl: float | None = None, tags: Iterable[str] = ()) -> None:
+        """Store a value in both tiers."""
+        tags = tuple(tags)
+        ttl = self.local.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=ttl, tags=tags)
+
+        if self.backend is not None:
+            try:
+                raw = pickle.dumps((value, tags), protocol=pickle.HIGHEST_PROTOCOL)
+                await self.backend.set(self._shared_key(key), raw, ttl, tags)
+            except Exception as e:
+                logger.warning(f"[Cache:{self.name}] Shared set failed: {e}")
+
+    async def get_or_set(
+        self,
+        key,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: float | None = None,
+        tags: Iterable[str] = (),
+    ):
+        """
+        Return the cached value or build it with factory().
+
+        Concurrent callers missing the same key wait for one factory call.
+        """
+        value = await self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await factory()
+            await self.set(key, value, ttl=ttl, tags=tags)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def delete(self, key) -> None:
+        self.local.delete(key)
+        if self.backend is not None:
+            await self.backend.delete(self._shared_key(key))
+
+    async def invalidate_tag(self, tag: str) -> None:
+        """Drop every entry carrying the tag from both tiers."""
+        self.stats.invalidations += self.local.invalidate_tag(tag)
+        if self.backend is not None:
+            await self.backend.invalidate_tag(tag)
+
+    async def clear(self) -> None:
+        self.local.clear()
+        if self.backend is not None:
+            await self.backend.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        stats = self.stats.as_dict()
+        stats["evictions"] = self.local.evictions
+        stats["size"] = len(self.local)
+        return stats
+
+
+_caches: dict[str, Cache] = {}
+_shared_backend: CacheBackend | None = None
+
+
+def get_shared_backend() -> CacheBackend | None:
+    """Shared tier configured by settings.cache_backend ('', 'memory' or 'sqlite')."""
+    global _shared_backend
+    if _shared_backend is None:
+        from app.config import settings
+
+        if settings.cache_backend == "sqlite":
+            _shared_backend = SQLiteBackend(settings.cache_sqlite_path)
+        elif settings.cache_backend == "memory":
+            _shared_backend = MemoryBackend()
+    return _shared_backend
+
+
+def get_cache(name: str, maxsize: int | None = None, ttl: float = 300) -> Cache:
+    """Get or create a named cache wired to the configured shared tier."""
+    cache = _caches.get(name)
+    if cache is None:
+        from app.config import settings
+
+        cache = Cache(
+            name,
+            maxsize=maxsize or settings.cache_max_entries,
+            ttl=ttl,
+            backend=get_shared_backend(),
+        )
+        _caches[name] = cache
+    return cache
+
+
+async def invalidate_tag(tag: str) -> None:
+    """Invalidate a tag in every named cache (and the shared tier)."""
+    for cache in _caches.values():
+        await cache.invalidate_tag(tag)
+
+
+def get_cache_stats() -> dict[str, dict[str, int]]:
+    """Hit/miss counters of every named cache."""
+    return {name: cache.get_stats() for name, cache in _caches.items()}
+
+
+def timed_cache(seconds: int = 300, maxsize: int | None = None, tags: Iterable[str] = ()):
     """
     Decorator for caching async function results with TTL.
 
     Args:
         seconds: Time to live in seconds (default: 5 minutes)
+        maxsize: Max local entries (default: settings.cache_max_entries)
+        tags: Tags attached to every entry, for invalidate_tag()
 
     Example:
-        @timed_cache(seconds=300)
+        @timed_cache(seconds=300, tags=("catalog",))
         async def get_exercises():
             ...
     """
+    tags = tuple(tags)
+
     def decorator(func: Callable) -> Callable:
-        cache: dict[str, Any] = {}
-        cache_time: dict[str, float] = {}
+        cache_name = f"{func.__module__}.{func.__qualname__}"
 
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
+            # Create cache key from arguments
             # Exclude 'session' and 'db' from cache key as they change
-            cache_key_parts = [func.__name__]
+            key_parts = []
 
             # Add args (skip session/db objects)
             for arg in args:
                 if not hasattr(arg, '__dict__'):  # Skip objects
-                    cache_key_parts.append(str(arg))
+                    key_parts.append(arg)
 
             # Add kwargs (skip session/db)
             for key, value in sorted(kwargs.items()):
                 if key not in ('session', 'db') and not hasattr(value, '__dict__'):
-                    cache_key_parts.append(f"{key}:{value}")
-
-            cache_key = hashlib.md5(
-                json.dumps(cache_key_parts, sort_keys=True).encode()
-            ).hexdigest()
-
-            # Check cache
-            if cache_key in cache:
-                if time.time() - cache_time[cache_key] < seconds:
-                    return cache[cache_key]
-
-            # Execute function
-            result = await func(*args, **kwargs)
-
-            # Store in cache
-            cache[cache_key] = result
-            cache_time[cache_key] = time.time()
-
-            # Cleanup old entries (optional, prevents memory leak)
-            current_time = time.time()
-            keys_to_remove = [
-                key for key, timestamp in cache_time.items()
-                if current_time - timestamp >= seconds
-            ]
-            for key in keys_to_remove:
-                cache.pop(key, None)
-                cache_time.pop(key, None)
+                    key_parts.append((key, value))
 
-            return result
+            cache = get_cache(cache_name, maxsize=maxsize, ttl=seconds)
+            return await cache.get_or_set(
+                repr(tuple(key_parts)),
+                lambda: func(*args, **kwargs),
+                ttl=seconds,
+                tags=tags,
+            )
 
+        wrapper.cache_name = cache_name
         return wrapper
     return decorator
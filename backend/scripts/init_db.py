@@ -17,14 +17,23 @@ async def main():
     NOTE: This script assumes tables are already created via Alembic migrations.
     Run 'alembic upgrade head' before using this script.
 
-    This script only loads initial data (categories, exercises).
+    This script only loads initial data (categories, exercises). It is a
+    no-op when the data files have not changed since the last run; pass
+    --force to re-sync anyway.
     """
     print("Loading initial data...")
     print("NOTE: Make sure database tables are created via: alembic upgrade head")
 
     async with async_session_maker() as session:
-        await init_data(session)
-    print("Data loaded successfully!")
+        report = await init_data(session, force="--force" in sys.argv)
+    if not report.files:
+        print("Data unchanged, nothing to load (use --force to re-sync)")
+    else:
+        print(
+            f"Data loaded successfully! Categories added: {report.categories_added}, "
+            f"exercises added: {report.exercises_added}, updated: {report.exercises_updated}, "
+            f"progression links updated: {report.links_updated}"
+        )
 
     await async_engine.dispose()
 
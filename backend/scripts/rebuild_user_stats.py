@@ -0,0 +1,35 @@
+"""Script to backfill/rebuild stats rollups (user_stats, weekly XP) from workout history."""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.database import async_engine, async_session_maker
+from app.services.user_stats import rebuild_user_stats
+from app.services.weekly_leaderboard import rebuild_weekly_xp
+
+
+async def main():
+    """
+    Rebuild stats rollup rows for all users and the current week's
+    leaderboard buckets.
+
+    Run after 'alembic upgrade head' when a rollup table is introduced, or
+    any time the rollups need to be repaired. Safe to run multiple times.
+    """
+    print("Rebuilding user stats...")
+
+    async with async_session_maker() as session:
+        count = await rebuild_user_stats(session)
+        weekly_count = await rebuild_weekly_xp(session)
+        await session.commit()
+    print(f"Rebuilt stats for {count} users")
+    print(f"Rebuilt {weekly_count} weekly XP buckets")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Script to recompute every user's level from total XP (after a level formula change)."""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, update
+
+from app.db.database import async_engine, async_session_maker
+from app.db.models import User
+from app.services.xp_calculator import get_levels_from_xp_batch
+
+BATCH_SIZE = 10000
+
+
+async def main():
+    """
+    Recompute users.level for all users.
+
+    Levels are computed for a whole batch of users in one call and only
+    changed rows are written, with one executemany UPDATE per batch.
+    Safe to run multiple times.
+    """
+    print("Re-leveling users...")
+
+    checked = 0
+    changed = 0
+    last_id = 0
+
+    async with async_session_maker() as session:
+        while True:
+            result = await session.execute(
+                select(User.id, User.total_xp, User.level)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            levels = get_levels_from_xp_batch([total_xp or 0 for _, total_xp, _ in rows])
+            updates = [
+                {"id": user_id, "level": new_level}
+                for (user_id, _, old_level), new_level in zip(rows, levels)
+                if new_level != old_level
+            ]
+            if updates:
+                await session.execute(update(User), updates)
+
+            checked += len(rows)
+            changed += len(updates)
+            last_id = rows[-1][0]
+
+        await session.commit()
+
+    print(f"Checked {checked} users, updated {changed} levels")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
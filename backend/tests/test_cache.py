@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.utils.cache import Cache, CacheBackend, LRUCache, MemoryBackend
+
+
+def test_incomplete_backend_fails_on_construction():
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend()
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+
+def test_shared_tier_serves_other_workers_and_invalidates_by_tag():
+    async def scenario():
+        backend = MemoryBackend()
+        worker_a = Cache("catalog", backend=backend)
+        worker_b = Cache("catalog", backend=backend)
+
+        await worker_a.set("list", [1, 2], tags=("catalog",))
+        assert await worker_b.get("list") == [1, 2]
+        assert worker_b.stats.shared_hits == 1
+
+        await worker_a.invalidate_tag("catalog")
+        worker_b.local.clear()
+        assert await worker_b.get("list") is None
+        assert worker_b.stats.misses == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_share_one_factory_call():
+    async def scenario():
+        cache = Cache("single_flight")
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "value"
+
+        results = await asyncio.gather(*(cache.get_or_set("key", factory) for _ in range(5)))
+
+        assert results == ["value"] * 5
+        assert calls == 1
+        assert cache.stats.coalesced == 4
+        assert cache.get_stats()["misses"] == 5
+
+    asyncio.run(scenario())
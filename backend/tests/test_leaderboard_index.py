@@ -0,0 +1,67 @@
+import random
+
+from app.services.leaderboard_index import LeaderboardIndex, OrderStatisticList
+
+
+def test_index_counts_smaller_keys():
+    keys = OrderStatisticList([5, 1, 3])
+
+    assert len(keys) == 3
+    assert keys.index(1) == 0
+    assert keys.index(3) == 1
+    assert keys.index(4) == 2
+    assert keys.index(10) == 3
+    assert keys.head(2) == [1, 3]
+
+
+def test_remove_missing_key_raises():
+    keys = OrderStatisticList([1, 2])
+
+    try:
+        keys.remove(3)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("remove() of a missing key must raise KeyError")
+
+
+def test_ranks_match_sorted_list_across_bucket_splits(monkeypatch):
+    # Small buckets so inserts and removals split and drop buckets
+    monkeypatch.setattr(OrderStatisticList, "LOAD", 4)
+    rng = random.Random(42)
+    keys = OrderStatisticList(rng.sample(range(1000), 50))
+    expected = sorted(keys.head(50))
+
+    for _ in range(500):
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            keys.remove(key)
+            expected.remove(key)
+        else:
+            key = rng.randrange(1000)
+            if key in expected:
+                continue
+            keys.add(key)
+            expected.append(key)
+            expected.sort()
+
+        assert len(keys) == len(expected)
+        probe = rng.randrange(1000)
+        assert keys.index(probe) == sum(k < probe for k in expected)
+
+    assert keys.head(len(expected)) == expected
+
+
+def test_leaderboard_ranks_by_xp_then_user_id():
+    index = LeaderboardIndex()
+    index.load([(1, 100), (2, 300), (3, 100), (4, 0)])
+
+    assert index.top(3) == [(2, 300), (1, 100), (3, 100)]
+    assert [index.rank(user_id) for user_id in (1, 2, 3, 4)] == [2, 1, 3, 4]
+
+    index.update(4, 500)
+    index.discard(2)
+
+    assert index.top(10) == [(4, 500), (1, 100), (3, 100)]
+    assert index.rank(4) == 1
+    assert index.rank(2) is None
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app.db.models import Notification, User
+from app.services.notification_retention import purge_expired_batch
+from app.services.notifications import save_notifications
+
+
+def notification_row(user_id: int, notification_type: str, created_at: datetime | None = None) -> dict:
+    row = {
+        "user_id": user_id,
+        "notification_type": notification_type,
+        "title": "Title",
+        "message": "Message",
+        "related_user_id": None,
+    }
+    if created_at is not None:
+        row["created_at"] = created_at
+    return row
+
+
+def test_saved_notifications_use_the_utc_clock(run_with_db):
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            user = User(telegram_id=1)
+            session.add(user)
+            await session.commit()
+
+            before = datetime.utcnow()
+            await save_notifications(session, [notification_row(user.id, "achievement")])
+            await session.commit()
+            return before, await session.scalar(select(Notification.created_at))
+
+    before, created_at = run_with_db(scenario)
+
+    assert before <= created_at <= datetime.utcnow()
+
+
+def test_purge_deletes_expired_rows_and_recounts_unread(run_with_db):
+    now = datetime.utcnow()
+
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            user = User(telegram_id=1, unread_notifications=4)
+            session.add(user)
+            await session.commit()
+
+            await session.execute(insert(Notification), [
+                # daily_reminder keeps 7 days, unlisted types the default
+                notification_row(user.id, "daily_reminder", now - timedelta(days=8)),
+                notification_row(user.id, "daily_reminder", now - timedelta(days=1)),
+                notification_row(user.id, "achievement", now - timedelta(days=400)),
+                notification_row(user.id, "achievement", now - timedelta(days=8)),
+            ])
+            await session.commit()
+
+            deleted = await purge_expired_batch(session, now=now)
+            await session.commit()
+
+            kept = await session.execute(
+                select(Notification.notification_type, Notification.created_at)
+                .order_by(Notification.created_at)
+            )
+            unread = await session.scalar(select(User.unread_notifications))
+            return deleted, kept.all(), unread
+
+    deleted, kept, unread = run_with_db(scenario)
+
+    assert deleted == 2
+    assert [(t, now - c) for t, c in kept] == [
+        ("achievement", timedelta(days=8)),
+        ("daily_reminder", timedelta(days=1)),
+    ]
+    assert unread == 2
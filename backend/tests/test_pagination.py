@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.api.routes.workouts import workout_history_query
+from app.db.models import User, WorkoutSession
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_round_trip_datetime_and_id():
+    finished_at = datetime(2026, 10, 17, 8, 30, 15, 123456)
+
+    cursor = encode_cursor(finished_at, 42)
+
+    assert decode_cursor(cursor, datetime, int) == (finished_at, 42)
+
+
+def test_round_trip_single_id():
+    assert decode_cursor(encode_cursor(7), int) == (7,)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(datetime(2026, 1, 1), 10**12)
+
+    assert "=" not in cursor
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+
+
+@pytest.mark.parametrize("cursor, types", [
+    ("not a cursor!", (int,)),
+    (encode_cursor(1, 2), (int,)),
+    (encode_cursor(1), (datetime, int)),
+    (encode_cursor(datetime(2026, 1, 1)), (int,)),
+    ("", (int,)),
+])
+def test_malformed_cursor_raises_value_error(cursor, types):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, *types)
+
+
+def test_history_pages_cover_ties_without_gaps_or_repeats(run_with_db):
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            user = User(telegram_id=1)
+            session.add(user)
+            await session.flush()
+
+            base = datetime(2026, 10, 1, 12, 0)
+            # Pairs of workouts share finished_at, so pages split inside a tie
+            session.add_all([
+                WorkoutSession(
+                    user_id=user.id,
+                    started_at=base,
+                    finished_at=base + timedelta(hours=i // 2),
+                    status="completed",
+                )
+                for i in range(7)
+            ])
+            await session.commit()
+
+            seen = []
+            after = None
+            while True:
+                page = (await session.scalars(workout_history_query(user.id, 3, after))).all()
+                seen.extend((w.finished_at, w.id) for w in page)
+                if len(page) < 3:
+                    break
+                # Same round trip as the route's next_cursor
+                after = decode_cursor(encode_cursor(page[-1].finished_at, page[-1].id), datetime, int)
+            return seen
+
+    seen = run_with_db(scenario)
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+
+from sqlalchemy import func, select
+
+from app.db.models import Notification, User
+from app.services import notifications, scheduler
+from app.services.notifications import FakeBot, PushDispatcher, PushMessage, TokenBucket
+
+
+def make_dispatcher(bot, **kwargs) -> PushDispatcher:
+    options = {"concurrency": 5, "global_rate": 1000, "per_chat_rate": 1000, "max_retries": 3}
+    options.update(kwargs)
+    return PushDispatcher(bot=bot, **options)
+
+
+def pushes(chat_ids, **kwargs) -> list[PushMessage]:
+    return [PushMessage(chat_id=chat_id, text=f"hi {chat_id}", **kwargs) for chat_id in chat_ids]
+
+
+class CountingBot(FakeBot):
+    """FakeBot that records the highest number of sends in flight."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await super().send_message(chat_id, text, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+def test_retry_after_is_waited_out_and_retried():
+    bot = FakeBot(retry_after={2: 1})
+
+    start = time.monotonic()
+    result = asyncio.run(make_dispatcher(bot).dispatch(pushes([1, 2, 3])))
+
+    assert result.sent == 3
+    assert result.retried == 1
+    assert result.failed == 0
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [1, 2, 3]
+    assert time.monotonic() - start >= 1
+
+
+def test_failed_messages_are_reported():
+    bot = FakeBot(fail_chat_ids=[2])
+
+    result = asyncio.run(make_dispatcher(bot).dispatch(pushes([1, 2, 3])))
+
+    assert (result.sent, result.failed) == (2, 1)
+    assert [push.chat_id for push in result.failed_messages] == [2]
+    assert "unreachable" in result.failed_messages[0].error
+
+
+def test_concurrency_limit_is_respected():
+    bot = CountingBot(latency=0.01)
+
+    result = asyncio.run(make_dispatcher(bot, concurrency=3).dispatch(pushes(range(20))))
+
+    assert result.sent == 20
+    assert bot.max_in_flight == 3
+
+
+def test_token_bucket_throttles_after_burst():
+    async def scenario():
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # One token up front, then 5 more at 50/s
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_global_rate_throttles_sends():
+    bot = FakeBot()
+    dispatcher = make_dispatcher(bot, concurrency=10, global_rate=20)
+
+    start = time.monotonic()
+    result = asyncio.run(dispatcher.dispatch(pushes(range(30))))
+
+    # 20 go out as the initial burst, the other 10 at 20/s
+    assert result.sent == 30
+    assert time.monotonic() - start >= 0.45
+
+
+def test_per_chat_rate_throttles_one_chat():
+    bot = FakeBot()
+    dispatcher = make_dispatcher(bot, per_chat_rate=10)
+
+    start = time.monotonic()
+    asyncio.run(dispatcher.dispatch(pushes([7, 7, 7])))
+
+    assert len(bot.sent) == 3
+    assert time.monotonic() - start >= 0.18
+
+
+def test_notifications_are_saved_only_for_delivered_messages(run_with_db):
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            users = [User(telegram_id=100 + i) for i in range(3)]
+            session.add_all(users)
+            await session.commit()
+
+            messages = [
+                PushMessage(
+                    chat_id=user.telegram_id,
+                    text="reminder",
+                    user_id=user.id,
+                    notification_type="achievement",
+                    title="Title",
+                    message="Message",
+                )
+                for user in users
+            ]
+            bot = FakeBot(fail_chat_ids=[users[1].telegram_id])
+            result = await make_dispatcher(bot).dispatch(messages, session)
+            await session.commit()
+
+            saved = await session.scalars(select(Notification.user_id).order_by(Notification.user_id))
+            unread = await session.scalars(select(User.unread_notifications).order_by(User.id))
+            return result, list(saved), list(unread), [user.id for user in users]
+
+    result, saved, unread, user_ids = run_with_db(scenario)
+
+    assert (result.sent, result.failed) == (2, 1)
+    assert saved == [user_ids[0], user_ids[2]]
+    assert unread == [1, 0, 1]
+
+
+def test_daily_reminders_are_sent_and_committed_per_chunk(run_with_db, monkeypatch):
+    bot = FakeBot()
+    monkeypatch.setattr(notifications, "get_bot", lambda: bot)
+    monkeypatch.setattr(scheduler, "REMINDER_CHUNK_SIZE", 2)
+    hour = datetime.now().hour
+
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            session.add_all(
+                [User(telegram_id=100 + i, notification_time=dt_time(hour, 0)) for i in range(5)]
+                + [
+                    # Worked out today / other bucket / opted out
+                    User(telegram_id=200, notification_time=dt_time(hour, 0), last_workout_date=date.today()),
+                    User(telegram_id=201, notification_time=dt_time((hour + 1) % 24, 0)),
+                    User(telegram_id=202, notification_time=dt_time(hour, 0), notifications_enabled=False),
+                ]
+            )
+            await session.commit()
+
+            sent = await scheduler.check_daily_reminders(session)
+            in_transaction = session.in_transaction()
+            saved = await session.scalar(
+                select(func.count(Notification.id)).where(Notification.notification_type == "daily_reminder")
+            )
+            return sent, in_transaction, saved
+
+    sent, in_transaction, saved = run_with_db(scenario)
+
+    assert sent == 5
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [100, 101, 102, 103, 104]
+    assert not in_transaction
+    assert saved == 5
+
+
+def test_inactivity_reminders_page_through_equal_dates(run_with_db, monkeypatch):
+    bot = FakeBot()
+    monkeypatch.setattr(notifications, "get_bot", lambda: bot)
+    monkeypatch.setattr(scheduler, "REMINDER_CHUNK_SIZE", 2)
+    today = date.today()
+
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            # Several users share a date so chunks split inside one date
+            days_ago = [3, 3, 3, 5, 10, 10, 1]
+            session.add_all([
+                User(telegram_id=100 + i, last_workout_date=today - timedelta(days=days))
+                for i, days in enumerate(days_ago)
+            ])
+            await session.commit()
+            return await scheduler.check_inactivity_reminders(session)
+
+    assert run_with_db(scenario) == 6
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [100, 101, 102, 103, 104, 105]
+
@@ -0,0 +1,29 @@
+import pytest
+
+from app.services.query_plans import explain, find_full_scans, get_hot_queries
+
+HOT_QUERIES = get_hot_queries()
+
+
+@pytest.mark.parametrize(
+    "table, stmt",
+    [(table, stmt) for _, table, stmt in HOT_QUERIES],
+    ids=[name for name, _, _ in HOT_QUERIES],
+)
+def test_hot_query_uses_an_index(run_with_db, table, stmt):
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            conn = await session.connection()
+            return await explain(conn, stmt)
+
+    plan = run_with_db(scenario)
+
+    assert not find_full_scans("sqlite", plan, table), "\n".join(plan)
+
+
+def test_full_scan_is_detected():
+    plan = ["SCAN notifications", "USE TEMP B-TREE FOR ORDER BY"]
+
+    assert find_full_scans("sqlite", plan, "notifications") == ["SCAN notifications"]
+    assert not find_full_scans("sqlite", ["SEARCH notifications USING INDEX x (user_id=?)"], "notifications")
+    assert find_full_scans("postgresql", ["Seq Scan on users  (cost=0.00..1.01)"], "users")
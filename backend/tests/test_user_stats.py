@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from app.db.models import User, UserStats, WorkoutSession
+from app.services.user_stats import (
+    get_user_stats,
+    get_week_start,
+    rebuild_user_stats,
+    record_achievements,
+    record_workout,
+)
+
+
+def completed_workout(user_id: int, started_at: datetime, xp: int) -> WorkoutSession:
+    return WorkoutSession(
+        user_id=user_id,
+        started_at=started_at,
+        finished_at=started_at,
+        status="completed",
+        total_reps=10,
+        total_xp_earned=xp,
+        duration_seconds=60,
+    )
+
+
+def test_counters_are_incremented_in_place(run_with_db):
+    now = datetime.utcnow()
+
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            user = User(telegram_id=1)
+            session.add(user)
+            await session.flush()
+
+            # The first workout builds the missing row, later ones increment it
+            for _ in range(3):
+                workout = completed_workout(user.id, now, xp=5)
+                session.add(workout)
+                await session.flush()
+                await record_workout(session, workout)
+
+            # A workout from an older week leaves the weekly bucket alone
+            old = completed_workout(user.id, now - timedelta(days=14), xp=100)
+            session.add(old)
+            await session.flush()
+            await record_workout(session, old)
+            await record_achievements(session, user.id, 2)
+            await session.commit()
+
+            stats = await get_user_stats(session, user.id)
+            return (
+                stats.total_workouts, stats.total_reps, stats.week_start,
+                stats.week_workouts, stats.week_xp, stats.achievements_count,
+            )
+
+    assert run_with_db(scenario) == (4, 40, get_week_start(now.date()), 3, 15, 2)
+
+
+def test_rebuild_is_an_upsert_and_keeps_other_rows_loaded(run_with_db):
+    async def scenario(session_maker):
+        async with session_maker() as session:
+            users = [User(telegram_id=1), User(telegram_id=2)]
+            session.add_all(users)
+            await session.flush()
+            session.add(completed_workout(users[0].id, datetime.utcnow(), xp=5))
+
+            await rebuild_user_stats(session)
+            other = await session.get(UserStats, users[1].id)
+
+            # Rebuilding an existing row again must not hit the primary key
+            await rebuild_user_stats(session, [users[0].id])
+            await session.commit()
+
+            stats = await session.get(UserStats, users[0].id)
+            return stats.total_workouts, other in session
+
+    assert run_with_db(scenario) == (1, True)
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from app.services import xp_calculator
+from app.services.xp_calculator import calculate_xp, calculate_xp_batch
+
+numpy_only = pytest.mark.skipif(xp_calculator.np is None, reason="NumPy is not installed")
+
+
+def make_sets(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return {
+        "base_xp": [rng.randint(1, 50) for _ in range(count)],
+        "difficulty": [rng.randint(1, 5) for _ in range(count)],
+        "reps": [rng.randint(0, 120) for _ in range(count)],
+        "exercise_index": sorted(rng.randrange(10) for _ in range(count)),
+        "streak_days": [rng.randint(0, 60) for _ in range(count)],
+        "is_first_today": [rng.random() < 0.5 for _ in range(count)],
+    }
+
+
+def scalar_xp(sets) -> list[int]:
+    return [
+        calculate_xp(base, diff, reps, streak, first)
+        for base, diff, reps, streak, first in zip(
+            sets["base_xp"], sets["difficulty"], sets["reps"],
+            sets["streak_days"], sets["is_first_today"],
+        )
+    ]
+
+
+def test_python_batch_matches_scalar():
+    sets = make_sets(2000)
+
+    result = calculate_xp_batch(**sets, use_numpy=False)
+
+    assert result.set_xp == scalar_xp(sets)
+
+
+@numpy_only
+def test_numpy_batch_is_bit_identical_to_scalar():
+    sets = make_sets(5000, seed=11)
+
+    result = calculate_xp_batch(**sets, use_numpy=True)
+
+    assert result.set_xp == scalar_xp(sets)
+    assert all(type(xp) is int for xp in result.set_xp)
+
+
+def test_exercise_totals_sum_sets_per_index():
+    sets = make_sets(300)
+
+    result = calculate_xp_batch(**sets, num_exercises=12)
+
+    expected = [0] * 12
+    for index, xp in zip(sets["exercise_index"], scalar_xp(sets)):
+        expected[index] += xp
+    assert result.exercise_xp == expected
+
+
+def test_scalar_streak_and_first_flag_broadcast():
+    result = calculate_xp_batch(
+        base_xp=[10, 10],
+        difficulty=[3, 3],
+        reps=[15, 25],
+        exercise_index=[0, 0],
+        streak_days=5,
+        is_first_today=True,
+    )
+
+    assert result.set_xp == [calculate_xp(10, 3, 15, 5, True), calculate_xp(10, 3, 25, 5, True)]
+    assert result.exercise_xp == [sum(result.set_xp)]
+
+
+def test_empty_batch():
+    result = calculate_xp_batch([], [], [], [], 0, False)
+
+    assert result.set_xp == []
+    assert result.exercise_xp == []
+
+
+def test_level_is_exact_inverse_of_threshold():
+    for level in range(1, 400):
+        floor = xp_calculator.xp_for_level(level)
+        assert xp_calculator.get_level_from_xp(floor) == level
+        assert xp_calculator.get_level_from_xp(floor - 1) == max(level - 1, 1)
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=numpy_only)])
+def test_batch_levels_match_scalar(use_numpy):
+    rng = random.Random(3)
+    total_xps = [0, 99, 100, 399, 400, 10**12, 10**12 - 1]
+    total_xps += [rng.randrange(10**9) for _ in range(1000)]
+
+    levels = xp_calculator.get_levels_from_xp_batch(total_xps, use_numpy=use_numpy)
+
+    assert levels == [xp_calculator.get_level_from_xp(xp) for xp in total_xps]
+
+
+def test_level_table_matches_formula():
+    for level in range(1, xp_calculator.MAX_TABULATED_LEVEL + 10):
+        assert xp_calculator.get_level_threshold(level) == xp_calculator.xp_for_level(level)
+
+    progress = xp_calculator.get_level_progress(250)
+    assert (progress.level, progress.xp_floor, progress.xp_ceiling) == (2, 100, 400)
+    assert progress.progress_percent == 50